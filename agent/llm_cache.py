@@ -0,0 +1,158 @@
+"""
+大模型响应缓存：相同 (模型, system, user, max_tokens) 的请求直接返回历史结果，避免重复耗时与 token 消耗。
+精确匹配按 SHA256 键查 SQLite 表 llm_cache；可选语义回退：对 user 文本编码向量，在同一 (模型, system, max_tokens)
+范围内与近期条目做余弦相似度比较，超过阈值即命中。条目 24 小时过期，超过上限按最近访问时间淘汰。
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from lit_review_app.retrieval.db import get_connection, get_write_connection
+
+# 总开关；设为 0 可关闭缓存（如调试提示词时）
+LLM_CACHE_ENABLED = os.environ.get("LIT_LLM_CACHE", "1") != "0"
+LLM_CACHE_TTL = float(os.environ.get("LIT_LLM_CACHE_TTL", str(24 * 3600)))
+LLM_CACHE_MAX_ROWS = int(os.environ.get("LIT_LLM_CACHE_MAX_ROWS", "10000"))
+# 语义回退需加载向量模型，默认关闭
+LLM_CACHE_SEMANTIC = os.environ.get("LIT_LLM_CACHE_SEMANTIC", "0") == "1"
+LLM_CACHE_SIM_THRESHOLD = float(os.environ.get("LIT_LLM_CACHE_SIM_THRESHOLD", "0.92"))
+# 语义回退时扫描的近期条目数
+_SEMANTIC_SCAN_ROWS = 500
+
+
+def cache_key(model: str, system: str, user: str, max_tokens: int) -> str:
+    payload = json.dumps({"m": model, "s": system, "u": user, "t": max_tokens}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _scope_key(model: str, system: str, max_tokens: int) -> str:
+    payload = json.dumps({"m": model, "s": system, "t": max_tokens}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """基于 SQLite 的大模型响应缓存（精确键 + 可选语义回退）。"""
+
+    def __init__(self, db_path: str | None = None, semantic: bool = LLM_CACHE_SEMANTIC):
+        self._db_path = db_path
+        self._semantic = semantic
+        self._processor = None
+        self._ready = False
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = get_connection(self._db_path)
+        if not self._ready:
+            with self._lock:
+                conn.executescript("""
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    scope TEXT,
+                    response TEXT,
+                    created REAL,
+                    last_access REAL,
+                    embedding BLOB
+                );
+                CREATE INDEX IF NOT EXISTS idx_llm_cache_scope ON llm_cache(scope, created);
+                CREATE INDEX IF NOT EXISTS idx_llm_cache_access ON llm_cache(last_access);
+                """)
+                self._ready = True
+        return conn
+
+    def _embed(self, text: str):
+        """用分析层的向量模型编码 user 文本；模型不可用时返回 None（仅做精确匹配）。"""
+        if self._processor is None:
+            from lit_review_app.analysis.service import SinglePaperProcessor
+            from lit_review_app.config.settings import get_device
+            self._processor = SinglePaperProcessor(device=get_device())
+        vec = self._processor.get_embedding(text)
+        if not vec:
+            return None
+        try:
+            import numpy as np
+        except ImportError:
+            return None
+        v = np.asarray(vec, dtype=np.float32)
+        norm = float(np.linalg.norm(v))
+        return v / norm if norm > 0 else None
+
+    def get(self, model: str, system: str, user: str, max_tokens: int) -> str | None:
+        key = cache_key(model, system, user, max_tokens)
+        now = time.time()
+        conn = self._connect()
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT response, created FROM llm_cache WHERE key=?", (key,))
+            row = cur.fetchone()
+            if row and now - row[1] <= LLM_CACHE_TTL:
+                cur.execute("UPDATE llm_cache SET last_access=? WHERE key=?", (now, key))
+                conn.commit()
+                return row[0]
+            if not self._semantic:
+                return None
+            q = self._embed(user)
+            if q is None:
+                return None
+            import numpy as np
+            cur.execute(
+                "SELECT key, response, embedding FROM llm_cache "
+                "WHERE scope=? AND created>=? AND embedding IS NOT NULL ORDER BY created DESC LIMIT ?",
+                (_scope_key(model, system, max_tokens), now - LLM_CACHE_TTL, _SEMANTIC_SCAN_ROWS),
+            )
+            best_key, best_resp, best_sim = None, None, LLM_CACHE_SIM_THRESHOLD
+            for k, resp, blob in cur.fetchall():
+                v = np.frombuffer(blob, dtype=np.float32)
+                if v.shape != q.shape:
+                    continue
+                sim = float(v @ q)
+                if sim >= best_sim:
+                    best_key, best_resp, best_sim = k, resp, sim
+            if best_key is not None:
+                cur.execute("UPDATE llm_cache SET last_access=? WHERE key=?", (now, best_key))
+                conn.commit()
+            return best_resp
+        finally:
+            conn.close()
+
+    def put(self, model: str, system: str, user: str, max_tokens: int, response: str) -> None:
+        key = cache_key(model, system, user, max_tokens)
+        now = time.time()
+        emb = None
+        if self._semantic:
+            v = self._embed(user)
+            emb = v.tobytes() if v is not None else None
+        self._connect()
+        conn = get_write_connection(self._db_path)
+        try:
+            cur = conn.cursor()
+            cur.execute(
+                "INSERT OR REPLACE INTO llm_cache(key, scope, response, created, last_access, embedding) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, _scope_key(model, system, max_tokens), response, now, now, emb),
+            )
+            cur.execute("DELETE FROM llm_cache WHERE created < ?", (now - LLM_CACHE_TTL,))
+            cur.execute("SELECT COUNT(*) FROM llm_cache")
+            overflow = cur.fetchone()[0] - LLM_CACHE_MAX_ROWS
+            if overflow > 0:
+                cur.execute(
+                    "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY last_access LIMIT ?)",
+                    (overflow,),
+                )
+            conn.commit()
+        finally:
+            conn.close()
+
+
+_llm_cache: LLMCache | None = None
+
+
+def get_llm_cache() -> LLMCache | None:
+    """返回进程内共享的缓存实例；LIT_LLM_CACHE=0 时返回 None。"""
+    global _llm_cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    if _llm_cache is None:
+        _llm_cache = LLMCache()
+    return _llm_cache
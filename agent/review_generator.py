@@ -1,23 +1,57 @@
 """
 综述生成：两种模式（快速综述 / 基于当前分析的定制综述），使用 RAG + 大模型。
 """
+import asyncio
 import logging
-from typing import Any
+import os
+import re
+from typing import Any, AsyncIterator
 
 from lit_review_app.agent.session import SessionState
+from lit_review_app.agent.llm_cache import cache_key, get_llm_cache
 
 logger = logging.getLogger(__name__)
 from lit_review_app.agent.tools import search_papers, get_analysis_for_state, build_rag_context
 
 
-def _call_llm(
+_llm_client = None
+_llm_client_key: tuple[str, str] | None = None
+# 进行中的大模型请求（键同 llm_cache）：相同请求并发到达时共用一次上游调用
+_llm_inflight: dict[str, asyncio.Future] = {}
+
+
+def _get_llm_client(api_key: str, base_url: str):
+    """模块级缓存 AsyncOpenAI 客户端，复用其连接池；密钥或地址变化时重建。"""
+    global _llm_client, _llm_client_key
+    key = (api_key, base_url or "")
+    if _llm_client is None or _llm_client_key != key:
+        from openai import AsyncOpenAI
+        _llm_client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url.rstrip("/") if base_url else None,
+        )
+        _llm_client_key = key
+    return _llm_client
+
+
+async def close_llm_client() -> None:
+    """应用关闭时释放共享客户端的连接池。"""
+    global _llm_client, _llm_client_key
+    client, _llm_client, _llm_client_key = _llm_client, None, None
+    if client is not None:
+        await client.close()
+
+
+async def _call_llm_async(
     system: str,
     user: str,
     max_tokens: int = 2000,
     timeout: float = 90.0,
 ) -> str:
-    """调用大模型：智谱 GLM-4-Flash（OpenAI 兼容 API）。未配置时返回占位。"""
-    import os
+    """
+    异步调用大模型：智谱 GLM-4-Flash（OpenAI 兼容 API），等待期间不阻塞事件循环。未配置时返回占位。
+    成功结果写入 llm_cache，相同请求再次调用时直接返回缓存；相同请求同时进行时合并为一次调用。
+    """
     from lit_review_app.config.settings import OPENAI_API_KEY, OPENAI_BASE_URL, OPENAI_MODEL
     api_key = os.environ.get("OPENAI_API_KEY") or OPENAI_API_KEY
     base_url = os.environ.get("OPENAI_BASE_URL") or OPENAI_BASE_URL
@@ -27,53 +61,243 @@ def _call_llm(
             "【未配置 OPENAI_API_KEY】请设置环境变量（智谱 API Key）后重试。"
             " 综述草稿将基于当前文献摘要生成，此处返回占位说明。"
         )
+    key = cache_key(model, system, user, max_tokens)
+    task = _llm_inflight.get(key)
+    if task is None or task.get_loop() is not asyncio.get_running_loop():
+        task = asyncio.ensure_future(_complete(api_key, base_url, model, system, user, max_tokens, timeout))
+        _llm_inflight[key] = task
+        task.add_done_callback(lambda t, k=key: _llm_inflight.pop(k, None) if _llm_inflight.get(k) is t else None)
+    else:
+        logger.info("llm request coalesced model=%s userLen=%d", model, len(user))
+    # shield：某个调用方取消时不影响其他等待同一结果的调用方
+    return await asyncio.shield(task)
+
+
+async def _complete(
+    api_key: str,
+    base_url: str,
+    model: str,
+    system: str,
+    user: str,
+    max_tokens: int,
+    timeout: float,
+) -> str:
+    """查缓存 → 调用上游 → 写缓存，供 _call_llm_async 合并并发请求。"""
+    cache = get_llm_cache()
+    if cache is not None:
+        try:
+            cached = await asyncio.to_thread(cache.get, model, system, user, max_tokens)
+        except Exception as e:
+            logger.warning("llm cache lookup failed: %s", e)
+            cached = None
+        if cached:
+            logger.info("llm cache hit model=%s userLen=%d", model, len(user))
+            return cached
     try:
-        from openai import OpenAI
-        client = OpenAI(
-            api_key=api_key,
-            base_url=base_url.rstrip("/") if base_url else None,
+        client = _get_llm_client(api_key, base_url)
+        resp = await client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": system},
+                {"role": "user", "content": user},
+            ],
+            max_tokens=max_tokens,
             timeout=timeout,
         )
-        resp = client.chat.completions.create(
+        content = (resp.choices[0].message.content or "") if resp.choices else ""
+    except Exception as e:
+        return f"【调用大模型失败】{e}"
+    if content and cache is not None:
+        try:
+            await asyncio.to_thread(cache.put, model, system, user, max_tokens, content)
+        except Exception as e:
+            logger.warning("llm cache store failed: %s", e)
+    return content
+
+
+async def _call_llm_stream(
+    system: str,
+    user: str,
+    max_tokens: int = 2000,
+    timeout: float = 90.0,
+) -> AsyncIterator[str]:
+    """
+    流式调用大模型（stream=True），逐段产出增量文本，首字延迟约 1 秒而不必等待整段生成完毕。
+    命中 llm_cache 时一次性产出缓存内容；完整结果结束后写入缓存，与 _call_llm_async 共用同一键。
+    """
+    from lit_review_app.config.settings import OPENAI_API_KEY, OPENAI_BASE_URL, OPENAI_MODEL
+    api_key = os.environ.get("OPENAI_API_KEY") or OPENAI_API_KEY
+    base_url = os.environ.get("OPENAI_BASE_URL") or OPENAI_BASE_URL
+    model = os.environ.get("OPENAI_MODEL") or OPENAI_MODEL
+    if not api_key:
+        yield (
+            "【未配置 OPENAI_API_KEY】请设置环境变量（智谱 API Key）后重试。"
+            " 综述草稿将基于当前文献摘要生成，此处返回占位说明。"
+        )
+        return
+    cache = get_llm_cache()
+    if cache is not None:
+        try:
+            cached = await asyncio.to_thread(cache.get, model, system, user, max_tokens)
+        except Exception as e:
+            logger.warning("llm cache lookup failed: %s", e)
+            cached = None
+        if cached:
+            logger.info("llm cache hit (stream) model=%s userLen=%d", model, len(user))
+            yield cached
+            return
+    parts: list[str] = []
+    try:
+        client = _get_llm_client(api_key, base_url)
+        resp = await client.chat.completions.create(
             model=model,
             messages=[
                 {"role": "system", "content": system},
                 {"role": "user", "content": user},
             ],
             max_tokens=max_tokens,
+            timeout=timeout,
+            stream=True,
         )
-        if resp.choices:
-            return resp.choices[0].message.content or ""
+        async for chunk in resp:
+            delta = (chunk.choices[0].delta.content or "") if chunk.choices else ""
+            if delta:
+                parts.append(delta)
+                yield delta
     except Exception as e:
-        return f"【调用大模型失败】{e}"
-    return ""
+        yield f"【调用大模型失败】{e}"
+        return
+    content = "".join(parts)
+    if content and cache is not None:
+        try:
+            await asyncio.to_thread(cache.put, model, system, user, max_tokens, content)
+        except Exception as e:
+            logger.warning("llm cache store failed: %s", e)
+
+
+# 提示词按「静态前缀 + 动态后缀」组织：固定指引全部放在 system 常量中，user 中先放固定的 RAG 说明与
+# 文献上下文，最后才是本次请求的主题、时间、问题或章节要求，使服务端的前缀缓存（prompt caching）可以命中。
+_REVIEW_SYSTEM = (
+    "你是一位学术写作助手。请根据提供的文献集合与结构化摘要、统计信息，撰写结构化的文献综述草稿。"
+    "综述章节结构为：一、背景与问题；二、主要研究路径；三、热点与趋势；四、不足与展望；"
+    "若用户提供了关注角度，另设「五、用户关注角度专题」，并在相关论述中重点体现这些角度。"
+    "每次请求只撰写用户指定的一个章节：只输出该章节正文，不要重复章节标题，也不要撰写其他章节。"
+    "严格约束：只能引用上下文中已列出的文献，且引用时必须使用 [1][2][3] 等序号对应文献列表中的 [1][2][3]，不得编造文献。"
+)
+
+_QA_SYSTEM = (
+    "你是一位文献分析助理。根据提供的文献集合与结构化摘要、统计信息回答用户问题。"
+    "严格约束：回答中若提到具体研究，必须用文献序号 [1][2][3] 等形式标注，且只能引用上下文中已列出的文献，不得编造。"
+)
+
+_REFINE_SYSTEM = (
+    "你是一位学术写作助手。用户会提供一篇文献综述草稿和一个修改意见/问题。"
+    "请根据用户的问题或意见，对草稿进行实质性修改与完善：可增删段落、重写小节、补充论据或案例，使修改后的正文明显体现用户意图。"
+    "不要只做微调或简单复述；直接输出修改后的完整综述正文（不要加解释）。"
+    "要求：保持章节结构（如 一、二、三、四），保持 [1][2][3] 等文献引用格式，不要编造文献。"
+)
+
+_LATEX_SYSTEM = (
+    "You are a LaTeX document assistant. The user will provide a Chinese literature review draft. "
+    "You must: (1) Translate the entire content into English; (2) Output a complete, compilable .tex source. "
+    "Rules: "
+    "Use \\documentclass[12pt]{article}, \\usepackage[utf8]{inputenc}, \\usepackage[T1]{fontenc}. "
+    "Do NOT use ctex or any Chinese package - the output must be English only so it compiles with pdflatex. "
+    "Use \\section{} for main headings (e.g. 'I. Background and Issues'), \\subsection{} for subheadings. "
+    "Use \\textbf{} for bold phrases; do not put \\\\ or \\newline inside \\textbf{}. "
+    "Do not use Markdown symbols (*, **, #). Separate paragraphs with blank lines. "
+    "Escape special characters (& % _ { }) in body text. "
+    "Output only the .tex file content, no explanation."
+)
+
+# user 消息的固定开头：位于动态上下文之前
+_RAG_HEADER = "以下为当前文献集合、统计信息与结构化摘要（仅可引用其中列出的文献）：\n"
 
+# 综述的四个章节：各自独立起草、并发调用大模型，再按顺序拼接
+_REVIEW_SECTIONS = [
+    ("一、背景与问题", "交代研究主题的现实背景、政策语境与核心问题"),
+    ("二、主要研究路径", "归纳文献采用的主要研究路径、理论视角与方法"),
+    ("三、热点与趋势", "结合年度发文与关键词统计，梳理研究热点及其演化趋势"),
+    ("四、不足与展望", "指出现有研究的不足，并提出未来研究方向"),
+]
+_FOCUS_SECTION = ("五、用户关注角度专题", "围绕用户关注的角度单列小节展开论述")
+_SECTION_MAX_TOKENS = 1200
 
-def generate_review_fast(
+
+async def _draft_sections(
+    sections: list[tuple[str, str]],
+    context: str,
+    request_note: str,
+    timeout: float = 120.0,
+) -> str:
+    """对每个章节各发一次大模型请求，asyncio.gather 并发等待，按章节顺序拼接为完整草稿。"""
+    prefix = f"{_RAG_HEADER}{context}\n\n{request_note}"
+
+    async def draft_one(title: str, guide: str) -> str:
+        user = f"{prefix}\n\n请撰写「{title}」一节：{guide}。"
+        return await _call_llm_async(_REVIEW_SYSTEM, user, max_tokens=_SECTION_MAX_TOKENS, timeout=timeout)
+
+    bodies = await asyncio.gather(*(draft_one(title, guide) for title, guide in sections))
+    return "\n\n".join(f"{title}\n{(body or '').strip()}" for (title, _), body in zip(sections, bodies))
+
+
+async def generate_review_fast(
     topic: str,
     start_year: int | None = None,
     end_year: int | None = None,
 ) -> tuple[str, SessionState]:
     """
     规格 4.4.3 模式 A：检索 → 分析 → 推荐文献集合（默认全选）→ 生成大纲 → 分章节草稿。
-    单次调用生成结构化草稿：背景、主要研究路径、热点与趋势、不足与展望；严格只引用上下文中列出的文献，用 [1][2] 序号。
-    """
-    results, state = search_papers(topic=topic, start_year=start_year, end_year=end_year, limit=80)
-    state = get_analysis_for_state(state)
-    context = build_rag_context(state, max_chars=8000, include_structured=True)
-    system = (
-        "你是一位学术写作助手。请根据提供的文献集合与结构化摘要、统计信息，撰写一篇结构化的文献综述草稿。"
-        "必须包含以下章节：一、背景与问题；二、主要研究路径；三、热点与趋势；四、不足与展望。"
-        "严格约束：只能引用上下文中已列出的文献，且引用时必须使用 [1][2][3] 等序号对应文献列表中的 [1][2][3]，不得编造文献。"
+    背景、主要研究路径、热点与趋势、不足与展望四个章节并发起草后拼接；严格只引用上下文中列出的文献，用 [1][2] 序号。
+    """
+    results, state = await asyncio.to_thread(
+        search_papers, topic=topic, start_year=start_year, end_year=end_year, limit=80
     )
-    user = f"主题：{topic}\n时间范围：{start_year or '?'}–{end_year or '?'}\n\n文献与统计信息：\n{context}\n\n请生成综述草稿（含上述四部分）。"
-    logger.info("generate_review_fast calling LLM topic=%r contextLen=%d", topic, len(context or ""))
-    draft = _call_llm(system, user, max_tokens=4000, timeout=120.0)
+    state = await asyncio.to_thread(get_analysis_for_state, state)
+    context = await asyncio.to_thread(build_rag_context, state, max_chars=8000, include_structured=True)
+    request_note = f"主题：{topic}\n时间范围：{start_year or '?'}–{end_year or '?'}"
+    logger.info("generate_review_fast calling LLM topic=%r contextLen=%d sections=%d", topic, len(context or ""), len(_REVIEW_SECTIONS))
+    draft = await _draft_sections(_REVIEW_SECTIONS, context, request_note, timeout=120.0)
     logger.info("generate_review_fast LLM returned draftLen=%d", len(draft or ""))
     return draft, state
 
 
-def generate_review_from_session(
+async def stream_review_fast(
+    topic: str,
+    start_year: int | None = None,
+    end_year: int | None = None,
+) -> AsyncIterator[tuple[str, Any]]:
+    """
+    模式 A 的流式版本，产出 (事件, 数据)：先 ("meta", paper_ids)，随后若干 ("delta", 文本)，最后 ("done", None)。
+    第一章节流式输出；其余章节同时以非流式请求并发起草，按章节顺序在前一节结束后整段输出，总耗时与非流式版本一致。
+    """
+    results, state = await asyncio.to_thread(
+        search_papers, topic=topic, start_year=start_year, end_year=end_year, limit=80
+    )
+    state = await asyncio.to_thread(get_analysis_for_state, state)
+    yield "meta", list(state.paper_ids or [])
+    context = await asyncio.to_thread(build_rag_context, state, max_chars=8000, include_structured=True)
+    request_note = f"主题：{topic}\n时间范围：{start_year or '?'}–{end_year or '?'}"
+    prefix = f"{_RAG_HEADER}{context}\n\n{request_note}"
+    users = [f"{prefix}\n\n请撰写「{title}」一节：{guide}。" for title, guide in _REVIEW_SECTIONS]
+    rest = [
+        asyncio.create_task(_call_llm_async(_REVIEW_SYSTEM, u, max_tokens=_SECTION_MAX_TOKENS, timeout=120.0))
+        for u in users[1:]
+    ]
+    try:
+        yield "delta", f"{_REVIEW_SECTIONS[0][0]}\n"
+        async for piece in _call_llm_stream(_REVIEW_SYSTEM, users[0], max_tokens=_SECTION_MAX_TOKENS, timeout=120.0):
+            yield "delta", piece
+        for (title, _), task in zip(_REVIEW_SECTIONS[1:], rest):
+            body = await task
+            yield "delta", f"\n\n{title}\n{(body or '').strip()}"
+    finally:
+        for task in rest:
+            task.cancel()
+    yield "done", None
+
+
+async def generate_review_from_session(
     state: SessionState,
     user_focus: str = "",
 ) -> tuple[str, SessionState]:
@@ -81,24 +305,23 @@ def generate_review_from_session(
     规格 4.4.3 模式 B：基于当前分析的定制综述。以当前 SessionState + 用户关注角度为约束，定制大纲与章节。
     严格只引用文献集合中的论文，用 [1][2] 序号。
     """
-    state = get_analysis_for_state(state) if not state.stats else state
-    context = build_rag_context(state, max_chars=8000, include_structured=True)
-    focus_note = ""
+    if not state.stats:
+        state = await asyncio.to_thread(get_analysis_for_state, state)
+    context = await asyncio.to_thread(build_rag_context, state, max_chars=8000, include_structured=True)
+    focus_lines = []
     if user_focus:
-        focus_note = f"\n用户特别关注的角度（请在综述中重点体现）：{user_focus}"
+        focus_lines.append(f"用户特别关注的角度（请在综述中重点体现）：{user_focus}")
     if state.user_focus_angles:
-        focus_note += "\n用户此前关注的角度：" + "；".join(state.user_focus_angles)
-    system = (
-        "你是一位学术写作助手。请根据当前文献集合与结构化摘要、统计信息撰写综述草稿。"
-        "若提供了用户关注角度，请在综述中单列小节或重点段落体现这些角度。"
-        "严格约束：只能引用上下文中已列出的文献，引用时使用 [1][2][3] 等序号，不得编造文献。"
-    )
-    user = f"文献与统计信息：\n{context}{focus_note}\n\n请生成定制综述草稿。"
-    draft = _call_llm(system, user)
+        focus_lines.append("用户此前关注的角度：" + "；".join(state.user_focus_angles))
+    sections = list(_REVIEW_SECTIONS)
+    if focus_lines:
+        sections.append(_FOCUS_SECTION)
+    request_note = "\n".join(focus_lines) if focus_lines else "请生成定制综述草稿。"
+    draft = await _draft_sections(sections, context, request_note, timeout=90.0)
     return draft, state
 
 
-def answer_question_with_rag(
+async def answer_question_with_rag(
     question: str,
     topic: str = "",
     start_year: int | None = None,
@@ -107,22 +330,77 @@ def answer_question_with_rag(
     """
     规格 4.4.2 Q&A：从 SessionState 确定文献集合（或重新检索），调分析服务获取统计，RAG 上下文 + 大模型回答，严格只引用所给文献 [1][2]。
     """
-    results, state = search_papers(topic=topic, start_year=start_year, end_year=end_year, limit=50)
+    user, ref_ids = await _qa_prompt(question, topic, start_year, end_year)
+    answer = await _call_llm_async(_QA_SYSTEM, user, max_tokens=2500, timeout=120.0)
+    return answer, ref_ids
+
+
+async def _qa_prompt(
+    question: str,
+    topic: str,
+    start_year: int | None,
+    end_year: int | None,
+) -> tuple[str, list[str]]:
+    """检索 + 分析 + 组装 Q&A 的 user 提示，返回 (提示, 引用文献 id)。"""
+    results, state = await asyncio.to_thread(
+        search_papers, topic=topic, start_year=start_year, end_year=end_year, limit=50
+    )
     state.papers = results
     state.last_question = question
-    state = get_analysis_for_state(state)
-    context = build_rag_context(state, max_chars=6000, include_structured=True)
-    system = (
-        "你是一位文献分析助理。根据提供的文献集合与结构化摘要、统计信息回答用户问题。"
-        "严格约束：回答中若提到具体研究，必须用文献序号 [1][2][3] 等形式标注，且只能引用上下文中已列出的文献，不得编造。"
+    state = await asyncio.to_thread(get_analysis_for_state, state)
+    context = await asyncio.to_thread(build_rag_context, state, max_chars=6000, include_structured=True)
+    user = (
+        f"{_RAG_HEADER}{context}\n\n"
+        f"当前主题与时间范围：{topic or '不限'}，{start_year or '?'}–{end_year or '?'}\n"
+        f"用户问题：{question}"
     )
-    user = f"当前主题与时间范围：{topic or '不限'}，{start_year or '?'}–{end_year or '?'}\n\n文献与统计：\n{context}\n\n用户问题：{question}"
-    answer = _call_llm(system, user, max_tokens=2500, timeout=120.0)
-    ref_ids = [p["paper_id"] for p in state.papers[:10]]
-    return answer, ref_ids
+    return user, [p["paper_id"] for p in state.papers[:10]]
 
 
-def refine_review_with_chat(
+async def stream_answer_question(
+    question: str,
+    topic: str = "",
+    start_year: int | None = None,
+    end_year: int | None = None,
+) -> AsyncIterator[tuple[str, Any]]:
+    """Q&A 的流式版本，事件与 stream_review_fast 一致：("meta", 引用文献 id)、若干 ("delta", 文本)、("done", None)。"""
+    user, ref_ids = await _qa_prompt(question, topic, start_year, end_year)
+    yield "meta", ref_ids
+    async for piece in _call_llm_stream(_QA_SYSTEM, user, max_tokens=2500, timeout=120.0):
+        yield "delta", piece
+    yield "done", None
+
+
+def _refine_context_from_ids(paper_ids: list[str]) -> str:
+    """
+    拉取引用文献的标题、年份与摘要片段，作为完善草稿时的参考上下文（一次查询，复用线程内连接）。
+    [序号] 取 paper_id 在 paper_ids 中的位置，与草稿中的引用编号一致。
+    """
+    from lit_review_app.retrieval.db import get_connection, select_in_id_order
+
+    pids = paper_ids[:50]
+    conn = get_connection()
+    try:
+        rows = list(select_in_id_order(
+            conn.cursor(),
+            "SELECT p.paper_id, p.title, p.abstract, p.year FROM papers p JOIN ord ON ord.pid = p.paper_id",
+            pids,
+        ))
+    finally:
+        conn.close()
+    if not rows:
+        return ""
+    pos: dict[str, int] = {}
+    for j, pid in enumerate(pids):
+        pos.setdefault(pid, j)
+    body = "\n\n".join(
+        f"[{pos[pid] + 1}] {t or ''} ({y})\n{(a or '')[:300].replace(chr(10), ' ')}"
+        for pid, t, a, y in rows
+    )
+    return "\n\n引用文献摘要（供参考）：\n" + body
+
+
+async def refine_review_with_chat(
     draft: str,
     question: str,
     topic: str = "",
@@ -133,70 +411,40 @@ def refine_review_with_chat(
     若提供 paper_ids 则拉取文献摘要作为上下文，否则仅基于草稿与问题修改。
     返回完善后的完整综述正文。
     """
-    from lit_review_app.agent.tools import build_rag_context
-    from lit_review_app.retrieval.db import get_connection
-    import json
-
     context_extra = ""
     if paper_ids:
-        conn = get_connection()
-        cur = conn.cursor()
-        placeholders = ",".join("?" * len(paper_ids))
-        cur.execute(
-            f"SELECT paper_id, title, abstract, year FROM papers WHERE paper_id IN ({placeholders})",
-            paper_ids[:50],
-        )
-        rows = cur.fetchall()
-        conn.close()
-        parts = []
-        for i, r in enumerate(rows, 1):
-            pid, title, abstract, year = r[0], r[1] or "", r[2] or "", r[3]
-            ab = (abstract or "")[:300].replace("\n", " ")
-            parts.append(f"[{i}] {title} ({year})\n{ab}")
-        if parts:
-            context_extra = "\n\n引用文献摘要（供参考）：\n" + "\n\n".join(parts)
-
-    system = (
-        "你是一位学术写作助手。用户会提供一篇文献综述草稿和一个修改意见/问题。"
-        "请根据用户的问题或意见，对草稿进行实质性修改与完善：可增删段落、重写小节、补充论据或案例，使修改后的正文明显体现用户意图。"
-        "不要只做微调或简单复述；直接输出修改后的完整综述正文。"
-        "要求：保持章节结构（如 一、二、三、四），保持 [1][2][3] 等文献引用格式，不要编造文献。"
-    )
-    user = f"综述草稿：\n{draft}\n\n用户问题/修改意见：{question}\n{context_extra}\n\n请根据上述意见对草稿做实质性修改，并直接输出修改后的完整综述正文（不要加解释）。"
-    out = _call_llm(system, user, max_tokens=4000, timeout=120.0)
+        context_extra = await asyncio.to_thread(_refine_context_from_ids, paper_ids)
+
+    user = f"综述草稿：\n{draft}\n{context_extra}\n\n用户问题/修改意见：{question}\n请根据上述意见对草稿做实质性修改，并直接输出修改后的完整综述正文。"
+    out = await _call_llm_async(_REFINE_SYSTEM, user, max_tokens=4000, timeout=120.0)
     return out.strip() or draft
 
 
-def draft_to_latex_via_llm(draft: str) -> str:
+# 模型常把命令写成 \\section：一次正则扫描改回单反斜杠，代替逐个命令 str.replace 的多次全文扫描
+_LATEX_DOUBLE_BACKSLASH_RE = re.compile(
+    r"\\\\(textbf|section|subsection|documentclass|usepackage|begin|end|title|author|date"
+    r"|parskip|setlength|parindent|inputenc|fontenc)\b"
+)
+_TEXTBF_RE = re.compile(r"\\textbf\{([^{}]*)\}")
+_WS_RE = re.compile(r"\s+")
+
+
+def _fix_textbf(m: re.Match) -> str:
+    """\\textbf{} 内不允许换行命令，合并空白。"""
+    inner = m.group(1).replace("\\\\", " ").replace("\\newline", " ")
+    return "\\textbf{" + _WS_RE.sub(" ", inner).strip() + "}"
+
+
+async def draft_to_latex_via_llm(draft: str) -> str:
     """
     通过大模型将综述草稿转为英文 LaTeX 源码，便于用标准 pdflatex 编译（无需 ctex）。
     要求：先翻译为英文，再输出 .tex，使用 \\section/\\subsection、\\textbf，禁止 * 与 \\ 在 \\textbf 内。
     失败或未配置时返回空字符串，调用方应回退到规则转换。
     """
-    system = (
-        "You are a LaTeX document assistant. The user will provide a Chinese literature review draft. "
-        "You must: (1) Translate the entire content into English; (2) Output a complete, compilable .tex source. "
-        "Rules: "
-        "Use \\documentclass[12pt]{article}, \\usepackage[utf8]{inputenc}, \\usepackage[T1]{fontenc}. "
-        "Do NOT use ctex or any Chinese package - the output must be English only so it compiles with pdflatex. "
-        "Use \\section{} for main headings (e.g. 'I. Background and Issues'), \\subsection{} for subheadings. "
-        "Use \\textbf{} for bold phrases; do not put \\\\ or \\newline inside \\textbf{}. "
-        "Do not use Markdown symbols (*, **, #). Separate paragraphs with blank lines. "
-        "Escape special characters (& % _ { }) in body text. "
-        "Output only the .tex file content, no explanation."
-    )
     user = f"Translate the following Chinese literature review into English and output as LaTeX:\n\n{draft}"
-    out = _call_llm(system, user, max_tokens=4000, timeout=60.0)
+    out = await _call_llm_async(_LATEX_SYSTEM, user, max_tokens=4000, timeout=60.0)
     if not out or "documentclass" not in out.lower():
         return ""
     out = out.strip()
-    import re
-    for cmd in ("textbf", "section", "subsection", "documentclass", "usepackage", "begin", "end", "title", "author", "date", "parskip", "setlength", "parindent", "inputenc", "fontenc"):
-        out = out.replace("\\\\" + cmd, "\\" + cmd)
-    def fix_textbf(m):
-        inner = m.group(1)
-        inner = inner.replace("\\\\", " ").replace("\\newline", " ")
-        inner = re.sub(r"\s+", " ", inner).strip()
-        return "\\textbf{" + inner + "}"
-    out = re.sub(r"\\textbf\{([^{}]*)\}", fix_textbf, out)
-    return out
+    out = _LATEX_DOUBLE_BACKSLASH_RE.sub(r"\\\1", out)
+    return _TEXTBF_RE.sub(_fix_textbf, out)
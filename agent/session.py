@@ -21,6 +21,10 @@ class SessionState:
     last_instruction: str = ""
     last_question: str = ""
     user_focus_angles: list[str] = field(default_factory=list)
+    # 分析层补全后的文献（含关键词/向量/态度），同一 state 的多项分析共用，避免重复补全
+    enriched_papers: list[dict] = field(default_factory=list, repr=False)
+    # 上次完成分析时的文献集合签名（排序后的 paper_id），集合未变时跳过重复的统计与聚类
+    analysis_signature: tuple[str, ...] = field(default=(), repr=False)
 
     def to_context_summary(self, max_papers: int = 20) -> str:
         """生成给 LLM 的简短上下文说明（不含结构化摘要，用于简短摘要）。"""
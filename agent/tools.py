@@ -1,11 +1,15 @@
 """
 规格 4.4 Agent 工具：调用检索（含主题/年份分布）、分析服务，组装 RAG 上下文（含结构化摘要，严格只引用集合内文献）。
 """
+import functools
+import io
+import os
+import time
 from typing import Any
 
 from lit_review_app.retrieval.search import search_with_distributions
-from lit_review_app.retrieval.db import fetch_papers_with_structured, fetch_features
-from lit_review_app.analysis.service import CollectionAnalyzer
+from lit_review_app.retrieval.db import iter_papers_with_structured, fetch_features
+from lit_review_app.analysis.service import get_collection_analyzer
 from lit_review_app.agent.session import SessionState
 
 
@@ -59,42 +63,84 @@ def get_analysis_for_state(state: SessionState) -> SessionState:
     """规格 4.2.2：对当前文献集合做主题聚类、研究路径、共现、热点演化、态度演化。"""
     if not state.papers:
         return state
-    analyzer = CollectionAnalyzer()
-    state.stats = analyzer.get_dashboard_stats(state.papers)
-    cluster_res = analyzer.perform_clustering(state.papers, n_clusters=min(5, len(state.papers)))
+    sig = tuple(sorted(state.paper_ids))
+    if state.stats and state.analysis_signature == sig:
+        return state
+    analyzer = get_collection_analyzer()
+    # 只补全一次，统计与聚类（以及调用方后续的共现/演化分析）共用 enriched_papers
+    state.enriched_papers = analyzer._enrich_papers(state.papers)
+    state.stats = analyzer.get_dashboard_stats(state.enriched_papers)
+    cluster_res = analyzer.perform_clustering(state.enriched_papers, n_clusters=min(5, len(state.papers)))
     state.clusters = cluster_res.get("clusters", [])
+    state.analysis_signature = sig
     return state
 
 
+def _trunc(v: str | None, width: int) -> str:
+    return (v or "")[:width]
+
+
+# 结构化摘要段缓存时长（秒）：离线导入更新摘要/上下文标签后，最迟这么久后生效
+STRUCTURED_BLOCK_TTL = float(os.environ.get("LIT_STRUCTURED_BLOCK_TTL", "300"))
+
+
+def _structured_block(paper_ids: tuple[str, ...]) -> str:
+    """
+    文献结构化摘要段：只依赖 paper_id 顺序（决定 [序号]，行按 paper_ids 顺序取回），同一会话内重复生成综述/问答时不再查库拼接。
+    按 (元组, 时间片) 缓存，时间片长 STRUCTURED_BLOCK_TTL，过期后重新查库；查库异常不会被缓存。
+    """
+    return _structured_block_cached(paper_ids, int(time.monotonic() // max(1.0, STRUCTURED_BLOCK_TTL)))
+
+
+@functools.lru_cache(maxsize=128)
+def _structured_block_cached(paper_ids: tuple[str, ...], _epoch: int) -> str:
+    structured_list = iter_papers_with_structured(list(paper_ids))
+    parts = ["文献结构化摘要（仅可引用以下文献，引用时用 [1][2] 等序号）："]
+    # 序号取 paper_id 在 paper_ids 中的位置：库中缺失的文献不会让后续序号错位
+    pos: dict[str, int] = {}
+    for j, pid in enumerate(paper_ids):
+        pos.setdefault(pid, j)
+    for p in structured_list:
+        i = pos[p["paper_id"]]
+        title = _trunc(p.get("title"), 60)
+        tag = p.get("context_tag") or ""
+        # 有离线上下文标签时一行即可，约 150 字；否则回退到四段截断摘要
+        if tag:
+            parts.append(f"  [{i+1}] {title} — {tag}")
+            continue
+        bg = _trunc(p.get("background"), 150)
+        rq = _trunc(p.get("research_question"), 150)
+        methods = _trunc(p.get("methods"), 150)
+        concl = _trunc(p.get("conclusions"), 150)
+        parts.append(f"  [{i+1}] {title}")
+        if bg:
+            parts.append(f"      背景：{bg}")
+        if rq:
+            parts.append(f"      研究问题：{rq}")
+        if methods:
+            parts.append(f"      方法：{methods}")
+        if concl:
+            parts.append(f"      结论：{concl}")
+    return "\n".join(parts)
+
+
 def build_rag_context(state: SessionState, max_chars: int = 8000, include_structured: bool = True) -> str:
     """
     规格 4.4.3 RAG：将结构化摘要、主题小结、统计表拼成上下文，严格要求模型只引用文献集合中的论文，用 [序号] 标注。
+    会话摘要与聚类随 state 变化、每次重新生成；结构化摘要段按 paper_id 元组缓存。
+    各段依次写入 StringIO，累计长度达到 max_chars 即停止，后续段落不再生成。
     """
-    parts = [state.to_context_summary(max_papers=15)]
-    if state.clusters:
-        parts.append("主题聚类：")
+    buf = io.StringIO()
+    n = buf.write(state.to_context_summary(max_papers=15))
+    if state.clusters and n < max_chars:
+        n += buf.write("\n主题聚类：")
         for c in state.clusters[:5]:
-            parts.append(f"  - {c.get('topic_name', '')}（{c.get('count', 0)} 篇）")
-    if include_structured and state.paper_ids:
+            n += buf.write(f"\n  - {c.get('topic_name', '')}（{c.get('count', 0)} 篇）")
+    if include_structured and state.paper_ids and n < max_chars:
         try:
-            structured_list = fetch_papers_with_structured(state.paper_ids[:25])
-            parts.append("文献结构化摘要（仅可引用以下文献，引用时用 [1][2] 等序号）：")
-            for i, p in enumerate(structured_list):
-                title = (p.get("title") or "")[:60]
-                bg = (p.get("background") or "")[:150]
-                rq = (p.get("research_question") or "")[:150]
-                methods = (p.get("methods") or "")[:150]
-                concl = (p.get("conclusions") or "")[:150]
-                parts.append(f"  [{i+1}] {title}")
-                if bg:
-                    parts.append(f"      背景：{bg}")
-                if rq:
-                    parts.append(f"      研究问题：{rq}")
-                if methods:
-                    parts.append(f"      方法：{methods}")
-                if concl:
-                    parts.append(f"      结论：{concl}")
+            block = _structured_block(tuple(state.paper_ids[:25]))
+            n += buf.write("\n")
+            buf.write(block[: max(0, max_chars - n)])
         except Exception:
             pass
-    text = "\n".join(parts)
-    return text[:max_chars] if len(text) > max_chars else text
+    return buf.getvalue()[:max_chars]
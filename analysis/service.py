@@ -1,29 +1,50 @@
 """
 分析与特征服务：单篇文献（关键词、态度、向量）与文献集合分析（聚类、共现、热点演化、态度演化）。
 与 DB 对接：可接收 paper_id 列表，从 DB 拉取元数据后分析；或直接接收 paper 列表。
-模型加载带超时，避免 Hugging Face 连接失败时仪表盘一直卡住。
+模型为进程级单例，应用启动时预热；加载失败只尝试一次，之后回退到简单规则，避免仪表盘反复卡在模型加载上。
 """
+import functools
+import itertools
 import json
 import os
+import re
+import sqlite3
+import sys
 import threading
+from array import array
 from collections import Counter, defaultdict
 from typing import Any
 
 from lit_review_app.retrieval.db import fetch_papers_by_ids, get_connection
-from lit_review_app.config.settings import LIT_DB_PATH, EMBED_MODEL, get_device
+from lit_review_app.config.settings import LIT_DB_PATH, EMBED_MODEL, configure_torch_threads, get_device
+from lit_review_app.data.schema import ensure_paper_cache
 
-_ANALYSIS_MODEL_LOAD_TIMEOUT = int(os.environ.get("LIT_ANALYSIS_MODEL_TIMEOUT", "45"))
+# 无 KeyBERT 时的关键词回退：预编译分词正则 + 停用词表
+_WORD_RE = re.compile(r"\b[a-zA-Z\u4e00-\u9fff]{2,}\b")
+_STOP = frozenset({
+    "the", "and", "for", "with", "this", "that", "from", "have", "has", "are", "was", "were", "been",
+    "being", "will", "would", "can", "could", "may", "might", "not", "but", "its", "their", "these",
+    "those", "which", "also", "into", "than", "such", "our", "we", "they", "is", "in", "of", "to",
+    "on", "by", "as", "at", "an", "or", "be", "it", "how", "what", "between", "based", "using", "study",
+    "paper", "results", "本文", "研究", "分析", "方法", "结果", "结论",
+})
 
+# 在线态度分类的候选标签（零样本）
+ATTITUDE_LABELS_EN = ["optimistic", "neutral", "critical", "concerned"]
 
+# 依赖探测只做一次：结果按进程缓存，避免每次调用都走 import 机制与 try/except。
+# 不在模块导入时立即解析，以免仅用到检索/接口的进程也被迫加载 torch/transformers。
+@functools.lru_cache(maxsize=1)
 def _try_import_ml():
     try:
         import numpy as np
-        from sklearn.cluster import KMeans
-        return np, KMeans
+        from sklearn.cluster import MiniBatchKMeans
+        return np, MiniBatchKMeans
     except ImportError:
         return None, None
 
 
+@functools.lru_cache(maxsize=1)
 def _try_import_keybert():
     try:
         from keybert import KeyBERT
@@ -32,6 +53,7 @@ def _try_import_keybert():
         return None
 
 
+@functools.lru_cache(maxsize=1)
 def _try_import_sentence_transformers():
     try:
         from sentence_transformers import SentenceTransformer
@@ -40,6 +62,7 @@ def _try_import_sentence_transformers():
         return None
 
 
+@functools.lru_cache(maxsize=1)
 def _try_import_zero_shot():
     try:
         from transformers import pipeline
@@ -48,63 +71,86 @@ def _try_import_zero_shot():
         return None
 
 
-class SinglePaperProcessor:
-    """单篇文献：关键词、态度/方法分类、向量（可选）。"""
+# 进程级模型单例：所有 SinglePaperProcessor / CollectionAnalyzer 实例共享，加载失败时缓存 False 不再重试
+_KW = None
+_EMBED = None
+_CLS = None
+_MODEL_LOCK = threading.Lock()
 
-    def __init__(self, device: str = "cpu"):
-        self._kw_model = None
-        self._embed_model = None
-        self._classifier = None
-        self._device = device
 
-    def _ensure_kw(self):
-        if self._kw_model is None:
-            kb = _try_import_keybert()
-            if kb:
-                self._kw_model = kb()
-            else:
-                self._kw_model = False  # 无 KeyBERT 时用简单抽取
-        return self._kw_model
+def _load_keybert():
+    global _KW
+    if _KW is None:
+        with _MODEL_LOCK:
+            if _KW is None:
+                kb = _try_import_keybert()
+                try:
+                    _KW = kb() if kb else False  # 无 KeyBERT 时用简单抽取
+                except Exception:
+                    _KW = False
+    return _KW
 
-    def _ensure_embed(self):
-        if self._embed_model is None:
-            result = [None]
-            def load():
+
+def _load_embed(device: str):
+    global _EMBED
+    if _EMBED is None:
+        with _MODEL_LOCK:
+            if _EMBED is None:
                 st = _try_import_sentence_transformers()
                 if st and EMBED_MODEL:
+                    configure_torch_threads()
                     try:
-                        result[0] = st(EMBED_MODEL, device=self._device)
+                        _EMBED = st(EMBED_MODEL, device=device)
                     except Exception:
-                        result[0] = False
+                        _EMBED = False
                 else:
-                    result[0] = False
-            th = threading.Thread(target=load, daemon=True)
-            th.start()
-            th.join(timeout=_ANALYSIS_MODEL_LOAD_TIMEOUT)
-            self._embed_model = result[0] if not th.is_alive() and result[0] is not None else False
-        return self._embed_model
+                    _EMBED = False
+    return _EMBED
 
-    def _ensure_classifier(self):
-        if self._classifier is None:
-            result = [None]
-            def load():
+
+def _load_classifier(device: str):
+    global _CLS
+    if _CLS is None:
+        with _MODEL_LOCK:
+            if _CLS is None:
                 pipe = _try_import_zero_shot()
                 if pipe:
+                    configure_torch_threads()
                     try:
-                        result[0] = pipe(
+                        _CLS = pipe(
                             "zero-shot-classification",
                             model="facebook/bart-large-mnli",
-                            device=0 if self._device == "cuda" else -1,
+                            device=0 if device == "cuda" else -1,
                         )
                     except Exception:
-                        result[0] = False
+                        _CLS = False
                 else:
-                    result[0] = False
-            th = threading.Thread(target=load, daemon=True)
-            th.start()
-            th.join(timeout=_ANALYSIS_MODEL_LOAD_TIMEOUT)
-            self._classifier = result[0] if not th.is_alive() and result[0] is not None else False
-        return self._classifier
+                    _CLS = False
+    return _CLS
+
+
+def warmup_models(device: str | None = None) -> None:
+    """进程启动时预加载分析用模型，避免首个仪表盘请求承担加载耗时。"""
+    device = device or get_device()
+    _load_keybert()
+    _load_embed(device)
+    _load_classifier(device)
+
+
+class SinglePaperProcessor:
+    """单篇文献：关键词、态度/方法分类、向量（可选）。模型为进程级单例。"""
+
+    def __init__(self, device: str = "cpu"):
+        self._device = device
+
+    def _ensure_kw(self):
+        return _load_keybert()
+
+    def _ensure_embed(self):
+        return _load_embed(self._device)
+
+    def _ensure_classifier(self):
+        return _load_classifier(self._device)
 
     def extract_keywords(self, text: str, top_n: int = 5) -> list[str]:
         if not text or not text.strip():
@@ -115,20 +161,56 @@ class SinglePaperProcessor:
                 text, keyphrase_ngram_range=(1, 2), stop_words="english", top_n=top_n
             )
             return [k[0] for k in kw]
-        # 简单回退：按词频取前几
-        import re
-        words = re.findall(r"\b[a-zA-Z\u4e00-\u9fff]{2,}\b", text)
-        cnt = Counter(words)
+        # 简单回退：按词频取前几（去停用词，避免 the/and 等进入共现网络）
+        cnt = Counter(w for w in (m.lower() for m in _WORD_RE.findall(text)) if w not in _STOP)
         return [w for w, _ in cnt.most_common(top_n)]
 
+    def extract_keywords_batch(self, texts: list[str], top_n: int = 5) -> list[list[str]]:
+        """批量抽取关键词：KeyBERT 接收文档列表，一次性编码全部文档与候选词。"""
+        out: list[list[str]] = [[] for _ in texts]
+        idx = [i for i, t in enumerate(texts) if t and t.strip()]
+        if not idx:
+            return out
+        model = self._ensure_kw()
+        if not model:
+            for i in idx:
+                out[i] = self.extract_keywords(texts[i], top_n=top_n)
+            return out
+        docs = [texts[i] for i in idx]
+        res = model.extract_keywords(
+            docs, keyphrase_ngram_range=(1, 2), stop_words="english", top_n=top_n
+        )
+        # 单篇输入时 KeyBERT 返回扁平列表
+        if len(docs) == 1:
+            res = [res]
+        for i, kw in zip(idx, res):
+            out[i] = [k[0] for k in kw]
+        return out
+
     def get_embedding(self, text: str) -> list[float] | None:
         if not text or not text.strip():
             return None
+        return self.get_embeddings([text])[0]
+
+    def get_embeddings(self, texts: list[str], batch_size: int = 32) -> list[list[float] | None]:
+        """批量编码：一次 model.encode 处理全部文本，摊薄逐条调用的分词与 Python 开销。"""
+        out: list[list[float] | None] = [None] * len(texts)
+        idx = [i for i, t in enumerate(texts) if t and t.strip()]
+        if not idx:
+            return out
         model = self._ensure_embed()
         if not model:
-            return None
-        emb = model.encode(text[:2000])
-        return emb.tolist()
+            return out
+        embs = model.encode(
+            [texts[i][:2000] for i in idx],
+            batch_size=batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        )
+        for i, emb in zip(idx, embs):
+            out[i] = emb.tolist()
+        return out
 
     def classify_attitude(self, text: str) -> str:
         if not text or not text.strip():
@@ -136,8 +218,7 @@ class SinglePaperProcessor:
         pipe = self._ensure_classifier()
         if not pipe:
             return "neutral"
-        labels = ["optimistic", "neutral", "critical", "concerned"]
-        res = pipe(text[:500], candidate_labels=labels)
+        res = pipe(text[:500], candidate_labels=ATTITUDE_LABELS_EN)
         return res["labels"][0] if res else "neutral"
 
     def process_paper(self, paper_id: str, title: str, abstract: str) -> dict[str, Any]:
@@ -154,39 +235,280 @@ class SinglePaperProcessor:
         }
 
 
+def _count_cooccurrence(keyword_lists: list[list[str]]) -> tuple[Counter, Counter]:
+    """
+    统计词频与两两共现次数。优先用稀疏矩阵：文献×关键词二值矩阵 M，C = M.T @ M 的上三角即共现计数，
+    避免 Python 双重循环逐对构造元组；scipy/numpy 不可用时回退到 itertools.combinations + Counter.update。
+    """
+    word_counts = Counter()
+    pair_counts = Counter()
+    try:
+        import numpy as np
+        from scipy.sparse import csr_matrix
+    except ImportError:
+        for kws in keyword_lists:
+            # 篇内去重并排序后 combinations 直接产出有序词对；intern 后元组哈希/比较更快
+            kws = sorted({sys.intern(k) for k in kws})
+            word_counts.update(kws)
+            pair_counts.update(itertools.combinations(kws, 2))
+        return word_counts, pair_counts
+
+    vocab: dict[str, int] = {}
+    rows, cols = [], []
+    for r, kws in enumerate(keyword_lists):
+        for kw in set(kws):
+            rows.append(r)
+            cols.append(vocab.setdefault(kw, len(vocab)))
+    if not vocab:
+        return word_counts, pair_counts
+    words = list(vocab)
+    m = csr_matrix(
+        (np.ones(len(rows), dtype=np.int32), (rows, cols)),
+        shape=(len(keyword_lists), len(words)),
+    )
+    for i, c in enumerate(np.asarray(m.sum(axis=0)).ravel()):
+        word_counts[words[i]] = int(c)
+    c = (m.T @ m).tocoo()
+    for i, j, w in zip(c.row, c.col, c.data):
+        if i < j:
+            u, v = words[i], words[j]
+            pair_counts[(u, v) if u <= v else (v, u)] = int(w)
+    return word_counts, pair_counts
+
+
+class _PaperColumns:
+    """
+    文献集合的列式（SoA）表示：年份、态度、研究方法为并行数组，关键词为 CSR（kw_indptr/kw_indices）+ 共享词表。
+    仪表盘的分组计数用 np.bincount / np.add.at 完成，不再逐篇访问 dict 累加 Counter。词表按首次出现顺序编号。
+    """
+
+    def __init__(self, np, papers: list[dict]):
+        self.np = np
+        n = len(papers)
+        years = np.zeros(n, dtype=np.int16)
+        has_year = np.zeros(n, dtype=bool)
+        att_map: dict = {}
+        meth_map: dict = {}
+        kw_map: dict = {}
+        att_idx, meth_idx, kw_indices = [], [], []
+        kw_indptr = [0]
+        for i, p in enumerate(papers):
+            y = p.get("year")
+            if y is not None:
+                try:
+                    years[i] = int(y)
+                    has_year[i] = True
+                except (TypeError, ValueError, OverflowError):
+                    pass
+            feats = p.get("features") or {}
+            att_idx.append(att_map.setdefault(feats.get("attitude", "谨慎中性"), len(att_map)))
+            meth = feats.get("methods_label") or p.get("methods_label") or "其他"
+            meth_idx.append(meth_map.setdefault(meth, len(meth_map)))
+            for kw in p.get("keywords") or []:
+                kw_indices.append(kw_map.setdefault(kw, len(kw_map)))
+            kw_indptr.append(len(kw_indices))
+        self.years = years
+        self.has_year = has_year
+        self.att_vocab = list(att_map)
+        self.att_idx = np.asarray(att_idx, dtype=np.int8 if len(att_map) < 128 else np.int32)
+        self.meth_vocab = list(meth_map)
+        self.meth_idx = np.asarray(meth_idx, dtype=np.int32)
+        self.kw_vocab = list(kw_map)
+        self.kw_indptr = np.asarray(kw_indptr, dtype=np.int32)
+        self.kw_indices = np.asarray(kw_indices, dtype=np.int32)
+
+    def year_groups(self):
+        """返回 (有年份文献的年份组下标, 升序去重年份)。"""
+        uniq, inv = self.np.unique(self.years[self.has_year], return_inverse=True)
+        return inv, uniq
+
+
 class CollectionAnalyzer:
     """文献集合分析：聚类、共现网络、热点演化、态度演化。"""
 
     def __init__(self, single_processor: SinglePaperProcessor | None = None):
         self.processor = single_processor or SinglePaperProcessor(device=get_device())
+        # (源列表, 列式表示) 作为一个元组整体替换，实例被多个工作线程共用时不会读到错配的两半
+        self._cols_cache: "tuple[list[dict], _PaperColumns] | None" = None
 
     def _enrich_papers(self, papers: list[dict]) -> list[dict]:
-        """为缺少 keywords/vector/features 的 paper 补全。"""
+        """
+        为缺少 keywords/vector/features 的 paper 补全；关键词与向量先收集缺失项，再各做一次批量计算。
+        结果带 _enriched 标记：已补全的列表再次传入时原样返回，不重复拷贝，便于仪表盘各分析方法共用同一份列表。
+        """
+        if papers and all(p.get("_enriched") for p in papers):
+            return papers
         out = []
+        need_kw: list[tuple[int, str]] = []
+        need_vec: list[tuple[int, str]] = []
+        need_att: list[tuple[int, str]] = []
         for p in papers:
             pid = p.get("paper_id") or p.get("id")
             title = p.get("title") or ""
             abstract = p.get("abstract") or ""
             if not pid:
                 continue
-            if "keywords" not in p or not p["keywords"]:
-                full = f"{title}. {abstract}"
-                p = dict(p)
-                p["keywords"] = self.processor.extract_keywords(full, top_n=5)
-            if "vector" not in p or p["vector"] is None:
-                full = f"{title}. {abstract}"
-                p = dict(p)
-                p["vector"] = self.processor.get_embedding(full)
+            if p.get("_enriched"):
+                out.append(p)
+                continue
+            p = dict(p)
+            full = f"{title}. {abstract}"
+            if not p.get("keywords"):
+                need_kw.append((len(out), full))
+            if p.get("vector") is None:
+                need_vec.append((len(out), full))
             if "features" not in p or not p["features"]:
-                p = dict(p)
-                att = p.get("attitude_label") or self.processor.classify_attitude(abstract or title)
+                att = p.get("attitude_label")
+                if not att:
+                    need_att.append((len(out), abstract or title))
                 p["features"] = {"attitude": att, "methods_label": p.get("methods_label", "")}
             else:
-                p = dict(p)
+                p["features"] = dict(p["features"])
                 p["features"]["attitude"] = p.get("attitude_label") or (p["features"].get("attitude") or "谨慎中性")
                 p["features"]["methods_label"] = p.get("methods_label") or p["features"].get("methods_label", "")
             p["id"] = pid
+            p["_enriched"] = True
             out.append(p)
+        if not (need_kw or need_vec or need_att):
+            return out
+        # 先查 paper_cache，只对未命中的文献跑模型，算完再写回
+        cached = self._load_cached_features({out[i]["id"] for i, _ in need_kw + need_vec + need_att})
+        rest = []
+        for i, t in need_kw:
+            kw = (cached.get(out[i]["id"]) or {}).get("keywords")
+            if kw:
+                out[i]["keywords"] = kw
+            else:
+                rest.append((i, t))
+        need_kw = rest
+        rest = []
+        for i, t in need_vec:
+            vec = (cached.get(out[i]["id"]) or {}).get("vector")
+            if vec:
+                out[i]["vector"] = vec
+            else:
+                rest.append((i, t))
+        need_vec = rest
+        rest = []
+        for i, t in need_att:
+            att = (cached.get(out[i]["id"]) or {}).get("attitude")
+            if att:
+                out[i]["features"]["attitude"] = att
+            else:
+                rest.append((i, t))
+        need_att = rest
+
+        computed: dict[str, dict] = defaultdict(dict)
+        if need_kw:
+            kws = self.processor.extract_keywords_batch([t for _, t in need_kw], top_n=5)
+            for (i, _), kw in zip(need_kw, kws):
+                out[i]["keywords"] = kw
+                if kw:
+                    computed[out[i]["id"]]["keywords"] = kw
+        if need_vec:
+            vecs = self.processor.get_embeddings([t for _, t in need_vec])
+            for (i, _), vec in zip(need_vec, vecs):
+                out[i]["vector"] = vec
+                if vec:
+                    computed[out[i]["id"]]["vector"] = vec
+        if need_att:
+            atts = self._batch_classify_attitudes([t for _, t in need_att])
+            for (i, _), att in zip(need_att, atts):
+                out[i]["features"]["attitude"] = att
+                # 分类器不可用时的默认值不入缓存，模型恢复后可重新计算
+                if self.processor._ensure_classifier():
+                    computed[out[i]["id"]]["attitude"] = att
+        if computed:
+            self._store_cached_features(computed)
+        return out
+
+    def _load_cached_features(self, pids: set[str]) -> dict[str, dict]:
+        """一次 IN 查询取回 paper_cache 中的关键词/向量/态度；向量仅在编码模型一致时使用。"""
+        if not pids:
+            return {}
+        try:
+            conn = get_connection()
+            try:
+                ensure_paper_cache(conn)
+                ids = list(pids)
+                placeholders = ",".join("?" * len(ids))
+                rows = conn.execute(
+                    f"SELECT paper_id, embed_model, vector, keywords_json, attitude FROM paper_cache WHERE paper_id IN ({placeholders})",
+                    ids,
+                ).fetchall()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return {}
+        out = {}
+        for pid, embed_model, blob, kw_json, att in rows:
+            vec = None
+            if blob and embed_model == EMBED_MODEL:
+                arr = array("f")
+                arr.frombytes(blob)
+                vec = arr.tolist()
+            out[pid] = {
+                "keywords": json.loads(kw_json) if kw_json else None,
+                "vector": vec,
+                "attitude": att or None,
+            }
+        return out
+
+    def _store_cached_features(self, computed: dict[str, dict]) -> None:
+        """executemany 写回新算出的特征；已有列不被空值覆盖。"""
+        rows = []
+        for pid, f in computed.items():
+            vec = f.get("vector")
+            kw = f.get("keywords")
+            rows.append((
+                pid,
+                EMBED_MODEL if vec else None,
+                array("f", vec).tobytes() if vec else None,
+                json.dumps(kw, ensure_ascii=False) if kw else None,
+                f.get("attitude"),
+            ))
+        try:
+            conn = get_connection()
+            try:
+                ensure_paper_cache(conn)
+                conn.executemany(
+                    """
+                    INSERT INTO paper_cache(paper_id, embed_model, vector, keywords_json, attitude)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(paper_id) DO UPDATE SET
+                        embed_model=COALESCE(excluded.embed_model, embed_model),
+                        vector=COALESCE(excluded.vector, vector),
+                        keywords_json=COALESCE(excluded.keywords_json, keywords_json),
+                        attitude=COALESCE(excluded.attitude, attitude)
+                    """,
+                    rows,
+                )
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            pass
+
+    def _batch_classify_attitudes(self, texts: list[str]) -> list[str]:
+        """批量态度分类：一次 pipeline 调用处理全部文本，由 HF pipeline 内部分批前向。"""
+        out = ["neutral"] * len(texts)
+        idx = [i for i, t in enumerate(texts) if t and t.strip()]
+        if not idx:
+            return out
+        pipe = self.processor._ensure_classifier()
+        if not pipe:
+            return out
+        # 零样本 pipeline 不接受 truncation 参数，输入长度由前 500 字符截断控制（与单条 classify_attitude 一致）
+        res = pipe(
+            [texts[i][:500] for i in idx],
+            candidate_labels=ATTITUDE_LABELS_EN,
+            batch_size=16,
+        )
+        if isinstance(res, dict):
+            res = [res]
+        for i, r in zip(idx, res):
+            if r and r.get("labels"):
+                out[i] = r["labels"][0]
         return out
 
     def perform_clustering(
@@ -195,8 +517,8 @@ class CollectionAnalyzer:
         papers = self._enrich_papers(papers)
         if not papers:
             return {"clusters": []}
-        np, KMeans = _try_import_ml()
-        if not np or not KMeans:
+        np, MiniBatchKMeans = _try_import_ml()
+        if not np or not MiniBatchKMeans:
             return {"clusters": []}
         vectors = []
         valid = []
@@ -207,9 +529,12 @@ class CollectionAnalyzer:
                 valid.append(p)
         if not vectors:
             return {"clusters": []}
-        X = np.array(vectors)
+        # float32 + 行归一化：带宽减半，且欧氏距离≈余弦距离，与向量语义一致
+        X = np.ascontiguousarray(vectors, dtype=np.float32)
+        X /= np.linalg.norm(X, axis=1, keepdims=True) + 1e-9
         n = min(n_clusters, len(vectors))
-        kmeans = KMeans(n_clusters=n, random_state=42, n_init=10)
+        # 集合规模通常 ≤80 篇，MiniBatchKMeans 3 次初始化足够，远快于 KMeans(n_init=10)
+        kmeans = MiniBatchKMeans(n_clusters=n, n_init=3, batch_size=256, random_state=42)
         labels = kmeans.fit_predict(X)
         clusters = defaultdict(list)
         for i, label in enumerate(labels):
@@ -235,15 +560,7 @@ class CollectionAnalyzer:
         self, papers: list[dict], min_weight: int = 1
     ) -> dict[str, Any]:
         papers = self._enrich_papers(papers)
-        pair_counts = Counter()
-        word_counts = Counter()
-        for p in papers:
-            kws = p.get("keywords") or []
-            word_counts.update(kws)
-            for i in range(len(kws)):
-                for j in range(i + 1, len(kws)):
-                    pair = tuple(sorted([kws[i], kws[j]]))
-                    pair_counts[pair] += 1
+        word_counts, pair_counts = _count_cooccurrence([p.get("keywords") or [] for p in papers])
         valid_nodes = set()
         for (u, v), w in pair_counts.items():
             if w >= min_weight:
@@ -267,10 +584,37 @@ class CollectionAnalyzer:
                 links.append({"source": u, "target": v, "value": w})
         return {"nodes": nodes, "links": links}
 
+    def _columns(self, papers: list[dict]) -> "_PaperColumns | None":
+        """同一份（已补全的）文献列表只转换一次列式表示；无 numpy 时返回 None 走逐篇 Counter 计数。"""
+        np, _ = _try_import_ml()
+        if np is None:
+            return None
+        cached = self._cols_cache
+        if cached is None or cached[0] is not papers:
+            cached = (papers, _PaperColumns(np, papers))
+            self._cols_cache = cached
+        return cached[1]
+
     def analyze_trends(self, papers: list[dict]) -> dict[str, Any]:
         papers = self._enrich_papers(papers)
         if not papers:
             return {"years": [], "series": []}
+        cols = self._columns(papers)
+        if cols is not None:
+            np = cols.np
+            ys, uniq = cols.year_groups()
+            # 每个关键词条目所属文献 → 年份组；无年份的文献不计入
+            owner = np.repeat(np.arange(len(cols.years)), np.diff(cols.kw_indptr))
+            row_of = np.full(len(cols.years), -1, dtype=np.int32)
+            row_of[cols.has_year] = ys
+            rows = row_of[owner]
+            keep = rows >= 0
+            year_kw = np.zeros((len(uniq), len(cols.kw_vocab)), dtype=np.int32)
+            np.add.at(year_kw, (rows[keep], cols.kw_indices[keep]), 1)
+            totals = year_kw.sum(axis=0)
+            top = [int(i) for i in np.argsort(-totals, kind="stable")[:10] if totals[i] > 0]
+            series = [{"name": cols.kw_vocab[i], "data": year_kw[:, i].tolist()} for i in top]
+            return {"years": uniq.tolist(), "series": series}
         year_kw = defaultdict(lambda: Counter())
         years_set = set()
         for p in papers:
@@ -299,6 +643,18 @@ class CollectionAnalyzer:
         papers = self._enrich_papers(papers)
         if not papers:
             return {"years": [], "series": []}
+        cols = self._columns(papers)
+        if cols is not None:
+            np = cols.np
+            ys, uniq = cols.year_groups()
+            year_att = np.zeros((len(uniq), len(cols.att_vocab)), dtype=np.int32)
+            np.add.at(year_att, (ys, cols.att_idx[cols.has_year]), 1)
+            present = np.flatnonzero(year_att.sum(axis=0))
+            series = [
+                {"name": cols.att_vocab[a], "data": year_att[:, a].tolist(), "type": "bar", "stack": "total"}
+                for a in sorted(present.tolist(), key=lambda a: cols.att_vocab[a])
+            ]
+            return {"years": uniq.tolist(), "series": series}
         year_att = defaultdict(Counter)
         years_set = set()
         for p in papers:
@@ -328,6 +684,23 @@ class CollectionAnalyzer:
     ) -> dict[str, Any]:
         """规格 4.2.2：返回仪表盘所需 yearlyCounts, topKeywords, attitudeDistribution, researchPathDistribution（研究方法分布）。"""
         papers = self._enrich_papers(papers)
+        cols = self._columns(papers)
+        if cols is not None:
+            np = cols.np
+            ys, uniq = cols.year_groups()
+            yearly = np.bincount(ys, minlength=len(uniq))
+            kw_counts = np.bincount(cols.kw_indices, minlength=len(cols.kw_vocab))
+            att_counts = np.bincount(cols.att_idx, minlength=len(cols.att_vocab))
+            meth_counts = np.bincount(cols.meth_idx, minlength=len(cols.meth_vocab))
+            # 稳定排序 + 词表按首次出现顺序编号，与 Counter.most_common 的并列次序一致
+            top_kw = np.argsort(-kw_counts, kind="stable")[:10]
+            top_meth = np.argsort(-meth_counts, kind="stable")[:10]
+            return {
+                "yearlyCounts": [{"year": int(y), "count": int(c)} for y, c in zip(uniq, yearly)],
+                "topKeywords": [{"name": cols.kw_vocab[i], "value": int(kw_counts[i])} for i in top_kw],
+                "attitudeDistribution": [{"name": a, "value": int(c)} for a, c in zip(cols.att_vocab, att_counts)],
+                "researchPathDistribution": [{"name": cols.meth_vocab[i], "value": int(meth_counts[i])} for i in top_meth],
+            }
         yearly = Counter()
         kw_counter = Counter()
         att_counter = Counter()
@@ -357,3 +730,16 @@ class CollectionAnalyzer:
             "attitudeDistribution": attitudeDistribution,
             "researchPathDistribution": researchPathDistribution,
         }
+
+
+_ANALYZER: CollectionAnalyzer | None = None
+
+
+def get_collection_analyzer() -> CollectionAnalyzer:
+    """进程级共享的 CollectionAnalyzer，避免每个请求重复构造。"""
+    global _ANALYZER
+    if _ANALYZER is None:
+        with _MODEL_LOCK:
+            if _ANALYZER is None:
+                _ANALYZER = CollectionAnalyzer()
+    return _ANALYZER
@@ -2,70 +2,107 @@
 统一 FastAPI 应用：检索、分析仪表盘、分析助理问答、综述生成。
 与前端 web_config 的 realApi 契约对齐：searchPapers, getDashboardStats, askAnalysisAssistant。
 """
+import asyncio
+import functools
+import json
 import logging
+import mimetypes
+import os
 import re
+import threading
 import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
-from fastapi import FastAPI, Query
+from fastapi import FastAPI, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException as StarletteHTTPException
 from typing import Optional
 
+# JSON 编解码优先用 orjson（C 实现，大响应体序列化快数倍）；未安装时回退标准库
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse as _DefaultResponse
+
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+except ImportError:
+    from fastapi.responses import JSONResponse as _DefaultResponse
+
+    _json_loads = json.loads
+
+    def _json_dumps(obj) -> str:
+        return json.dumps(obj, ensure_ascii=False)
+
 from lit_review_app.retrieval.search import search_with_distributions
-from lit_review_app.retrieval.db import fetch_features, fetch_papers_with_structured, get_connection
-from lit_review_app.analysis.service import CollectionAnalyzer
+from lit_review_app.retrieval.db import (
+    close_all_connections,
+    fetch_features_and_structured,
+    get_connection,
+    select_in_id_order,
+)
+from lit_review_app.analysis.service import CollectionAnalyzer, get_collection_analyzer, warmup_models
 from lit_review_app.agent.tools import search_papers, get_analysis_for_state
 from lit_review_app.agent.review_generator import (
     answer_question_with_rag,
     generate_review_fast,
+    stream_answer_question,
+    stream_review_fast,
     refine_review_with_chat,
     draft_to_latex_via_llm,
+    close_llm_client,
 )
+from lit_review_app.api.latex_export import draft_to_latex
+
+
+# 摘要元数据拆分用到的正则，模块加载时编译一次
+_RE_ABSTRACT_PREFIX = re.compile(r"^[\s\ufeff]*(\[?\s*摘要\s*\]?|[\［\[]?\s*摘要\s*[\］\]]?)\s*", re.I)
+_RE_META_TAG = re.compile(r"\[\s*(关键词|中图分类号|文献标识码|文章编号|DOI)\s*\]([^\[]*)", re.I)
+_META_TAG_KEYS = {"关键词": "keywords", "中图分类号": "clc", "文献标识码": "docCode", "文章编号": "articleId", "DOI": "doi"}
+_RE_MULTISPACE = re.compile(r"\s+")
+# 摘要开头需剥去的空白与方括号（含全角）
+_LEAD_CHARS = " \t\n\r[]［］\ufeff"
 
 
-def _parse_abstract_meta(raw: str) -> tuple[str, dict]:
+@functools.lru_cache(maxsize=8192)
+def _parse_abstract_meta(raw: str) -> tuple[str, tuple[tuple[str, str], ...]]:
     """
-    从原始摘要中拆出正文与元数据块，返回 (正文, { keywords, clc, docCode, articleId })。
-    便于前端分框展示，不混在一起。
+    从原始摘要中拆出正文与元数据块，返回 (正文, ((键, 值), ...))，键为 keywords/clc/docCode/articleId。
+    便于前端分框展示，不混在一起。纯函数，按原始摘要缓存；返回可哈希元组，调用方按需 dict(...)。
     """
     if not raw or not isinstance(raw, str):
-        return "", {}
+        return "", ()
     s = raw.strip()
     # 去掉开头的 [摘要]、摘要]、] 等常见前缀（含全角、空白）
-    s = re.sub(r"^[\s\ufeff]*(\[?\s*摘要\s*\]?|[\［\[]?\s*摘要\s*[\］\]]?)\s*", "", s, flags=re.I)
-    while s and s[0] in " \t\n\r[]［］［\ufeff":
-        s = s[1:]
+    s = _RE_ABSTRACT_PREFIX.sub("", s)
+    s = s.lstrip(_LEAD_CHARS)
+    # 一次线性扫描取出 [关键词][中图分类号][文献标识码][文章编号][DOI] 各标签（每类取第一个），其余片段拼成正文
     meta = {}
-    # 提取 [关键词] 或 ［关键词］ ...（到下一个 [ 或结尾），允许标签内少量空格
-    m = re.search(r"\[[\s]*关键词[\s]*\]([^\[]*)", s, re.I)
-    if m:
-        meta["keywords"] = m.group(1).strip()
-        s = s[: m.start()] + s[m.end() :]
-    m = re.search(r"\[[\s]*中图分类号[\s]*\]([^\[]*)", s, re.I)
-    if m:
-        meta["clc"] = m.group(1).strip()
-        s = s[: m.start()] + s[m.end() :]
-    m = re.search(r"\[[\s]*文献标识码[\s]*\]([^\[]*)", s, re.I)
-    if m:
-        meta["docCode"] = m.group(1).strip()
-        s = s[: m.start()] + s[m.end() :]
-    m = re.search(r"\[[\s]*文章编号[\s]*\]([^\[]*)", s, re.I)
-    if m:
-        meta["articleId"] = m.group(1).strip()
-        s = s[: m.start()] + s[m.end() :]
-    m = re.search(r"\[DOI\]([^\[]*)", s, re.I)
-    if m:
-        s = s[: m.start()] + s[m.end() :]
-    body = re.sub(r"\s+", " ", s).strip()
-    # 再次去掉可能残留的前导 ]、］ 等（如原文本为 "] 作为..." 且前一步未完全去掉时）
-    while body and body[0] in "]］":
-        body = body[1:].strip()
-    return body, meta
+    parts = []
+    last_end = 0
+    for m in _RE_META_TAG.finditer(s):
+        key = _META_TAG_KEYS[m.group(1).upper()]
+        if key in meta:
+            continue
+        parts.append(s[last_end : m.start()])
+        last_end = m.end()
+        meta[key] = m.group(2).strip()
+    parts.append(s[last_end:])
+    meta.pop("doi", None)
+    body = _RE_MULTISPACE.sub(" ", "".join(parts)).strip()
+    # 再次去掉可能残留的前导 ]、］ 等（如原文本为 "] 作为..." 且前一步未完全去掉时）；空白已归一为单个空格
+    body = body.lstrip("]］ ")
+    return body, tuple(meta.items())
 
 
 def _clean_abstract_for_display(raw: str) -> str:
@@ -74,7 +111,26 @@ def _clean_abstract_for_display(raw: str) -> str:
     return body
 
 
-app = FastAPI(title="文献分析与综述助手 API")
+def _warmup_analysis_models() -> None:
+    """启动时预加载分析模型（进程级单例）；LIT_WARMUP_MODELS=0 可跳过（如本地调试接口）。"""
+    if os.environ.get("LIT_WARMUP_MODELS", "1") == "0":
+        return
+    t0 = time.perf_counter()
+    warmup_models()
+    logger.info("analysis models warmed up in %.2fs", time.perf_counter() - t0)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用生命周期：启动时在线程中预热模型并创建共享分析器；关闭时释放共享的大模型 HTTP 客户端与各线程的 SQLite 连接。"""
+    await asyncio.to_thread(_warmup_analysis_models)
+    app.state.analyzer = get_collection_analyzer()
+    yield
+    await close_llm_client()
+    close_all_connections()
+
+
+app = FastAPI(title="文献分析与综述助手 API", lifespan=lifespan, default_response_class=_DefaultResponse)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -84,10 +140,28 @@ app.add_middleware(
 )
 
 
+class _GZipDynamic:
+    """动态响应按需 gzip；SSE 流（逐段推送，压缩会攒包）与已预压缩的 /assets 直接放行。"""
+
+    def __init__(self, app, minimum_size: int = 1024):
+        self.app = app
+        self.gzip = GZipMiddleware(app, minimum_size=minimum_size)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and not (scope["path"].startswith("/assets/") or scope["path"].endswith("/stream")):
+            await self.gzip(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+
+app.add_middleware(_GZipDynamic, minimum_size=1024)
+
+
 def _paper_to_frontend(p: dict, include_structured: bool = False) -> dict:
     """将内部 paper 转为前端 Paper 格式；摘要与元数据分拆，便于详情分框展示。"""
     raw_abstract = p.get("abstract", "") or ""
-    abstract_body, abstract_meta = _parse_abstract_meta(raw_abstract)
+    abstract_body, meta_items = _parse_abstract_meta(raw_abstract)
+    abstract_meta = dict(meta_items)
     out = {
         "id": p.get("paper_id", ""),
         "title": p.get("title", ""),
@@ -113,8 +187,40 @@ def _paper_to_frontend(p: dict, include_structured: bool = False) -> dict:
 
 # ---------- 与前端 realApi 对齐的接口 ----------
 
+# 检索结果短时缓存：同一主题翻页/切换视图时不重复跑多路检索与融合
+SEARCH_CACHE_TTL = float(os.environ.get("LIT_SEARCH_CACHE_TTL", "60"))
+SEARCH_CACHE_SIZE = 512
+_search_cache: "OrderedDict[tuple, tuple[float, dict]]" = OrderedDict()
+_search_cache_lock = threading.Lock()
+
+
+def _cached_search(q: str, start_year: int | None, end_year: int | None, limit: int) -> dict:
+    """带 TTL 的 search_with_distributions；命中时返回缓存结果（调用方不得原地修改其中的 dict）。"""
+    key = (q, start_year, end_year, limit)
+    now = time.monotonic()
+    with _search_cache_lock:
+        hit = _search_cache.get(key)
+        if hit and now - hit[0] < SEARCH_CACHE_TTL:
+            _search_cache.move_to_end(key)
+            return hit[1]
+    out = search_with_distributions(
+        q=q,
+        start_year=start_year,
+        end_year=end_year,
+        limit=limit,
+        use_query_understanding=True,
+    )
+    if SEARCH_CACHE_TTL > 0:
+        with _search_cache_lock:
+            _search_cache[key] = (now, out)
+            _search_cache.move_to_end(key)
+            while len(_search_cache) > SEARCH_CACHE_SIZE:
+                _search_cache.popitem(last=False)
+    return out
+
+
 @app.get("/api/search")
-def api_search(
+async def api_search(
     topic: Optional[str] = Query(None),
     startYear: Optional[int] = Query(None),
     endYear: Optional[int] = Query(None),
@@ -124,14 +230,9 @@ def api_search(
     """
     规格 4.3 输出：候选列表（含 topicId、可选结构化摘要）+ 主题分布 + 年份分布。
     """
-    out = search_with_distributions(
-        q=topic or "",
-        start_year=startYear,
-        end_year=endYear,
-        limit=200,
-        use_query_understanding=True,
-    )
-    results = out.get("results", [])
+    out = await asyncio.to_thread(_cached_search, topic or "", startYear, endYear, 200)
+    # 结果可能来自缓存，下面会补充字段，先浅拷贝
+    results = [dict(r) for r in out.get("results", [])]
     if not results:
         return {
             "results": [],
@@ -140,16 +241,13 @@ def api_search(
             "yearDistribution": out.get("year_distribution", []),
         }
     pids = [r["paper_id"] for r in results]
-    features = fetch_features(pids)
-    for r in results:
-        r["topic_id"] = (features.get(r["paper_id"], {}) or {}).get("topic_id", "") or ""
+    # topic_id 与结构化摘要一次 LEFT JOIN 查询取回
+    extras = await asyncio.to_thread(fetch_features_and_structured, pids, bool(includeStructured))
+    blank = {"topic_id": ""}
     if includeStructured:
-        structured_list = fetch_papers_with_structured(pids)
-        by_id = {s["paper_id"]: s for s in structured_list}
-        for r in results:
-            s = by_id.get(r["paper_id"], {})
-            for k in ("background", "research_question", "methods", "conclusions", "contributions", "limitations"):
-                r[k] = s.get(k, "") or ""
+        blank.update(dict.fromkeys(("background", "research_question", "methods", "conclusions", "contributions", "limitations"), ""))
+    for r in results:
+        r.update(extras.get(r["paper_id"], blank))
     return {
         "results": [_paper_to_frontend(p, include_structured=includeStructured) for p in results],
         "total": out.get("total", 0),
@@ -158,8 +256,45 @@ def api_search(
     }
 
 
+# 仪表盘共现网络/热点演化/态度演化的短时缓存，键为 (主题, 起始年, 结束年)
+DASHBOARD_CACHE_TTL = float(os.environ.get("LIT_DASHBOARD_CACHE_TTL", "60"))
+DASHBOARD_CACHE_SIZE = 256
+_dashboard_cache: "OrderedDict[tuple, tuple[float, tuple[dict, dict, dict]]]" = OrderedDict()
+_dashboard_cache_lock = threading.Lock()
+
+
+def _collection_views(analyzer: CollectionAnalyzer, papers: list[dict]) -> tuple[dict, dict, dict]:
+    """仪表盘的共现网络、热点演化、态度演化（CPU 计算，放在工作线程中执行）。"""
+    if not papers:
+        return {"nodes": [], "links": []}, {"years": [], "series": []}, {"years": [], "series": []}
+    return (
+        analyzer.build_cooccurrence_network(papers, min_weight=1),
+        analyzer.analyze_trends(papers),
+        analyzer.analyze_attitude_evolution(papers),
+    )
+
+
+def _cached_collection_views(key: tuple, analyzer: CollectionAnalyzer, papers: list[dict]) -> tuple[dict, dict, dict]:
+    """带 TTL 的 _collection_views；同一主题与年份范围在有效期内直接复用上次结果。"""
+    now = time.monotonic()
+    with _dashboard_cache_lock:
+        hit = _dashboard_cache.get(key)
+        if hit and now - hit[0] < DASHBOARD_CACHE_TTL:
+            _dashboard_cache.move_to_end(key)
+            return hit[1]
+    out = _collection_views(analyzer, papers)
+    if DASHBOARD_CACHE_TTL > 0:
+        with _dashboard_cache_lock:
+            _dashboard_cache[key] = (now, out)
+            _dashboard_cache.move_to_end(key)
+            while len(_dashboard_cache) > DASHBOARD_CACHE_SIZE:
+                _dashboard_cache.popitem(last=False)
+    return out
+
+
 @app.get("/api/dashboard/stats")
-def api_dashboard_stats(
+async def api_dashboard_stats(
+    request: Request,
     topic: Optional[str] = Query(None),
     startYear: Optional[int] = Query(None),
     endYear: Optional[int] = Query(None),
@@ -167,18 +302,21 @@ def api_dashboard_stats(
     """
     规格 4.2.2 仪表盘：年度发文、关键词 Top10、态度占比、研究路径分布、主题聚类、共现网络、热点演化、态度演化。
     """
-    results, state = search_papers(
+    results, state = await asyncio.to_thread(
+        search_papers,
         topic=topic or "",
         start_year=startYear,
         end_year=endYear,
         limit=500,
     )
-    state = get_analysis_for_state(state)
+    state = await asyncio.to_thread(get_analysis_for_state, state)
     stats = state.stats or {}
-    analyzer = CollectionAnalyzer()
-    cooccurrence = analyzer.build_cooccurrence_network(state.papers, min_weight=1) if state.papers else {"nodes": [], "links": []}
-    trend_series = analyzer.analyze_trends(state.papers) if state.papers else {"years": [], "series": []}
-    attitude_evolution = analyzer.analyze_attitude_evolution(state.papers) if state.papers else {"years": [], "series": []}
+    cooccurrence, trend_series, attitude_evolution = await asyncio.to_thread(
+        _cached_collection_views,
+        (topic or "", startYear, endYear),
+        request.app.state.analyzer,
+        state.enriched_papers or state.papers,
+    )
     return {
         "yearlyCounts": stats.get("yearlyCounts", []),
         "topKeywords": stats.get("topKeywords", []),
@@ -200,14 +338,14 @@ class AskBody(BaseModel):
 
 
 @app.post("/api/chat")
-def api_chat(body: AskBody):
+async def api_chat(body: AskBody):
     """
     对应前端 askAnalysisAssistant({ question, topic?, startYear?, endYear? })
     -> { answer: string, referencedPaperIds: string[] }
     超时或异常时返回友好提示，避免前端一直等待无返回。
     """
     try:
-        answer, ref_ids = answer_question_with_rag(
+        answer, ref_ids = await answer_question_with_rag(
             question=body.question,
             topic=body.topic or "",
             start_year=body.startYear,
@@ -222,6 +360,45 @@ def api_chat(body: AskBody):
         return {"answer": f"【回复失败】{msg}", "referencedPaperIds": []}
 
 
+def _sse_response(stream, ids_key: str, label: str) -> StreamingResponse:
+    """把 (事件, 数据) 异步流转成 SSE：meta 给出文献 id，delta 为增量正文，done 表示结束，异常时发 error 事件。"""
+
+    async def events():
+        try:
+            async for event, data in stream:
+                if event == "meta":
+                    payload = {ids_key: data}
+                elif event == "delta":
+                    payload = {"text": data}
+                else:
+                    payload = {}
+                yield f"event: {event}\ndata: {_json_dumps(payload)}\n\n"
+        except Exception as e:
+            logger.exception("%s failed: %s", label, e)
+            yield f"event: error\ndata: {_json_dumps({'message': str(e)})}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/api/chat/stream")
+async def api_chat_stream(body: AskBody):
+    """问答的流式版本（Server-Sent Events）：meta 事件给出 referencedPaperIds，随后 delta 增量输出回答。"""
+    return _sse_response(
+        stream_answer_question(
+            question=body.question,
+            topic=body.topic or "",
+            start_year=body.startYear,
+            end_year=body.endYear,
+        ),
+        "referencedPaperIds",
+        "api/chat/stream",
+    )
+
+
 # ---------- 综述生成（可选，供前端“生成综述”按钮调用） ----------
 
 class ReviewFastBody(BaseModel):
@@ -231,12 +408,12 @@ class ReviewFastBody(BaseModel):
 
 
 @app.post("/api/review/fast")
-def api_review_fast(body: ReviewFastBody):
+async def api_review_fast(body: ReviewFastBody):
     """规格 4.4.3 模式 A：快速综述。"""
     t0 = time.perf_counter()
     logger.info("review/fast start topic=%r startYear=%s endYear=%s", body.topic, body.startYear, body.endYear)
     try:
-        draft, state = generate_review_fast(
+        draft, state = await generate_review_fast(
             topic=body.topic,
             start_year=body.startYear,
             end_year=body.endYear,
@@ -249,6 +426,21 @@ def api_review_fast(body: ReviewFastBody):
         raise
 
 
+@app.post("/api/review/fast/stream")
+async def api_review_fast_stream(body: ReviewFastBody):
+    """快速综述的流式版本（Server-Sent Events）：meta 事件给出 paperIds，delta 事件为增量正文，done 表示结束。"""
+    logger.info("review/fast/stream start topic=%r startYear=%s endYear=%s", body.topic, body.startYear, body.endYear)
+    return _sse_response(
+        stream_review_fast(
+            topic=body.topic,
+            start_year=body.startYear,
+            end_year=body.endYear,
+        ),
+        "paperIds",
+        "review/fast/stream",
+    )
+
+
 class RefineReviewBody(BaseModel):
     draft: str
     question: str
@@ -257,10 +449,10 @@ class RefineReviewBody(BaseModel):
 
 
 @app.post("/api/review/refine")
-def api_review_refine(body: RefineReviewBody):
+async def api_review_refine(body: RefineReviewBody):
     """根据用户问题完善综述草稿，返回完善后的完整正文。"""
     try:
-        refined = refine_review_with_chat(
+        refined = await refine_review_with_chat(
             draft=body.draft,
             question=body.question,
             topic=body.topic or "",
@@ -278,117 +470,101 @@ class ExportBody(BaseModel):
 
 
 @app.post("/api/review/export")
-def api_review_export(body: ExportBody):
+async def api_review_export(body: ExportBody):
     """规格 2.1：导出综述草稿为文本或 LaTeX。LaTeX 时优先用 AI 生成标准格式，失败则规则转换。"""
     if body.format == "latex":
-        content = draft_to_latex_via_llm(body.draft)
+        content = await draft_to_latex_via_llm(body.draft)
         if content:
             logger.info("review/export latex: used AI-generated LaTeX, len=%d", len(content))
         else:
-            content = _draft_to_latex(body.draft)
+            content = draft_to_latex(body.draft)
             logger.info("review/export latex: fallback to rule-based LaTeX, len=%d", len(content))
         return {"content": content, "filename": "review.tex", "mime": "application/x-tex"}
     return {"content": body.draft, "filename": "review.txt", "mime": "text/plain"}
 
 
-def _latex_escape(s: str) -> str:
-    for a, b in [("\\", "\\\\"), ("&", "\\&"), ("%", "\\%"), ("_", "\\_"), ("{", "\\{"), ("}", "\\}")]:
-        s = s.replace(a, b)
-    return s
-
-
-def _draft_to_latex(draft: str) -> str:
-    """将纯文本综述转为严格 LaTeX：** 转为 \\textbf{}，按章节拆分为 \\section，正文转义。"""
-    import re
-    s = draft.strip()
-    # 先把 **xxx** 或 ** xxx ** 转为 \textbf{xxx}，避免“披着 latex 外衣的 markdown”
-    def repl(m):
-        inner = m.group(1).strip()
-        return "\\textbf{" + _latex_escape(inner) + "}"
-    s = re.sub(r"\*\*\s*([^*]*?)\s*\*\*", repl, s)
-    # 单 * 斜体转为 \emph{}
-    def emph_repl(m):
-        inner = m.group(1).strip()
-        return "\\emph{" + _latex_escape(inner) + "}"
-    s = re.sub(r"(?<!\*)\*([^*]+)\*(?!\*)", emph_repl, s)
-    # 按「一、」「二、」等章节标题拆分
-    parts = re.split(r"(?=^[一二三四五六七八九十]+[、．.]\s*[^\n]*)", s, flags=re.MULTILINE)
-    lines = [
-        "\\documentclass[12pt]{article}",
-        "\\usepackage[UTF8]{ctex}",
-        "\\usepackage{parskip}",
-        "\\setlength{\\parindent}{0pt}",
-        "\\begin{document}",
-        "",
-    ]
-    for block in parts:
-        block = block.strip()
-        if not block:
-            continue
-        first_line, _, rest = block.partition("\n")
-        if re.match(r"^[一二三四五六七八九十]+[、．.]\s*.+", first_line):
-            title_esc = _latex_escape(first_line)
-            lines.append("\\section{" + title_esc + "}")
-            lines.append("")
-            body = rest.strip()
-        else:
-            body = block
-        if body:
-            body_esc = _latex_escape(body)
-            lines.append(body_esc.replace("\n", "\n\n"))
-            lines.append("")
-    lines.append("\\end{document}")
-    return "\n".join(lines)
+# ---------- 引用列表：按 paper_ids 批量取文献简要信息 ----------
 
+def _papers_brief(pids: list[str]) -> list[dict]:
+    """按 500 个一组分批查询、fetchmany 流式取行，边取边组装；SQLite 直接按请求中的 id 顺序返回。"""
+    conn = get_connection()
+    try:
+        return [
+            {
+                "id": r[0],
+                "title": r[1] or "",
+                "authors": _json_loads(r[2]) if r[2] else [],
+                "year": int(r[3]) if r[3] and str(r[3]).isdigit() else r[3],
+                "journal": r[4] or "",
+            }
+            for r in select_in_id_order(
+                conn.cursor(),
+                "SELECT p.paper_id, p.title, p.authors, p.year, p.journal FROM papers p JOIN ord ON ord.pid = p.paper_id",
+                pids,
+            )
+        ]
+    finally:
+        conn.close()
 
-# ---------- 引用列表：按 paper_ids 批量取文献简要信息 ----------
 
 @app.get("/api/papers")
-def api_papers_by_ids(ids: Optional[str] = Query(None, description="paper_id 列表，逗号分隔")):
+async def api_papers_by_ids(ids: Optional[str] = Query(None, description="paper_id 列表，逗号分隔")):
     """根据 paper_id 列表返回文献简要信息（id, title, authors, year, journal），用于综述引用列表展示。"""
     if not ids or not ids.strip():
         return {"papers": []}
-    import json
     pids = [x.strip() for x in ids.split(",") if x.strip()]
     if not pids:
         return {"papers": []}
-    conn = get_connection()
-    cur = conn.cursor()
-    placeholders = ",".join("?" * len(pids))
-    cur.execute(
-        f"SELECT paper_id, title, authors, year, journal FROM papers WHERE paper_id IN ({placeholders})",
-        pids,
-    )
-    rows = cur.fetchall()
-    conn.close()
-    order = {pid: i for i, pid in enumerate(pids)}
-    out = [
-        {
-            "id": r[0],
-            "title": r[1] or "",
-            "authors": json.loads(r[2]) if r[2] else [],
-            "year": int(r[3]) if r[3] and str(r[3]).isdigit() else r[3],
-            "journal": r[4] or "",
-        }
-        for r in rows
-    ]
-    out.sort(key=lambda x: order.get(x["id"], 999))
-    return {"papers": out}
+    return {"papers": await asyncio.to_thread(_papers_brief, pids)}
 
 
 # ---------- 健康检查 ----------
 
 @app.get("/health")
-def health():
+async def health():
     return {"status": "ok"}
 
 
 # ---------- 静态前端（构建后可通过 http://localhost:8000 打开完整页面） ----------
 
 _FRONTEND_DIST = Path(__file__).resolve().parent.parent / "frontend" / "dist"
+# Vite 产物文件名带内容哈希，可永久缓存
+_ASSET_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class _PrecompressedStaticFiles(StaticFiles):
+    """
+    按 Accept-Encoding 优先返回 .br / .gz 预压缩文件，并附带长期缓存头。
+    预压缩副本由前端构建（vite.config.ts 的 precompress-assets）生成；不存在时返回原文件，运行时不写 dist。
+    """
+
+    async def get_response(self, path: str, scope):
+        accept = Headers(scope=scope).get("accept-encoding", "")
+        response = None
+        for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+            if encoding not in accept:
+                continue
+            try:
+                candidate = await super().get_response(path + suffix, scope)
+            except StarletteHTTPException:
+                continue
+            if candidate.status_code in (200, 304):
+                candidate.headers["content-encoding"] = encoding
+                media_type = mimetypes.guess_type(path)[0]
+                if media_type:
+                    candidate.headers["content-type"] = media_type
+                response = candidate
+                break
+        if response is None:
+            response = await super().get_response(path, scope)
+        if response.status_code in (200, 304):
+            response.headers["cache-control"] = _ASSET_CACHE_CONTROL
+            response.headers["vary"] = "Accept-Encoding"
+        return response
+
 
 if _FRONTEND_DIST.is_dir():
-    app.mount("/assets", StaticFiles(directory=_FRONTEND_DIST / "assets"), name="assets")
+    app.mount("/assets", _PrecompressedStaticFiles(directory=_FRONTEND_DIST / "assets"), name="assets")
 
     @app.get("/")
     def _serve_index():
@@ -0,0 +1,68 @@
+"""
+综述草稿的规则式 LaTeX 转换（大模型生成 LaTeX 失败时的回退）。
+纯函数、仅依赖 re，类型注解完整，可用 mypyc 编译为扩展模块：`mypyc api/latex_export.py`；
+编译产物与本文件同目录时 import 自动优先加载，未编译时按普通 Python 模块运行。
+"""
+import re
+from typing import Final
+
+_RE_MD_BOLD: Final[re.Pattern[str]] = re.compile(r"\*\*\s*([^*]*?)\s*\*\*")
+_RE_MD_EMPH: Final[re.Pattern[str]] = re.compile(r"(?<!\*)\*([^*]+)\*(?!\*)")
+_RE_SECTION_SPLIT: Final[re.Pattern[str]] = re.compile(r"(?=^[一二三四五六七八九十]+[、．.]\s*[^\n]*)", re.MULTILINE)
+_RE_SECTION_TITLE: Final[re.Pattern[str]] = re.compile(r"^[一二三四五六七八九十]+[、．.]\s*.+")
+
+_PREAMBLE: Final[tuple[str, ...]] = (
+    "\\documentclass[12pt]{article}",
+    "\\usepackage[UTF8]{ctex}",
+    "\\usepackage{parskip}",
+    "\\setlength{\\parindent}{0pt}",
+    "\\begin{document}",
+    "",
+)
+
+
+# 各特殊字符逐个映射，一次 translate 完成转义（映射同时生效，新加的反斜杠不会被再次转义）
+_LATEX_TRANS: Final[dict[int, str]] = str.maketrans(
+    {"\\": "\\\\", "&": "\\&", "%": "\\%", "_": "\\_", "{": "\\{", "}": "\\}"}
+)
+
+
+def latex_escape(s: str) -> str:
+    return s.translate(_LATEX_TRANS)
+
+
+def _bold_repl(m: "re.Match[str]") -> str:
+    return "\\textbf{" + latex_escape(m.group(1).strip()) + "}"
+
+
+def _emph_repl(m: "re.Match[str]") -> str:
+    return "\\emph{" + latex_escape(m.group(1).strip()) + "}"
+
+
+def draft_to_latex(draft: str) -> str:
+    """将纯文本综述转为严格 LaTeX：** 转为 \\textbf{}，按章节拆分为 \\section，正文转义。"""
+    s = draft.strip()
+    # 先把 **xxx** 或 ** xxx ** 转为 \textbf{xxx}，避免“披着 latex 外衣的 markdown”
+    s = _RE_MD_BOLD.sub(_bold_repl, s)
+    # 单 * 斜体转为 \emph{}
+    s = _RE_MD_EMPH.sub(_emph_repl, s)
+    # 按「一、」「二、」等章节标题拆分
+    parts: list[str] = _RE_SECTION_SPLIT.split(s)
+    lines: list[str] = list(_PREAMBLE)
+    for block in parts:
+        block = block.strip()
+        if not block:
+            continue
+        first_line, _, rest = block.partition("\n")
+        body: str
+        if _RE_SECTION_TITLE.match(first_line):
+            lines.append("\\section{" + latex_escape(first_line) + "}")
+            lines.append("")
+            body = rest.strip()
+        else:
+            body = block
+        if body:
+            lines.append(latex_escape(body).replace("\n", "\n\n"))
+            lines.append("")
+    lines.append("\\end{document}")
+    return "\n".join(lines)
@@ -83,3 +83,24 @@ def get_device() -> str:
         return "cuda" if torch.cuda.is_available() else "cpu"
     except Exception:
         return "cpu"
+
+
+# CPU 推理线程数（intra-op）；默认取全部核数。特征流水线与分析服务共用，进程内只设置一次
+TORCH_THREADS = int(os.environ.get("LIT_TORCH_THREADS", "0")) or (os.cpu_count() or 4)
+_torch_threads_set = False
+
+
+def configure_torch_threads() -> None:
+    """CPU 部署时设置一次 torch 线程数；interop 线程只能在首次并行前设置，失败忽略。"""
+    global _torch_threads_set
+    if _torch_threads_set:
+        return
+    _torch_threads_set = True
+    if get_device() != "cpu":
+        return
+    try:
+        import torch
+        torch.set_num_threads(TORCH_THREADS)
+        torch.set_num_interop_threads(2)
+    except Exception:
+        pass
@@ -0,0 +1,74 @@
+"""
+上下文标签（contextual retrieval）：离线为每篇文献生成一句 ≤40 词的「定位说明」，写入 papers.context_tag。
+RAG 上下文中以「[序号] 标题 — 标签」代替背景/研究问题/方法/结论四段截断文本，同样字数预算可容纳更多文献。
+"""
+import asyncio
+import os
+import sqlite3
+
+from lit_review_app.config.settings import LIT_DB_PATH
+
+# 并发请求数，避免触发 API 限流
+CONTEXT_TAG_CONCURRENCY = int(os.environ.get("LIT_CONTEXT_TAG_CONCURRENCY", "8"))
+CONTEXT_TAG_MAX_CHARS = 160
+
+_CONTEXT_TAG_SYSTEM = (
+    "你是一位学术文献编目助手。根据给出的文献标题与结构化摘要，用一句话（不超过 40 个词）概括："
+    "该文献研究什么问题、采用何种方法、得出什么核心结论，便于在文献集合中快速定位这篇文献。"
+    "只输出这一句话，不要编号、引号或解释。"
+)
+
+
+def _tag_prompt(title: str, abstract: str, bg: str, rq: str, methods: str, concl: str) -> str:
+    lines = [f"标题：{title}"]
+    for label, val in (("背景", bg), ("研究问题", rq), ("方法", methods), ("结论", concl)):
+        if val:
+            lines.append(f"{label}：{val[:300]}")
+    if len(lines) == 1 and abstract:
+        lines.append(f"摘要：{abstract[:600]}")
+    return "\n".join(lines)
+
+
+async def _tag_all(prompts: list[str]) -> list[str]:
+    from lit_review_app.agent.review_generator import _call_llm_async
+
+    sem = asyncio.Semaphore(max(1, CONTEXT_TAG_CONCURRENCY))
+
+    async def one(user: str) -> str:
+        async with sem:
+            out = (await _call_llm_async(_CONTEXT_TAG_SYSTEM, user, max_tokens=120, timeout=60.0)).strip()
+        # 失败/未配置时 _call_llm_async 返回「【…】」说明文字，不入库
+        if not out or out.startswith("【"):
+            return ""
+        return out.replace("\n", " ")[:CONTEXT_TAG_MAX_CHARS]
+
+    return await asyncio.gather(*(one(u) for u in prompts))
+
+
+def generate_context_tags(db_path: str | None = None, overwrite: bool = False, limit: int | None = None) -> int:
+    """为缺少 context_tag 的文献生成标签（overwrite=True 时全部重算），返回写入条数。"""
+    db_path = db_path or LIT_DB_PATH
+    conn = sqlite3.connect(db_path)
+    cur = conn.cursor()
+    sql = """
+        SELECT p.paper_id, p.title, p.abstract, s.background, s.research_question, s.methods, s.conclusions
+        FROM papers p LEFT JOIN paper_structured s ON p.paper_id = s.paper_id
+    """
+    if not overwrite:
+        sql += " WHERE p.context_tag IS NULL OR p.context_tag = ''"
+    if limit:
+        sql += f" LIMIT {int(limit)}"
+    cur.execute(sql)
+    rows = cur.fetchall()
+    conn.close()
+    if not rows:
+        return 0
+    prompts = [_tag_prompt(*(v or "" for v in r[1:])) for r in rows]
+    # 一次事件循环内并发完成全部请求
+    tags = asyncio.run(_tag_all(prompts))
+    updates = [(tag, r[0]) for r, tag in zip(rows, tags) if tag]
+    conn = sqlite3.connect(db_path)
+    conn.executemany("UPDATE papers SET context_tag=? WHERE paper_id=?", updates)
+    conn.commit()
+    conn.close()
+    return len(updates)
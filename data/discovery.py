@@ -6,12 +6,46 @@
     例如： .../中文文献(29)/中文文献(29)/xxx.pdf -> source = "中文文献(29)"
   - 若 PDF 直接放在根目录下，则 source 取根目录名。
 """
+import os
 from pathlib import Path
 from typing import List, Tuple
 
 from lit_review_app.config.settings import LIT_SOURCE_ROOTS, PROJECT_ROOT
 
 
+def _iter_pdfs(root: Path, exclude_dirs: set):
+    """
+    用 os.scandir 迭代遍历 root，产出 .pdf 文件路径（扩展名不区分大小写）。
+    DirEntry 自带目录项类型，排除目录在读到时即剪枝，不必为每个文件构造 Path 与 stat。
+    与 rglob 一致：先序深度优先（本目录的 PDF，再依次进入各子目录），不进入指向目录的符号链接，无权限的目录跳过。
+    每层目录项按名称排序，顺序不随文件系统变化（决定 --limit 取哪些、重复文献保留哪份）。
+    """
+    stack = [os.fspath(root)]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        files, dirs = [], []
+        with it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    continue
+                if is_dir:
+                    if entry.name not in exclude_dirs:
+                        dirs.append(entry.path)
+                elif entry.name.lower().endswith(".pdf"):
+                    files.append(entry.path)
+        files.sort()
+        for path in files:
+            yield Path(path)
+        # 逆序入栈，按名称顺序出栈
+        dirs.sort(reverse=True)
+        stack.extend(dirs)
+
+
 def find_pdfs(
     roots: List[Path] | None = None,
     exclude_dirs: set | None = None,
@@ -38,13 +72,10 @@ def find_pdfs(
                 src_label = root.parent.name or root.stem
                 out.append((root, src_label))
             continue
-        for path in root.rglob("*.pdf"):
+        # 排除目录在遍历时已剪枝
+        for path in _iter_pdfs(root, exclude_dirs):
             if path in seen_paths:
                 continue
-            # 跳过在排除目录下的文件
-            parts = path.relative_to(root).parts
-            if any(p in exclude_dirs for p in parts):
-                continue
             seen_paths.add(path)
             # 来源：最后一级父文件夹名（即 PDF 所在目录名）
             source = path.parent.name or root.name
@@ -1,16 +1,15 @@
 """
-PDF 解析与元数据抽取：使用 pdfminer.six 提取文本，启发式解析标题/作者/摘要/年份。
+PDF 解析与元数据抽取：默认 pdfminer.six 提取文本，可选 pypdfium2（PDFium，C++ 解析器，LIT_PDF_BACKEND=pdfium）；启发式解析标题/作者/摘要/年份。
 - 改进作者行：排除「内容提要」、过长段落、明显非人名的行。
 - 摘要：优先「摘要」/「Abstract」后段落；年份限制在合理范围。
 - 存储路径使用相对于 PROJECT_ROOT 的相对路径（便于迁移），并记录 source 来源标签。
 """
 import hashlib
+import os
 import re
 from pathlib import Path
 from typing import Any
 
-from pdfminer.high_level import extract_text
-
 from lit_review_app.config.settings import PROJECT_ROOT
 from lit_review_app.data.normalizers import (
     normalize_author,
@@ -20,15 +19,34 @@ from lit_review_app.data.normalizers import (
 )
 
 
+# 单次 str.translate 完成：全角数字 → 半角，全角空格/制表符/不换行空格 → 空格，孤立 \r → \n
+_NORMALIZE_TRANS = {ord(f): ord(d) for f, d in zip("０１２３４５６７８９", "0123456789")}
+_NORMALIZE_TRANS.update({ord("\u3000"): " ", ord("\t"): " ", ord("\u00A0"): " ", ord("\r"): "\n"})
+
+# 元数据抽取用到的正则：模块加载时编译一次，批量导入时逐篇复用
+_RE_SPACE_RUN = re.compile(r" {2,}")
+_RE_MULTISPACE = re.compile(r"\s+")
+_RE_AFFILIATION = re.compile(r"(学院|大学|研究院|公司|联系方式|地址|通讯作者|email|@)", re.I)
+_RE_SECTION_HEAD = re.compile(r"\b(Abstract|摘要|Introduction|Keywords?)\b", re.I)
+_RE_CJK = re.compile(r"[\u4e00-\u9fff]")
+_RE_CJK_NAME_SEP = re.compile(r"[,;；\s、]{1,}")
+_RE_NAME_SEP = re.compile(r"[,;；]|\s+and\s+|和")
+_RE_LATIN_NAME = re.compile(r"[A-Z][a-z]+\s+[A-Z][a-z]+")
+_RE_YEAR = re.compile(r"\b(19\d{2}|20[0-3]\d)\b")
+_RE_ABS_START = re.compile(r"(摘\s*要|要\s*摘|abstract)", re.I)
+_RE_ABS_STOP = re.compile(r"\n\s*(关键词|keywords|中图|引言|1\.|目录)", re.I)
+_RE_JOURNAL_HINT = re.compile(r"journal|proceedings|conference|期刊|会议", re.I)
+_RE_KW_FULL = re.compile(r"［?关键词］?\s*[：:]?\s*([^［\n]+?)(?=［中图|［文献标识码|［文章编号|\n\s*［|$)")
+_RE_DOI_LABEL = re.compile(r"DOI\s*[：:]")
+_RE_ISSUE = re.compile(r"\d{4}\s*年\s*第\s*\d+\s*期")
+_RE_JOURNAL_HEADER = re.compile(r"中国行政管理\s*[A-Z\s]{5,}")
+_RE_ABS_LEAD = re.compile(r"^[［\][]*\s*")
+
+
 def _normalize_text(s: str) -> str:
-    fw = "０１２３４５６７８９"
-    hw = "0123456789"
-    trans = {ord(f): ord(d) for f, d in zip(fw, hw)}
-    trans[ord("\u3000")] = ord(" ")
-    s = s.translate(trans)
-    s = re.sub(r"[ \t\u00A0]+", " ", s)
-    s = s.replace("\r\n", "\n").replace("\r", "\n")
-    return s
+    """全文规范化：先合并 \r\n，再一次 translate 映射全部单字符替换，最后只对连续空格做正则折叠。"""
+    s = s.replace("\r\n", "\n").translate(_NORMALIZE_TRANS)
+    return _RE_SPACE_RUN.sub(" ", s)
 
 
 # 不应作为作者名的片段（整行或明显噪音）
@@ -59,15 +77,38 @@ AUTHOR_NOISE = {
 }
 
 
+def _substring_matcher(words):
+    """
+    返回 contains_any(text)：text 是否包含 words 中任一片段，一次线性扫描完成。
+    优先用 pyahocorasick 的 Aho–Corasick 自动机；未安装时回退为转义后的交替正则。
+    """
+    try:
+        import ahocorasick
+    except ImportError:
+        pattern = re.compile("|".join(re.escape(w) for w in sorted(words, key=len, reverse=True)))
+        return lambda text: pattern.search(text) is not None
+    automaton = ahocorasick.Automaton()
+    for w in words:
+        automaton.add_word(w, w)
+    automaton.make_automaton()
+    return lambda text: next(automaton.iter(text), None) is not None
+
+
+_has_author_noise = _substring_matcher(AUTHOR_NOISE)
+
+# 作者列表中出现即视为解析错误的片段（期刊名、栏目名、摘要残片等）
+_AUTHORS_WRONG_NOISE = frozenset({"中国行政管理", "摘要", "要］", "公共安全", "他山之石", "数字政府治理", "本刊专稿", "探索与争鸣"})
+_has_authors_wrong_noise = _substring_matcher(_AUTHORS_WRONG_NOISE)
+
+
 def _is_likely_author_line(line: str) -> bool:
     line = line.strip()
     if not line or len(line) > 80:
         return False
-    for noise in AUTHOR_NOISE:
-        if noise in line:
-            return False
+    if _has_author_noise(line):
+        return False
     # 学院、大学等多为单位
-    if re.search(r"(学院|大学|研究院|公司|联系方式|地址|通讯作者|email|@)", line, re.I):
+    if _RE_AFFILIATION.search(line):
         return False
     return True
 
@@ -76,24 +117,24 @@ def _extract_authors_from_lines(lines: list, title_end_idx: int) -> list:
     authors = []
     for j in range(title_end_idx + 1, min(title_end_idx + 8, len(lines))):
         line = lines[j]
-        if re.search(r"\b(Abstract|摘要|Introduction|Keywords?)\b", line, re.I):
+        if _RE_SECTION_HEAD.search(line):
             break
         if not _is_likely_author_line(line):
             continue
         # 中文：短段、可能含逗号/顿号/空格分隔的多个姓名
-        if re.search(r"[\u4e00-\u9fff]", line):
-            parts = re.split(r"[,;；\s、]{1,}", line)
+        if _RE_CJK.search(line):
+            parts = _RE_CJK_NAME_SEP.split(line)
             for p in parts:
                 p = p.strip(" ,;。")
                 if 1 <= len(p) <= 20 and p not in authors:
                     authors.append(p)
         elif "," in line or " and " in line.lower() or "和" in line:
-            parts = re.split(r"[,;；]|\s+and\s+|和", line)
+            parts = _RE_NAME_SEP.split(line)
             for p in parts:
                 p = normalize_author(p)
                 if p and p not in authors:
                     authors.append(p)
-        elif re.search(r"[A-Z][a-z]+\s+[A-Z][a-z]+", line):
+        elif _RE_LATIN_NAME.search(line):
             if line not in authors:
                 authors.append(line)
     # 去重保序
@@ -107,9 +148,15 @@ def _extract_authors_from_lines(lines: list, title_end_idx: int) -> list:
     return out
 
 
+# 元数据查找窗口（字符数）
+_HEAD_CHARS = 8000
+
+
 def extract_metadata_from_text(text: str) -> dict:
     text = _normalize_text(text)
-    lines = [l.strip() for l in text.splitlines() if l.strip()]
+    # 标题、作者、期刊、摘要起点与关键词都在首页附近，只在开头一段内查找，长文献也不必整篇扫描
+    head = text[:_HEAD_CHARS]
+    lines = [l.strip() for l in head.splitlines() if l.strip()]
     meta = {"title": "", "authors": [], "year": None, "journal": "", "abstract": "", "keywords": ""}
 
     if not lines:
@@ -124,40 +171,39 @@ def extract_metadata_from_text(text: str) -> dict:
         acc.append(lines[i])
         cand = " ".join(acc)
         if len(cand) >= 15:
-            meta["title"] = re.sub(r"\s+", " ", cand).strip()
+            meta["title"] = _RE_MULTISPACE.sub(" ", cand).strip()
             title_idx = i
             break
     else:
-        meta["title"] = re.sub(r"\s+", " ", lines[0]).strip()
+        meta["title"] = _RE_MULTISPACE.sub(" ", lines[0]).strip()
         title_idx = 0
 
     meta["authors"] = _extract_authors_from_lines(lines, title_idx)
 
     # 年份：整文中找合理年份
-    m = re.search(r"\b(19\d{2}|20[0-3]\d)\b", text)
+    m = _RE_YEAR.search(text)
     if m:
         meta["year"] = m.group(1)
 
     # 摘要
-    low = text.lower()
-    m_abs = re.search(r"(摘\s*要|要\s*摘|abstract)", low, re.I)
+    m_abs = _RE_ABS_START.search(head)
     if m_abs:
         idx = m_abs.end()
         rest = text[idx : idx + 5000]
-        stop = re.search(r"\n\s*(关键词|keywords|中图|引言|1\.|目录)", rest, re.I)
+        stop = _RE_ABS_STOP.search(rest)
         abstract = rest[: stop.start()].strip() if stop else rest.strip()[:2000]
-        meta["abstract"] = re.sub(r"\s+", " ", abstract)
+        meta["abstract"] = _RE_MULTISPACE.sub(" ", abstract)
 
     # 期刊/来源：前几行中含 journal / 期刊 等；normalize_journal 会截断混入的正文
     for l in lines[:12]:
-        if re.search(r"journal|proceedings|conference|期刊|会议", l, re.I):
+        if _RE_JOURNAL_HINT.search(l):
             meta["journal"] = normalize_journal(l)
             break
-    if not meta["journal"] and re.search(r"中国行政管理", text[:3000]):
+    if not meta["journal"] and "中国行政管理" in text[:3000]:
         meta["journal"] = "中国行政管理"
 
     # 关键词：［关键词］… 或 关键词：… 至 ［中图/［文献标识码/［文章编号
-    m_kw = re.search(r"［?关键词］?\s*[：:]?\s*([^［\n]+?)(?=［中图|［文献标识码|［文章编号|\n\s*［|$)", text)
+    m_kw = _RE_KW_FULL.search(head)
     if m_kw:
         kw_list = normalize_keywords(m_kw.group(1).strip())
         meta["keywords"] = ",".join(kw_list) if kw_list else ""
@@ -178,8 +224,8 @@ def _title_author_from_filename(pdf_path: Path) -> tuple[str, list[str]]:
     author_part = stem[idx + 1 :].strip()
     if not title_part or len(title_part) < 2:
         return "", []
-    title_part = re.sub(r"\s+", " ", title_part)
-    author_part = re.sub(r"\s+", " ", author_part)
+    title_part = _RE_MULTISPACE.sub(" ", title_part)
+    author_part = _RE_MULTISPACE.sub(" ", author_part)
     author = author_part.split("_")[0].strip() if author_part else ""
     authors = [normalize_author(author)] if author and 1 <= len(author) <= 50 else []
     return title_part, authors
@@ -189,16 +235,16 @@ def _is_title_likely_header(title: str) -> bool:
     """标题是否更像页眉/DOI/期刊名（应优先用文件名）。"""
     if not title or len(title) < 3:
         return True
-    if re.search(r"DOI\s*[：:]", title):
+    if _RE_DOI_LABEL.search(title):
         return True
-    if re.search(r"\d{4}\s*年\s*第\s*\d+\s*期", title):
+    if _RE_ISSUE.search(title):
         return True
     # 期刊页眉常见：「中国行政管理」+ 英文名或期号，无真实论文标题
     if "中国行政管理" in title:
         t_upper = title.upper().replace(" ", "")
         if "ADMINISTRATION" in t_upper or "PUBLIC" in t_upper or "CHINESE" in t_upper:
             return True
-        if re.search(r"中国行政管理\s*[A-Z\s]{5,}", title) or len(title) < 60:
+        if _RE_JOURNAL_HEADER.search(title) or len(title) < 60:
             return True
     if len(title) > 250:
         return True
@@ -209,14 +255,13 @@ def _is_authors_likely_wrong(authors: list) -> bool:
     """作者列表是否明显异常（含期刊名、单字、摘要、副标题片段等）。"""
     if not authors:
         return True
-    noise = {"中国行政管理", "摘要", "要］", "公共安全", "他山之石", "数字政府治理", "本刊专稿", "探索与争鸣"}
     for a in authors:
         a = (a or "").strip()
         if len(a) <= 1:
             return True
         if "？" in a or "——" in a or len(a) > 25:
             return True
-        if a in noise or any(n in a for n in noise):
+        if _has_authors_wrong_noise(a):
             return True
     return False
 
@@ -240,7 +285,7 @@ def _merge_filename_fallback(meta: dict, pdf_path: Path) -> None:
 def clean_meta(meta: dict) -> dict:
     meta["year"] = normalize_year(meta.get("year"))
     if meta.get("title"):
-        meta["title"] = re.sub(r"\s+", " ", meta["title"]).strip()
+        meta["title"] = _RE_MULTISPACE.sub(" ", meta["title"]).strip()
     if meta.get("authors"):
         # 过滤明显非人名的项：含？、——、过长（>25 字符多为标题/副标题片段）
         filtered = []
@@ -253,7 +298,7 @@ def clean_meta(meta: dict) -> dict:
             filtered.append(a)
         meta["authors"] = filtered
     if meta.get("abstract"):
-        meta["abstract"] = re.sub(r"^[［\][]*\s*", "", meta["abstract"].strip())
+        meta["abstract"] = _RE_ABS_LEAD.sub("", meta["abstract"].strip())
     if meta.get("journal"):
         meta["journal"] = normalize_journal(meta["journal"])
     if meta.get("keywords"):
@@ -261,6 +306,63 @@ def clean_meta(meta: dict) -> dict:
     return meta
 
 
+# 文本抽取后端：pdfminer（默认）或 pdfium（比纯 Python 的 pdfminer 快一个数量级）。
+# 两者抽出的文本不完全相同，而 paper_id 由正文哈希得到：已有数据库请保持默认，切换后同一文献会得到新 id；新建库可设为 pdfium。
+PDF_BACKEND = os.environ.get("LIT_PDF_BACKEND", "pdfminer").lower()
+
+
+def _extract_text_pdfium(pdf_path: Path) -> str:
+    import pypdfium2 as pdfium
+    pdf = pdfium.PdfDocument(str(pdf_path))
+    try:
+        pages = []
+        for page in pdf:
+            textpage = page.get_textpage()
+            pages.append(textpage.get_text_range())
+            textpage.close()
+            page.close()
+        return "\n".join(pages)
+    finally:
+        pdf.close()
+
+
+def _extract_text_pdfminer(pdf_path: Path) -> str:
+    from pdfminer.high_level import extract_text
+    return extract_text(str(pdf_path))
+
+
+def extract_pdf_text(pdf_path: Path) -> str:
+    """抽取 PDF 全文；LIT_PDF_BACKEND=pdfium 时用 pypdfium2，未安装则回退 pdfminer.six。"""
+    if PDF_BACKEND == "pdfium":
+        try:
+            return _extract_text_pdfium(pdf_path)
+        except ImportError:
+            pass
+    return _extract_text_pdfminer(pdf_path)
+
+
+# 文本指纹算法：sha1（默认）| blake3 | xxh3。指纹即 paper_id，已有数据库请保持默认，切换后同一文献会得到新 id
+CONTENT_HASH = os.environ.get("LIT_CONTENT_HASH", "sha1").lower()
+
+
+def content_fingerprint(text: str) -> str:
+    """去重用的文本指纹（非安全用途）；所选算法的包未安装时回退 sha1。"""
+    data = text.encode("utf-8")
+    if CONTENT_HASH == "blake3":
+        try:
+            from blake3 import blake3
+            return blake3(data, max_threads=blake3.AUTO).hexdigest()
+        except ImportError:
+            pass
+    elif CONTENT_HASH == "xxh3":
+        try:
+            import xxhash
+            return xxhash.xxh3_128_hexdigest(data)
+        except ImportError:
+            pass
+    return hashlib.sha1(data, usedforsecurity=False).hexdigest()
+
+
 def path_to_stored(p: Path) -> str:
     """将 PDF 路径转为存储用：优先相对 PROJECT_ROOT 的相对路径。"""
     try:
@@ -275,7 +377,7 @@ def process_pdf(pdf_path: Path, source_label: str) -> dict:
     source_label 由 discovery 传入（父文件夹名）。
     """
     try:
-        text = extract_text(str(pdf_path))
+        text = extract_pdf_text(pdf_path)
     except Exception as e:
         return {"_error": str(e)}
 
@@ -284,7 +386,8 @@ def process_pdf(pdf_path: Path, source_label: str) -> dict:
     meta = clean_meta(meta)
     # 存储路径与来源
     meta["_path"] = path_to_stored(pdf_path)
-    meta["_sha1"] = hashlib.sha1(text.encode("utf-8")).hexdigest()
+    # 字段名沿用 _sha1，下游 sha1_of_record / 去重逻辑不变
+    meta["_sha1"] = content_fingerprint(text)
     meta["source"] = source_label
     meta["_raw_text_snippet"] = text[:3000]
     return meta
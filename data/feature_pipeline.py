@@ -3,10 +3,24 @@
 关键词（KeyBERT）、态度（乐观/谨慎中性/批判性）、方法标签、向量编码。
 供离线导入与在线分析复用。模型按需加载、单例复用，避免每篇重复 Load。
 """
+import os
+import queue
+import re
+import threading
+from collections import Counter
 from pathlib import Path
 from typing import Any
 
-from lit_review_app.config.settings import LIT_EMBEDDINGS_DIR, EMBED_MODEL, get_device
+# 可选：LIT_OVERMIND=1 时用 overmind 把 torch/transformers 权重缓存在共享内存，
+# 重复运行导入脚本或多进程 worker 加载模型时直接映射，须在加载任何模型之前打补丁
+if os.environ.get("LIT_OVERMIND", "0") == "1":
+    try:
+        import overmind.api
+        overmind.api.monkey_patch_all()
+    except Exception:
+        pass
+
+from lit_review_app.config.settings import LIT_EMBEDDINGS_DIR, EMBED_MODEL, configure_torch_threads, get_device
 
 
 # 规格 4.2.1：态度 乐观评估/谨慎中性/批判性
@@ -30,25 +44,65 @@ def _get_keybert():
     return _keybert_model
 
 
+# GPU 上以 FP16 推理（权重带宽减半、启用 tensor core）；设为 0 保持 FP32
+MODEL_FP16 = os.environ.get("LIT_MODEL_FP16", "1") != "0"
+# 向量模型推理后端：torch（默认）/ onnx（需 optimum[onnxruntime]，不可用时回退 torch）
+EMBED_BACKEND = os.environ.get("LIT_EMBED_BACKEND", "torch").strip().lower()
+
+
 def _get_embed_model():
     global _embed_model
     if _embed_model is None:
         from sentence_transformers import SentenceTransformer
+        configure_torch_threads()
         device = get_device()
-        _embed_model = SentenceTransformer(EMBED_MODEL, device=device)
+        model = None
+        if EMBED_BACKEND == "onnx":
+            try:
+                model = SentenceTransformer(EMBED_MODEL, device=device, backend="onnx")
+            except Exception:
+                model = None
+        if model is None:
+            model = SentenceTransformer(EMBED_MODEL, device=device)
+            if device == "cuda" and MODEL_FP16:
+                try:
+                    model.half()
+                except Exception:
+                    model.float()
+        _embed_model = model
     return _embed_model
 
 
 def _get_zeroshot_pipe():
     global _zeroshot_pipe
     if _zeroshot_pipe is None:
-        from transformers import pipeline
-        device_id = 0 if get_device() == "cuda" else -1
-        _zeroshot_pipe = pipeline("zero-shot-classification", model="facebook/bart-large-mnli", device=device_id)
+        from transformers import AutoTokenizer, pipeline
+        configure_torch_threads()
+        model_name = "facebook/bart-large-mnli"
+        # 显式使用 Rust 实现的 fast tokenizer
+        tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=True)
+        if get_device() == "cuda":
+            pipe = None
+            if MODEL_FP16:
+                try:
+                    import torch
+                    pipe = pipeline(
+                        "zero-shot-classification",
+                        model=model_name,
+                        tokenizer=tokenizer,
+                        device=0,
+                        torch_dtype=torch.float16,
+                    )
+                except Exception:
+                    pipe = None
+            _zeroshot_pipe = pipe or pipeline("zero-shot-classification", model=model_name, tokenizer=tokenizer, device=0)
+        else:
+            _zeroshot_pipe = pipeline("zero-shot-classification", model=model_name, tokenizer=tokenizer, device=-1)
     return _zeroshot_pipe
 
 
-def _keybert_extract(text: str, top_n: int = 8) -> list[str]:
+def _keybert_extract(text: str, top_n: int = 8, doc_embedding=None) -> list[str]:
+    """doc_embedding 为同一文本已算好的向量时直接交给 KeyBERT，不再重复编码文档。"""
     try:
         model = _get_keybert()
         kw = model.extract_keywords(
@@ -58,62 +112,192 @@ def _keybert_extract(text: str, top_n: int = 8) -> list[str]:
             top_n=top_n,
             use_mmr=True,
             diversity=0.5,
+            doc_embeddings=None if doc_embedding is None else doc_embedding.reshape(1, -1),
         )
         return [k[0] for k in kw if k[0].strip()]
     except Exception:
         return _fallback_keywords(text, top_n)
 
 
+# KeyBERT 每次传入的文献数：同一批共用一套候选词表，过大时候选词向量占用内存过多
+KEYBERT_BATCH_SIZE = int(os.environ.get("LIT_KEYBERT_BATCH_SIZE", "256"))
+
+
+def keybert_extract_batch(texts: list[str], top_n: int = 8, doc_embeddings=None) -> list[list[str]]:
+    """
+    批量版 _keybert_extract：每批文档一次 extract_keywords，文档向量与候选词向量各批量编码一次，
+    同一候选词在批内只编码一遍。doc_embeddings（与 texts 对齐的 N×d 矩阵，见 encode_paper_texts）给出时
+    直接复用，不再编码文档。KeyBERT 不可用或某批失败时该批逐篇走词频回退。
+    """
+    out: list[list[str]] = [[] for _ in texts]
+    idx = [i for i, t in enumerate(texts) if t and t.strip()]
+    try:
+        model = _get_keybert()
+    except Exception:
+        model = None
+    for start in range(0, len(idx), KEYBERT_BATCH_SIZE):
+        part = idx[start:start + KEYBERT_BATCH_SIZE]
+        docs = [texts[i] for i in part]
+        try:
+            if model is None:
+                raise RuntimeError("KeyBERT unavailable")
+            res = model.extract_keywords(
+                docs,
+                keyphrase_ngram_range=(1, 2),
+                stop_words="english",
+                top_n=top_n,
+                use_mmr=True,
+                diversity=0.5,
+                doc_embeddings=None if doc_embeddings is None else doc_embeddings[part],
+            )
+            # 单篇输入时 KeyBERT 返回扁平列表
+            if len(docs) == 1:
+                res = [res]
+            for i, kw in zip(part, res):
+                out[i] = [k[0] for k in kw if k[0].strip()]
+        except Exception:
+            for i in part:
+                out[i] = _fallback_keywords(texts[i], top_n)
+    return out
+
+
+_RE_WORDS = re.compile(r"[a-zA-Z]{2,}|[\u4e00-\u9fff]{2,}")
+_FALLBACK_STOP = frozenset({
+    "the", "and", "for", "with", "this", "that", "from", "have", "are", "was", "were", "been", "being",
+    "will", "would", "can", "could", "may", "might", "本文", "研究", "分析", "方法", "结果", "结论",
+})
+
+
 def _fallback_keywords(text: str, top_n: int) -> list[str]:
-    import re
-    from collections import Counter
-    words = re.findall(r"[a-zA-Z]{2,}|[\u4e00-\u9fff]{2,}", text)
-    stop = {"the", "and", "for", "with", "this", "that", "from", "have", "are", "was", "were", "been", "being", "will", "would", "can", "could", "may", "might", "本文", "研究", "分析", "方法", "结果", "结论"}
-    cnt = Counter(w for w in words if w.lower() not in stop)
+    """词频回退：Counter 计数走 C 实现（_count_elements），most_common(n) 为堆选 top-n。"""
+    cnt = Counter(w for w in _RE_WORDS.findall(text) if w.lower() not in _FALLBACK_STOP)
     return [w for w, _ in cnt.most_common(top_n)]
 
 
-def _classify_attitude(abstract: str) -> str:
-    """态度分类：乐观评估/谨慎中性/批判性。复用单例 pipeline。"""
-    if not abstract or not abstract.strip():
-        return "谨慎中性"
+# 零样本分类的英文候选标签（bart-large-mnli 为英文 NLI 模型）与中文标签一一对应
+_ATTITUDE_LABELS_EN = ["optimistic", "neutral", "critical"]
+_METHODS_LABELS_EN = ["normative analysis", "empirical study", "case study", "comparative study", "theoretical analysis", "other"]
+# 零样本分类每批送入模型的文献数
+ZEROSHOT_BATCH_SIZE = int(os.environ.get("LIT_ZEROSHOT_BATCH_SIZE", "32"))
+
+
+def _zeroshot_batch(texts: list[str], labels_en: list[str], labels_cn: list[str], default: str) -> list[str]:
+    """
+    对一批文本做零样本分类，返回与输入对齐的中文标签；空文本直接取默认值。
+    整批一次送入 pipeline（内部按 batch_size 分批前向），整批失败时逐篇重试，单篇失败取默认值。
+    """
+    out = [default] * len(texts)
+    idx = [i for i, t in enumerate(texts) if t and t.strip()]
+    if not idx:
+        return out
+    en_to_cn = dict(zip(labels_en, labels_cn))
+    inputs = [texts[i][:512] for i in idx]
     try:
         pipe = _get_zeroshot_pipe()
-        labels_en = ["optimistic", "neutral", "critical"]
-        res = pipe(abstract[:512], candidate_labels=labels_en, multi_label=False)
-        if res and res.get("labels"):
-            en_to_cn = {"optimistic": "乐观评估", "neutral": "谨慎中性", "critical": "批判性"}
-            return en_to_cn.get(res["labels"][0], "谨慎中性")
-        return "谨慎中性"
     except Exception:
-        return "谨慎中性"
+        return out
+    try:
+        results = pipe(inputs, candidate_labels=labels_en, multi_label=False, batch_size=ZEROSHOT_BATCH_SIZE)
+        if isinstance(results, dict):
+            results = [results]
+    except Exception:
+        results = []
+        for t in inputs:
+            try:
+                results.append(pipe(t, candidate_labels=labels_en, multi_label=False))
+            except Exception:
+                results.append(None)
+    for i, res in zip(idx, results):
+        if res and res.get("labels"):
+            out[i] = en_to_cn.get(res["labels"][0], default)
+    return out
 
 
-def _classify_methods(abstract: str) -> str:
-    """方法标签：规范分析/实证/案例/比较/理论/其他。复用单例 pipeline。"""
-    if not abstract or not abstract.strip():
-        return "其他"
+def classify_attitudes_batch(texts: list[str]) -> list[str]:
+    """批量态度分类：乐观评估/谨慎中性/批判性。"""
+    return _zeroshot_batch(texts, _ATTITUDE_LABELS_EN, ATTITUDE_LABELS, "谨慎中性")
+
+
+def classify_methods_batch(texts: list[str]) -> list[str]:
+    """批量方法标签：规范分析/实证/案例/比较/理论/其他。"""
+    return _zeroshot_batch(texts, _METHODS_LABELS_EN, METHODS_LABELS, "其他")
+
+
+# 态度与方法合并推理时，前提（摘要）按 token 截断的长度
+ZEROSHOT_MAX_TOKENS = int(os.environ.get("LIT_ZEROSHOT_MAX_TOKENS", "256"))
+# 与 transformers 零样本 pipeline 默认一致
+_HYPOTHESIS_TEMPLATE = "This example is {}."
+
+
+def classify_attitudes_and_methods_batch(texts: list[str]) -> tuple[list[str], list[str]]:
+    """
+    态度与方法两组标签一次完成：每批文献与两组标签的全部假设句构成 NLI 句对，一次分词（按 token 截断前提）、
+    一次前向，分别对两组标签的 entailment logit 取 argmax（同 pipeline 的 multi_label=False）。
+    合并推理失败时回退为两次 pipeline 调用。
+    """
+    attitudes = ["谨慎中性"] * len(texts)
+    methods = ["其他"] * len(texts)
+    idx = [i for i, t in enumerate(texts) if t and t.strip()]
+    if not idx:
+        return attitudes, methods
     try:
+        import torch
         pipe = _get_zeroshot_pipe()
-        labels_en = ["normative analysis", "empirical study", "case study", "comparative study", "theoretical analysis", "other"]
-        res = pipe(abstract[:512], candidate_labels=labels_en, multi_label=False)
-        if res and res.get("labels"):
-            en_to_cn = dict(zip(labels_en, METHODS_LABELS))
-            return en_to_cn.get(res["labels"][0], "其他")
-        return "其他"
+        model, tokenizer = pipe.model, pipe.tokenizer
+        entail_id = next(
+            (i for label, i in model.config.label2id.items() if label.lower().startswith("entail")), -1
+        )
+        hypotheses = [_HYPOTHESIS_TEMPLATE.format(label) for label in _ATTITUDE_LABELS_EN + _METHODS_LABELS_EN]
+        n_att = len(_ATTITUDE_LABELS_EN)
+        # 每次前向的句对数与 pipeline 的 batch_size 相当
+        per_batch = max(1, ZEROSHOT_BATCH_SIZE // len(hypotheses))
+        for start in range(0, len(idx), per_batch):
+            part = idx[start:start + per_batch]
+            premises = [texts[i][:4000] for i in part for _ in hypotheses]
+            enc = tokenizer(
+                premises,
+                hypotheses * len(part),
+                padding=True,
+                truncation="only_first",
+                max_length=ZEROSHOT_MAX_TOKENS,
+                return_tensors="pt",
+            ).to(model.device)
+            with torch.inference_mode():
+                logits = model(**enc).logits[:, entail_id].float().view(len(part), len(hypotheses))
+            att_best = logits[:, :n_att].argmax(dim=1).tolist()
+            met_best = logits[:, n_att:].argmax(dim=1).tolist()
+            for i, a, m in zip(part, att_best, met_best):
+                attitudes[i] = ATTITUDE_LABELS[a]
+                methods[i] = METHODS_LABELS[m]
     except Exception:
-        return "其他"
+        return classify_attitudes_batch(texts), classify_methods_batch(texts)
+    return attitudes, methods
 
 
-def _embed_and_save(paper_id: str, title: str, abstract: str, embeddings_dir: str | Path) -> str | None:
-    """编码标题+摘要并保存为 .npy，返回存储路径（供 paper_features.embedding_id）。复用单例 SentenceTransformer。"""
+def _classify_attitude(abstract: str) -> str:
+    """态度分类：乐观评估/谨慎中性/批判性。复用单例 pipeline。"""
+    return classify_attitudes_batch([abstract])[0]
+
+
+def _classify_methods(abstract: str) -> str:
+    """方法标签：规范分析/实证/案例/比较/理论/其他。复用单例 pipeline。"""
+    return classify_methods_batch([abstract])[0]
+
+
+def _paper_text(title: str, abstract: str) -> str:
+    """向量编码用的文献文本：标题 + 摘要，截断到 4000 字符。"""
+    return f"{title or ''}\n{abstract or ''}"[:4000]
+
+
+def _embed_and_save(paper_id: str, title: str, abstract: str, embeddings_dir: str | Path, vec=None) -> str | None:
+    """编码标题+摘要并保存为 .npy，返回存储路径（供 paper_features.embedding_id）。复用单例 SentenceTransformer；vec 已算好时直接保存。"""
     try:
         import numpy as np
-        model = _get_embed_model()
-        text = f"{title or ''}\n{abstract or ''}"[:4000]
-        if not text.strip():
-            return None
-        vec = model.encode(text, convert_to_numpy=True)
+        if vec is None:
+            text = _paper_text(title, abstract)
+            if not text.strip():
+                return None
+            vec = _get_embed_model().encode(text, convert_to_numpy=True)
         vec = np.asarray(vec, dtype=np.float32)
         path = Path(embeddings_dir)
         path.mkdir(parents=True, exist_ok=True)
@@ -124,6 +308,103 @@ def _embed_and_save(paper_id: str, title: str, abstract: str, embeddings_dir: st
         return None
 
 
+# 批量编码每批条数
+EMBED_BATCH_SIZE = int(os.environ.get("LIT_EMBED_BATCH_SIZE", "64"))
+
+# 后台写盘：批量流水线中 .npy 写入交给单个守护线程，与后续 KeyBERT 等推理重叠
+_save_q: queue.Queue | None = None
+_save_failed: set[str] = set()
+_save_lock = threading.Lock()
+
+
+def _save_worker() -> None:
+    while True:
+        out_file, vec = _save_q.get()
+        try:
+            import numpy as np
+            np.save(out_file, vec)
+        except Exception:
+            _save_failed.add(str(Path(out_file).resolve()))
+        finally:
+            _save_q.task_done()
+
+
+def _enqueue_save(out_file: Path, vec) -> None:
+    global _save_q
+    if _save_q is None:
+        with _save_lock:
+            if _save_q is None:
+                _save_q = queue.Queue(maxsize=64)
+                threading.Thread(target=_save_worker, name="embedding-writer", daemon=True).start()
+    _save_q.put((out_file, vec))
+
+
+def flush_embedding_writes() -> set[str]:
+    """等待排队中的 .npy 全部落盘，返回写入失败的路径（调用方应将其 embedding_id 置空）。"""
+    if _save_q is not None:
+        _save_q.join()
+    failed = set(_save_failed)
+    _save_failed.clear()
+    return failed
+
+
+def encode_paper_texts(texts: list[str]):
+    """
+    全部文本一次 model.encode（按 batch_size 分批前向），返回与输入对齐的 float32 N×d 矩阵（空文本对应行为 0），失败返回 None。
+    SentenceTransformer.encode 内部已按文本长度排序分批再还原顺序（smart batching），同批补齐长度相近。
+    同一矩阵既保存为 .npy，也作为 KeyBERT 的文档向量，每篇只前向一次。
+    """
+    idx = [i for i, t in enumerate(texts) if t.strip()]
+    if not idx:
+        return None
+    try:
+        import numpy as np
+        vecs = _get_embed_model().encode(
+            [texts[i] for i in idx],
+            batch_size=EMBED_BATCH_SIZE,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        )
+    except Exception:
+        return None
+    vecs = np.asarray(vecs, dtype=np.float32)
+    out = np.zeros((len(texts), vecs.shape[1]), dtype=np.float32)
+    out[idx] = vecs
+    return out
+
+
+def embed_and_save_batch(
+    paper_ids: list[str],
+    titles: list[str],
+    abstracts: list[str],
+    embeddings_dir: str | Path,
+    vectors=None,
+) -> list[str | None]:
+    """
+    批量版 _embed_and_save：逐篇 .npy 交给后台线程写盘，返回与输入对齐的存储路径，空文本或失败项为 None。
+    vectors 为 encode_paper_texts 的结果时直接保存，否则先批量编码。
+    读取这些文件前须调用 flush_embedding_writes()。
+    """
+    out: list[str | None] = [None] * len(paper_ids)
+    texts = [_paper_text(t, a) for t, a in zip(titles, abstracts)]
+    if vectors is None:
+        vectors = encode_paper_texts(texts)
+    if vectors is None:
+        return out
+    path = Path(embeddings_dir)
+    try:
+        path.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return out
+    for i, text in enumerate(texts):
+        if not text.strip():
+            continue
+        out_file = path / f"{paper_ids[i]}.npy"
+        _enqueue_save(out_file, vectors[i])
+        out[i] = str(out_file.resolve())
+    return out
+
+
 def run_single_paper(
     paper_id: str,
     title: str,
@@ -131,9 +412,15 @@ def run_single_paper(
     full_text_snippet: str = "",
     embeddings_dir: str | Path | None = None,
     use_llm_structured: bool = True,
+    attitude_label: str | None = None,
+    methods_label: str | None = None,
+    embedding_id: str | None = None,
+    keywords: list[str] | None = None,
+    structured: dict[str, str] | None = None,
 ) -> dict[str, Any]:
     """
-    对单篇文献运行完整特征流水线。
+    对单篇文献运行完整特征流水线。structured / keywords / attitude_label / methods_label / embedding_id
+    已由批量步骤给出时不再逐篇计算（embedding_id 传空串表示批量编码未产出向量）。
     返回：
       structured: dict 用于 paper_structured（背景、研究问题、方法、结论、创新、不足）
       keywords: list 用于 papers.keywords
@@ -143,13 +430,24 @@ def run_single_paper(
     """
     from lit_review_app.data.structured_extract import extract_structured
 
-    structured = extract_structured(abstract, full_text_snippet, use_llm=use_llm_structured)
-    combined = f"{title or ''}\n{abstract or ''}"
-    keywords = _keybert_extract(combined, top_n=8)
-    attitude_label = _classify_attitude(abstract or title or "")
-    methods_label = _classify_methods(abstract or title or "")
-    emb_dir = embeddings_dir or LIT_EMBEDDINGS_DIR
-    embedding_id = _embed_and_save(paper_id, title, abstract, emb_dir)
+    if structured is None:
+        structured = extract_structured(abstract, full_text_snippet, use_llm=use_llm_structured)
+    # 关键词与向量都要现算时只编码一次，同一向量既作 KeyBERT 文档向量也存盘
+    vec = None
+    if keywords is None and embedding_id is None:
+        vecs = encode_paper_texts([_paper_text(title, abstract)])
+        vec = vecs[0] if vecs is not None else None
+    if keywords is None:
+        keywords = _keybert_extract(f"{title or ''}\n{abstract or ''}", top_n=8, doc_embedding=vec)
+    if attitude_label is None and methods_label is None:
+        att, met = classify_attitudes_and_methods_batch([abstract or title or ""])
+        attitude_label, methods_label = att[0], met[0]
+    if attitude_label is None:
+        attitude_label = _classify_attitude(abstract or title or "")
+    if methods_label is None:
+        methods_label = _classify_methods(abstract or title or "")
+    if embedding_id is None:
+        embedding_id = _embed_and_save(paper_id, title, abstract, embeddings_dir or LIT_EMBEDDINGS_DIR, vec=vec)
 
     return {
         "structured": structured,
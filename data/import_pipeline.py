@@ -3,8 +3,11 @@
 禁止 mock/placeholder；结构化摘要用智谱或启发式，关键词用 KeyBERT，态度/方法用分类器，向量存 .npy 并建 FAISS。
 """
 import json
+import os
 import sqlite3
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 _PROJECT_ROOT = Path(__file__).resolve().parents[2]
@@ -15,8 +18,30 @@ from lit_review_app.config.settings import LIT_DB_PATH, LIT_OUT_DIR, PROJECT_ROO
 from lit_review_app.data.discovery import find_pdfs
 from lit_review_app.data.extract import process_pdf
 from lit_review_app.data.schema import ensure_schema
-from lit_review_app.data.feature_pipeline import run_single_paper
-from lit_review_app.config.settings import LIT_EMBEDDINGS_DIR
+from lit_review_app.data.feature_pipeline import (
+    classify_attitudes_and_methods_batch,
+    embed_and_save_batch,
+    encode_paper_texts,
+    flush_embedding_writes,
+    keybert_extract_batch,
+    run_single_paper,
+)
+from lit_review_app.data.structured_extract import extract_structured_batch
+from lit_review_app.retrieval.db import get_connection
+from lit_review_app.config.settings import LIT_EMBEDDINGS_DIR, get_device
+
+# PDF 解析进程数；默认 CPU 核数
+IMPORT_WORKERS = int(os.environ.get("LIT_IMPORT_WORKERS", str(os.cpu_count() or 1)))
+# 解析结果每攒够多少条 executemany 写入一次
+DB_WRITE_BATCH = 500
+# 篇数达到该值且有 GPU 时主题聚类在 GPU 上做（篇数少时传输开销不划算）
+KMEANS_GPU_MIN_ROWS = int(os.environ.get("LIT_KMEANS_GPU_MIN_ROWS", "5000"))
+
+
+def feature_content_hash(title: str | None, abstract: str | None) -> str:
+    """特征输入（标题+摘要）的哈希，存于 paper_features.content_hash；不一致说明需重算特征。"""
+    import hashlib
+    return hashlib.sha1(f"{title or ''}\n{abstract or ''}".encode("utf-8")).hexdigest()
 
 
 def sha1_of_record(rec: dict) -> str:
@@ -27,6 +52,60 @@ def sha1_of_record(rec: dict) -> str:
     return hashlib.sha1(base.encode("utf-8")).hexdigest()
 
 
+def _paper_row(rec: dict) -> tuple:
+    """解析记录 → papers 表一行。"""
+    keywords = rec.get("keywords")
+    if isinstance(keywords, list):
+        keywords = ",".join(keywords) if keywords else None
+    pdf_path = rec.get("_path")
+    return (
+        sha1_of_record(rec),
+        rec.get("title"),
+        json.dumps(rec.get("authors") or [], ensure_ascii=False),
+        rec.get("year"),
+        rec.get("journal"),
+        rec.get("abstract"),
+        keywords,
+        rec.get("field"),
+        rec.get("source"),
+        pdf_path,
+        pdf_path,
+    )
+
+
+def _write_paper_rows(cur: sqlite3.Cursor, paper_rows: list[tuple]) -> int:
+    """
+    executemany 写入一批 papers 行，并为其建好 paper_structured / paper_features 空行。
+    已存在的文献用 UPSERT 原地更新（INSERT OR REPLACE 会先删行，经外键级联清掉已算好的结构化摘要与特征）；
+    papers.keywords 已由特征流水线写入 KeyBERT 结果时保留。
+    """
+    if not paper_rows:
+        return 0
+    cur.executemany(
+        """
+        INSERT INTO papers
+        (paper_id, title, authors, year, journal, abstract, keywords, field, source, pdf_path, source_path)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(paper_id) DO UPDATE SET
+            title=excluded.title,
+            authors=excluded.authors,
+            year=excluded.year,
+            journal=excluded.journal,
+            abstract=excluded.abstract,
+            keywords=COALESCE(NULLIF(papers.keywords, ''), excluded.keywords),
+            field=excluded.field,
+            source=excluded.source,
+            pdf_path=excluded.pdf_path,
+            source_path=excluded.source_path
+        """,
+        paper_rows,
+    )
+    id_rows = [(r[0],) for r in paper_rows]
+    cur.executemany("INSERT OR IGNORE INTO paper_structured(paper_id) VALUES(?)", id_rows)
+    cur.executemany("INSERT OR IGNORE INTO paper_features(paper_id) VALUES(?)", id_rows)
+    return len(paper_rows)
+
+
 def run_import(
     outdir: Path | None = None,
     db_path: str | None = None,
@@ -36,6 +115,9 @@ def run_import(
     index_vector: bool = True,
     skip_features: bool = False,
     n_topics: int = 30,
+    context_tags: bool = True,
+    workers: int | None = None,
+    recompute_features: bool = False,
 ) -> int:
     outdir = outdir or Path(LIT_OUT_DIR)
     outdir.mkdir(parents=True, exist_ok=True)
@@ -49,13 +131,22 @@ def run_import(
     if limit:
         pdfs = pdfs[: int(limit)]
 
+    # 解析结果边写 parsed.jsonl（便于排查）边入库，不再回读 JSONL 二次解析
+    conn = cur = None
+    if not skip_db:
+        db_path = db_path or LIT_DB_PATH
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = get_connection(db_path)
+        ensure_schema(conn)
+        cur = conn.cursor()
     parsed_path = outdir / "parsed.jsonl"
     seen = set()
     count = 0
+    inserted = 0
+    paper_rows = []
     with parsed_path.open("w", encoding="utf-8") as fout:
-        for pdf_path, source_label in pdfs:
+        for (pdf_path, source_label), res in _parse_pdfs(pdfs, workers=workers):
             print("Processing", pdf_path.name, "| source:", source_label)
-            res = process_pdf(pdf_path, source_label)
             if res.get("_error"):
                 print("  Error:", res["_error"])
                 continue
@@ -72,111 +163,201 @@ def run_import(
             res.pop("_raw_text_snippet", None)
             fout.write(json.dumps(res, ensure_ascii=False) + "\n")
             count += 1
+            if cur is not None:
+                paper_rows.append(_paper_row(res))
+                if len(paper_rows) >= DB_WRITE_BATCH:
+                    inserted += _write_paper_rows(cur, paper_rows)
+                    paper_rows = []
 
     print("Parsed", count, "PDF(s). Output:", parsed_path)
 
     if skip_db:
         return count
 
-    db_path = db_path or LIT_DB_PATH
-    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(db_path)
-    ensure_schema(conn)
-    cur = conn.cursor()
-    inserted = 0
-    with parsed_path.open("r", encoding="utf-8") as fin:
-        for line in fin:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                rec = json.loads(line)
-            except Exception:
-                continue
-            paper_id = sha1_of_record(rec)
-            title = rec.get("title")
-            authors = json.dumps(rec.get("authors") or [], ensure_ascii=False)
-            year = rec.get("year")
-            journal = rec.get("journal")
-            abstract = rec.get("abstract")
-            keywords = rec.get("keywords")
-            if isinstance(keywords, list):
-                keywords = ",".join(keywords) if keywords else None
-            field = rec.get("field")
-            source = rec.get("source")
-            pdf_path = rec.get("_path")
-            cur.execute(
-                """
-                INSERT OR REPLACE INTO papers
-                (paper_id, title, authors, year, journal, abstract, keywords, field, source, pdf_path, source_path)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (paper_id, title, authors, year, journal, abstract, keywords, field, source, pdf_path, pdf_path),
-            )
-            cur.execute("INSERT OR IGNORE INTO paper_structured(paper_id) VALUES(?)", (paper_id,))
-            cur.execute("INSERT OR IGNORE INTO paper_features(paper_id) VALUES(?)", (paper_id,))
-            inserted += 1
+    inserted += _write_paper_rows(cur, paper_rows)
     conn.commit()
     conn.close()
     print("DB:", db_path, "| Inserted/Updated", inserted, "rows.")
 
     if not skip_db and not skip_features:
-        _run_feature_pipeline(db_path, outdir, raw_dir, n_topics=n_topics)
+        matrix = _run_feature_pipeline(db_path, outdir, raw_dir, n_topics=n_topics, recompute=recompute_features)
+        if context_tags:
+            _generate_context_tags(db_path)
         if index_es:
             _index_to_es(db_path)
         if index_vector:
-            _build_vector_index_from_files(db_path)
+            _build_vector_index_from_files(db_path, matrix=matrix)
 
     return count
 
 
-def _run_feature_pipeline(db_path: str, outdir: Path, raw_dir: Path, n_topics: int = 30) -> None:
-    """规格 4.1/4.2.1：逐篇结构化摘要、关键词、态度、方法、向量；再全局主题聚类写入 topic_id。"""
-    conn = sqlite3.connect(db_path)
+def _process_pdf_star(item: tuple[Path, str]) -> dict:
+    """ProcessPoolExecutor.map 的顶层入口（需可 pickle）。"""
+    pdf_path, source_label = item
+    try:
+        return process_pdf(pdf_path, source_label)
+    except Exception as e:
+        return {"_error": str(e)}
+
+
+def _parse_pdfs(pdfs: list[tuple[Path, str]], workers: int | None = None):
+    """
+    多进程并行解析 PDF（文本抽取与正则启发式均为 CPU 密集），按原顺序逐个产出 ((路径, 来源), 结果)。
+    workers 默认取 LIT_IMPORT_WORKERS 或 CPU 核数；为 1 时在当前进程内顺序解析。
+    """
+    workers = workers or IMPORT_WORKERS
+    if workers <= 1 or len(pdfs) <= 1:
+        for item in pdfs:
+            yield item, _process_pdf_star(item)
+        return
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        yield from zip(pdfs, ex.map(_process_pdf_star, pdfs, chunksize=8))
+
+
+def _run_feature_pipeline(db_path: str, outdir: Path, raw_dir: Path, n_topics: int = 30, recompute: bool = False):
+    """
+    规格 4.1/4.2.1：逐篇结构化摘要、关键词、态度、方法、向量；再全局主题聚类写入 topic_id。
+    已有向量、且标题+摘要哈希与 paper_features.content_hash 一致的文献跳过（recompute=True 时全部重算）；
+    content_hash 只在成功跑完后写入，结构化背景为空（如未配置大模型、模型回答「无」）不触发重算。
+    全库文献都在本次编码时返回 (paper_ids, 向量矩阵) 供直接建 FAISS 索引，否则返回 None。
+    """
+    # 整个流水线共用一个连接（WAL + synchronous=NORMAL），结果最后一个事务内批量写回
+    conn = get_connection(db_path)
     cur = conn.cursor()
-    cur.execute("SELECT paper_id, title, abstract FROM papers")
-    rows = cur.fetchall()
-    conn.close()
+    cur.execute("""
+        SELECT p.paper_id, p.title, p.abstract, f.embedding_id, f.content_hash
+        FROM papers p
+        LEFT JOIN paper_features f ON p.paper_id = f.paper_id
+    """)
+    all_rows = cur.fetchall()
+    n_total = len(all_rows)
+    hashes = {}
+    rows = []
+    # 标题/摘要已变的文献：旧 context_tag 随写回一并清空，由 generate_context_tags 重新生成
+    changed = []
+    for paper_id, title, abstract, embedding_id, stored_hash in all_rows:
+        h = hashes[paper_id] = feature_content_hash(title, abstract)
+        if stored_hash and stored_hash != h:
+            changed.append((paper_id,))
+        if recompute or not embedding_id or stored_hash != h:
+            rows.append((paper_id, title, abstract))
     if not rows:
-        return
+        conn.close()
+        if n_total:
+            # 向量未变，已有 topic_id 仍有效，不再聚类
+            print("  Feature pipeline: all", n_total, "paper(s) up to date.")
+        return None
+    # 只处理了部分文献时，主题须在全库向量上重新聚类
+    partial = len(rows) < n_total
+    if partial:
+        print("  Feature pipeline:", len(rows), "/", n_total, "paper(s) need features")
+    # 结构化摘要：线程池并发请求大模型，整体速率由 structured_extract 的共享限速器控制。
+    # 以网络等待为主，放到后台线程，与下面的零样本分类/向量编码/关键词等模型推理同时进行
+    snippets = []
+    for paper_id, _, _ in rows:
+        raw_file = raw_dir / (paper_id + ".txt")
+        snippets.append(raw_file.read_text(encoding="utf-8", errors="ignore") if raw_file.exists() else "")
+    print("  Structured extraction:", len(rows), "paper(s)")
+    # 后续任一步骤抛错时通知后台抽取停止派发新请求，并取消尚未开始的任务，不再继续调用大模型
+    stop_structured = threading.Event()
+    structured_pool = ThreadPoolExecutor(max_workers=1)
+    try:
+        structured_future = structured_pool.submit(
+            extract_structured_batch, [r[2] or "" for r in rows], snippets, True, db_path=db_path, stop_event=stop_structured
+        )
+        # 态度与方法标签：全部文献批量零样本分类，两组标签共用一次分词与前向
+        texts = [abstract or title or "" for _, title, abstract in rows]
+        print("  Zero-shot classification:", len(rows), "paper(s)")
+        attitudes, methods = classify_attitudes_and_methods_batch(texts)
+        # 标题+摘要只编码一次：同一矩阵既存为 .npy，也作为 KeyBERT 的文档向量
+        print("  Embedding:", len(rows), "paper(s)")
+        titles = [r[1] or "" for r in rows]
+        abstracts = [r[2] or "" for r in rows]
+        vectors = encode_paper_texts([f"{t}\n{a}"[:4000] for t, a in zip(titles, abstracts)])
+        embedding_ids = embed_and_save_batch([r[0] for r in rows], titles, abstracts, LIT_EMBEDDINGS_DIR, vectors=vectors)
+        print("  Keywords:", len(rows), "paper(s)")
+        keywords = keybert_extract_batch([f"{t}\n{a}" for t, a in zip(titles, abstracts)], top_n=8, doc_embeddings=vectors)
+        # .npy 在后台写盘，与 KeyBERT 重叠；入库与聚类读取前等待落盘，写失败的不记录 embedding_id
+        failed = flush_embedding_writes()
+        if failed:
+            embedding_ids = [None if e in failed else e for e in embedding_ids]
+        # 主题聚类直接用内存中的向量矩阵，topic_id 与其余特征同一条 UPDATE 写回，不再回读 .npy
+        topics: dict[str, str] = {}
+        if vectors is not None and not partial:
+            print("  Assigning topic_id...")
+            sel = [i for i, e in enumerate(embedding_ids) if e]
+            topics = _topic_labels([rows[i][0] for i in sel], vectors[sel], n_topics)
+        structured = structured_future.result()
+    finally:
+        stop_structured.set()
+        structured_pool.shutdown(wait=False, cancel_futures=True)
+    rows_struct, rows_kw, rows_feat = [], [], []
     for i, (paper_id, title, abstract) in enumerate(rows):
         if (i + 1) % 50 == 0:
             print("  Feature pipeline:", i + 1, "/", len(rows))
-        raw_file = raw_dir / (paper_id + ".txt")
-        full_snippet = raw_file.read_text(encoding="utf-8", errors="ignore") if raw_file.exists() else ""
         try:
             out = run_single_paper(
                 paper_id=paper_id,
                 title=title or "",
                 abstract=abstract or "",
-                full_text_snippet=full_snippet,
+                full_text_snippet=snippets[i],
                 embeddings_dir=LIT_EMBEDDINGS_DIR,
                 use_llm_structured=True,
+                attitude_label=attitudes[i],
+                methods_label=methods[i],
+                embedding_id=embedding_ids[i] or "",
+                keywords=keywords[i],
+                structured=structured[i],
             )
         except Exception as e:
             print("  Error", paper_id, e)
+            embedding_ids[i] = None
             continue
-        conn = sqlite3.connect(db_path)
-        cur = conn.cursor()
         s = out["structured"]
-        cur.execute(
+        rows_struct.append(
+            (s.get("background", ""), s.get("research_question", ""), s.get("methods", ""), s.get("conclusions", ""), s.get("contributions", ""), s.get("limitations", ""), paper_id)
+        )
+        kw_str = ",".join(out["keywords"][:15]) if out.get("keywords") else ""
+        rows_kw.append((kw_str, paper_id))
+        rows_feat.append(
+            (
+                out.get("attitude_label", ""),
+                out.get("methods_label", ""),
+                out.get("embedding_id") or "",
+                topics.get(paper_id),
+                hashes[paper_id],
+                paper_id,
+            )
+        )
+    try:
+        cur.executemany(
             """
             UPDATE paper_structured SET background=?, research_question=?, methods=?, conclusions=?, contributions=?, limitations=?
             WHERE paper_id=?
             """,
-            (s.get("background", ""), s.get("research_question", ""), s.get("methods", ""), s.get("conclusions", ""), s.get("contributions", ""), s.get("limitations", ""), paper_id),
+            rows_struct,
         )
-        kw_str = ",".join(out["keywords"][:15]) if out.get("keywords") else ""
-        cur.execute("UPDATE papers SET keywords=? WHERE paper_id=?", (kw_str, paper_id))
-        cur.execute(
-            "UPDATE paper_features SET attitude_label=?, methods_label=?, embedding_id=? WHERE paper_id=?",
-            (out.get("attitude_label", ""), out.get("methods_label", ""), out.get("embedding_id") or "", paper_id),
+        cur.executemany("UPDATE papers SET keywords=? WHERE paper_id=?", rows_kw)
+        cur.executemany("UPDATE papers SET context_tag=NULL WHERE paper_id=?", changed)
+        cur.executemany(
+            # 未参与聚类（无向量或聚类失败）的保留原 topic_id
+            "UPDATE paper_features SET attitude_label=?, methods_label=?, embedding_id=?, topic_id=COALESCE(?, topic_id), content_hash=? "
+            "WHERE paper_id=?",
+            rows_feat,
         )
         conn.commit()
+    finally:
         conn.close()
-    print("  Feature pipeline done. Assigning topic_id...")
-    _assign_topic_ids(db_path, n_topics=n_topics)
+    print("  Feature pipeline done.")
     _print_sample_structured(db_path)
+    if partial:
+        _assign_topic_ids(db_path, n_topics=n_topics)
+        return None
+    if vectors is None:
+        return None
+    sel = [i for i, e in enumerate(embedding_ids) if e]
+    return [rows[i][0] for i in sel], vectors[sel]
 
 
 def _print_sample_structured(db_path: str) -> None:
@@ -196,9 +377,97 @@ def _print_sample_structured(db_path: str) -> None:
         print("  [样本] 结构化摘要(背景/问题/方法/结论) 已填:", has_glm, "| 背景长度:", len(bg or ""), "| 结论长度:", len(c or ""))
 
 
-def _assign_topic_ids(db_path: str, n_topics: int = 30) -> None:
-    """规格 4.2.2：利用预计算向量做 k-means 聚类，写入 paper_features.topic_id。"""
+def _kmeans_plusplus_init(X, n_clusters: int, seed: int = 42):
+    """k-means++ 初始中心（CPU，numpy）。"""
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    n = X.shape[0]
+    centers = np.empty((n_clusters, X.shape[1]), dtype=np.float32)
+    centers[0] = X[rng.integers(n)]
+    d2 = ((X - centers[0]) ** 2).sum(axis=1)
+    for k in range(1, n_clusters):
+        total = float(d2.sum())
+        j = rng.choice(n, p=d2 / total) if total > 0 else rng.integers(n)
+        centers[k] = X[j]
+        d2 = np.minimum(d2, ((X - centers[k]) ** 2).sum(axis=1))
+    return centers
+
+
+def _kmeans_labels_gpu(X, n_clusters: int, niter: int = 20):
+    """
+    GPU k-means：有 cuML 时直接用 cuml KMeans；否则 torch 手写 Lloyd 迭代，
+    距离用 FP16 GEMM（‖c‖² − 2·x·cᵀ，行内常数 ‖x‖² 不影响 argmin），中心按 FP32 累加更新。
+    """
     import numpy as np
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    try:
+        from cuml.cluster import KMeans as CuKMeans
+        return np.asarray(CuKMeans(n_clusters=n_clusters, random_state=42, output_type="numpy").fit_predict(X))
+    except ImportError:
+        pass
+    import torch
+    Xt = torch.from_numpy(X).to("cuda", dtype=torch.float16)
+    C = torch.from_numpy(_kmeans_plusplus_init(X, n_clusters)).to("cuda")
+    with torch.inference_mode():
+        for it in range(niter + 1):
+            Ch = C.half()
+            labels = ((Ch * Ch).sum(dim=1) - 2 * (Xt @ Ch.T)).argmin(dim=1)
+            if it == niter:
+                break
+            sums = torch.zeros_like(C).index_add_(0, labels, Xt.float())
+            counts = torch.bincount(labels, minlength=n_clusters).float()
+            # 空簇保留原中心
+            C = torch.where((counts > 0)[:, None], sums / counts.clamp(min=1)[:, None], C)
+    return labels.cpu().numpy()
+
+
+def _kmeans_labels(X, n_clusters: int):
+    """
+    k-means 聚类标签：篇数 ≥ KMEANS_GPU_MIN_ROWS 且有 GPU 时在 GPU 上聚类；
+    否则优先 FAISS（BLAS 批量距离计算，比 sklearn KMeans(n_init=10) 快数倍），未安装时回退 sklearn。
+    """
+    import numpy as np
+    if X.shape[0] >= KMEANS_GPU_MIN_ROWS and get_device() == "cuda":
+        try:
+            return _kmeans_labels_gpu(X, n_clusters)
+        except Exception as e:
+            print("  GPU k-means failed, falling back to CPU:", e)
+    try:
+        import faiss
+    except ImportError:
+        faiss = None
+    if faiss is not None:
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        km = faiss.Kmeans(X.shape[1], n_clusters, niter=20, nredo=1, seed=42, verbose=False)
+        km.train(X)
+        _, labels = km.index.search(X, 1)
+        return labels.ravel()
+    import warnings
+    from sklearn.cluster import KMeans
+    from sklearn.exceptions import ConvergenceWarning
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", ConvergenceWarning)  # 忽略「distinct clusters 少于 n_clusters」
+        kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
+        return kmeans.fit_predict(X)
+
+
+def _topic_labels(paper_ids: list[str], X, n_topics: int = 30) -> dict[str, str]:
+    """规格 4.2.2：对向量矩阵做 k-means，返回 paper_id -> topic_id；篇数不足或聚类失败时返回空字典。"""
+    n_clusters = min(n_topics, len(paper_ids))
+    if n_clusters < 2:
+        return {}
+    try:
+        labels = _kmeans_labels(X, n_clusters)
+    except Exception as e:
+        print("  topic_id assign failed:", e)
+        return {}
+    print("  topic_id assigned, n_clusters=", n_clusters)
+    return {pid: f"topic_{label}" for pid, label in zip(paper_ids, labels)}
+
+
+def _assign_topic_ids(db_path: str, n_topics: int = 30) -> None:
+    """离线重建 topic_id：从已保存的 .npy 载入向量聚类后写入 paper_features.topic_id（导入流程内直接用内存矩阵）。"""
+    from lit_review_app.retrieval.vector_store import load_embedding_matrix
     conn = sqlite3.connect(db_path)
     cur = conn.cursor()
     cur.execute("SELECT paper_id, embedding_id FROM paper_features WHERE embedding_id IS NOT NULL AND embedding_id != ''")
@@ -206,45 +475,36 @@ def _assign_topic_ids(db_path: str, n_topics: int = 30) -> None:
     conn.close()
     if not rows:
         return
-    ids = []
-    vecs = []
-    for pid, emb_path in rows:
-        try:
-            v = np.load(emb_path, allow_pickle=True)
-            v = np.asarray(v, dtype=np.float32).flatten()
-            vecs.append(v)
-            ids.append(pid)
-        except Exception:
-            continue
-    if not vecs:
+    ids, X = load_embedding_matrix(rows)
+    if not ids:
         return
-    X = np.stack(vecs)
-    n_clusters = min(n_topics, len(ids))
-    if n_clusters < 2:
+    topics = _topic_labels(ids, X, n_topics)
+    if not topics:
+        return
+    conn = sqlite3.connect(db_path)
+    conn.executemany("UPDATE paper_features SET topic_id=? WHERE paper_id=?", [(t, pid) for pid, t in topics.items()])
+    conn.commit()
+    conn.close()
+
+
+def _generate_context_tags(db_path: str) -> None:
+    """为每篇文献生成 RAG 用的一句话上下文标签（需配置 OPENAI_API_KEY；已有标签的跳过）。"""
+    from lit_review_app.config.settings import OPENAI_API_KEY
+    if not (os.environ.get("OPENAI_API_KEY") or OPENAI_API_KEY):
+        print("上下文标签: 未配置 OPENAI_API_KEY，跳过。")
         return
     try:
-        import warnings
-        from sklearn.cluster import KMeans
-        from sklearn.exceptions import ConvergenceWarning
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore", ConvergenceWarning)  # 忽略「distinct clusters 少于 n_clusters」
-            kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
-            labels = kmeans.fit_predict(X)
-        conn = sqlite3.connect(db_path)
-        cur = conn.cursor()
-        for pid, label in zip(ids, labels):
-            cur.execute("UPDATE paper_features SET topic_id=? WHERE paper_id=?", (f"topic_{label}", pid))
-        conn.commit()
-        conn.close()
-        print("  topic_id assigned, n_clusters=", n_clusters)
+        from lit_review_app.data.context_tags import generate_context_tags
+        n = generate_context_tags(db_path)
+        print("上下文标签: 已生成", n, "篇。")
     except Exception as e:
-        print("  topic_id assign failed:", e)
+        print("上下文标签生成失败:", e)
 
 
 def _index_to_es(db_path: str) -> None:
     try:
         from lit_review_app.retrieval.es_client import create_index_if_not_exists, index_paper
-        from lit_review_app.retrieval.db import get_connection, fetch_papers_by_ids
+        from lit_review_app.retrieval.db import fetch_papers_by_ids
         conn = get_connection(db_path)
         cur = conn.cursor()
         cur.execute("SELECT paper_id FROM papers")
@@ -261,10 +521,14 @@ def _index_to_es(db_path: str) -> None:
         print("ES 索引失败:", e)
 
 
-def _build_vector_index_from_files(db_path: str) -> None:
+def _build_vector_index_from_files(db_path: str, matrix=None) -> None:
+    """构建 FAISS 索引：matrix 为特征流水线返回的 (paper_ids, 向量矩阵) 时直接入库，否则（离线重建）读取各 .npy。"""
     try:
-        from lit_review_app.retrieval.vector_store import build_index_from_embedding_files
-        n = build_index_from_embedding_files(db_path=db_path)
+        from lit_review_app.retrieval.vector_store import build_index_from_embedding_files, build_index_from_matrix
+        if matrix is not None:
+            n = build_index_from_matrix(*matrix)
+        else:
+            n = build_index_from_embedding_files(db_path=db_path)
         print("向量索引: 已构建", n, "篇。")
     except Exception as e:
         print("向量索引构建失败:", e)
@@ -281,6 +545,9 @@ def main():
     p.add_argument("--no-es", action="store_true")
     p.add_argument("--no-vector", action="store_true")
     p.add_argument("--n-topics", type=int, default=30)
+    p.add_argument("--no-context-tags", action="store_true", help="跳过 RAG 上下文标签生成")
+    p.add_argument("--workers", type=int, default=None, help="PDF 解析进程数（默认 LIT_IMPORT_WORKERS 或 CPU 核数）")
+    p.add_argument("--recompute-features", action="store_true", help="重算全部文献特征（默认跳过已有向量且标题+摘要哈希与上次一致的）")
     args = p.parse_args()
     run_import(
         outdir=Path(args.outdir),
@@ -291,6 +558,9 @@ def main():
         index_vector=not args.no_vector,
         skip_features=args.skip_features,
         n_topics=args.n_topics,
+        context_tags=not args.no_context_tags,
+        workers=args.workers,
+        recompute_features=args.recompute_features,
     )
 
 
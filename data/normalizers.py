@@ -2,12 +2,23 @@
 import re
 from typing import Any
 
+# 规范化用正则：模块加载时编译一次
+_RE_YEAR = re.compile(r"(19\d{2}|20\d{2})")
+_RE_PAREN = re.compile(r"\(.*?\)")
+_RE_SQUARE = re.compile(r"\[.*?\]")
+_RE_ANGLE = re.compile(r"\<.*?\>")
+_RE_TRAILING_PUNCT = re.compile(r"[，,;。]+$")
+_RE_MULTISPACE = re.compile(r"\s+")
+_RE_AND = re.compile(r"\b(and|和)\b", re.I)
+_RE_JOURNAL_BODY = re.compile(r"中国行政管理.{10,}(稳健性|引言|参考文献|（[一二三四五六七八九十]）)")
+_RE_KW_SEP = re.compile(r"[,;；\n]")
+
 
 def normalize_year(y: Any) -> str | None:
     if y is None:
         return None
     s = str(y).strip()
-    m = re.search(r"(19\d{2}|20\d{2})", s)
+    m = _RE_YEAR.search(s)
     return m.group(1) if m else None
 
 
@@ -15,12 +26,12 @@ def normalize_author(name: str) -> str:
     if not name or not isinstance(name, str):
         return ""
     s = name.strip()
-    s = re.sub(r"\(.*?\)", "", s)
-    s = re.sub(r"\[.*?\]", "", s)
-    s = re.sub(r"\<.*?\>", "", s)
-    s = re.sub(r"[，,;。]+$", "", s)
-    s = re.sub(r"\s+", " ", s)
-    if "," in s and not re.search(r"\b(and|和)\b", s, re.I):
+    s = _RE_PAREN.sub("", s)
+    s = _RE_SQUARE.sub("", s)
+    s = _RE_ANGLE.sub("", s)
+    s = _RE_TRAILING_PUNCT.sub("", s)
+    s = _RE_MULTISPACE.sub(" ", s)
+    if "," in s and not _RE_AND.search(s):
         parts = [p.strip() for p in s.split(",") if p.strip()]
         if len(parts) >= 2:
             s = " ".join(parts[1:] + [parts[0]])
@@ -31,7 +42,7 @@ def normalize_journal(name: str) -> str:
     if not name:
         return ""
     s = name.strip()
-    s = re.sub(r"\s+", " ", s)
+    s = _RE_MULTISPACE.sub(" ", s)
     s = s.strip(" ,;:。")
     # 期刊字段常混入正文：截断于正文起始标记或长度上限
     if len(s) > 80:
@@ -44,7 +55,7 @@ def normalize_journal(name: str) -> str:
             s = s[:80].strip()
     # 若明显是「中国行政管理」+ 期号/英文名 + 大段正文，只保留期刊名
     if "中国行政管理" in s and len(s) > 35:
-        if re.search(r"中国行政管理.{10,}(稳健性|引言|参考文献|（[一二三四五六七八九十]）)", s):
+        if _RE_JOURNAL_BODY.search(s):
             return "中国行政管理"
     return s
 
@@ -53,7 +64,7 @@ def normalize_keywords(kw: Any) -> list:
     if not kw:
         return []
     if isinstance(kw, str):
-        parts = re.split(r"[,;；\n]", kw)
+        parts = _RE_KW_SEP.split(kw)
     else:
         parts = list(kw)
     return [p.strip() for p in parts if p and p.strip()]
@@ -1,6 +1,9 @@
 """
-数据库 schema：papers / paper_structured / paper_features。
-在原有设计上增加 papers.source 列，用于存储「文献来源」文件夹标签。
+数据库 schema：papers / paper_structured / paper_features / paper_cache / llm_extract_cache / papers_fts。
+在原有设计上增加 papers.source 列，用于存储「文献来源」文件夹标签；papers.context_tag 存放 RAG 用的一句话上下文标签。
+paper_cache 存放在线分析补算的向量/关键词/态度，避免仪表盘每次刷新重复跑模型。
+llm_extract_cache 按内容哈希存放结构化摘要的大模型原始输出，重复导入同一文献时不再请求 API。
+papers_fts 为 papers 的 FTS5 外部内容索引（title/abstract/keywords/journal），由触发器与 papers 同步。
 """
 import sqlite3
 from pathlib import Path
@@ -21,9 +24,11 @@ def ensure_schema(conn: sqlite3.Connection) -> None:
         field TEXT,
         source TEXT,
         pdf_path TEXT,
-        source_path TEXT
+        source_path TEXT,
+        context_tag TEXT
     );
     CREATE INDEX IF NOT EXISTS idx_papers_year ON papers(year);
+    CREATE INDEX IF NOT EXISTS idx_papers_year_pid ON papers(year DESC, paper_id);
     CREATE INDEX IF NOT EXISTS idx_papers_journal ON papers(journal);
     CREATE INDEX IF NOT EXISTS idx_papers_source ON papers(source);
 
@@ -45,12 +50,88 @@ def ensure_schema(conn: sqlite3.Connection) -> None:
         attitude_label TEXT,
         methods_label TEXT,
         extra_tags TEXT,
+        content_hash TEXT,
         FOREIGN KEY(paper_id) REFERENCES papers(paper_id) ON DELETE CASCADE
     );
     """)
+    ensure_paper_cache(conn)
+    ensure_llm_extract_cache(conn)
+    ensure_papers_fts(conn)
     # 若旧表无 source 列则添加
     try:
         cur.execute("SELECT source FROM papers LIMIT 1")
     except sqlite3.OperationalError:
         cur.execute("ALTER TABLE papers ADD COLUMN source TEXT")
+    # 上下文标签列（离线生成，见 data/context_tags.py）
+    try:
+        cur.execute("SELECT context_tag FROM papers LIMIT 1")
+    except sqlite3.OperationalError:
+        cur.execute("ALTER TABLE papers ADD COLUMN context_tag TEXT")
+    # 特征输入哈希列（标题+摘要变化时重算特征，见 import_pipeline._run_feature_pipeline）
+    try:
+        cur.execute("SELECT content_hash FROM paper_features LIMIT 1")
+    except sqlite3.OperationalError:
+        cur.execute("ALTER TABLE paper_features ADD COLUMN content_hash TEXT")
+    conn.commit()
+
+
+def ensure_paper_cache(conn: sqlite3.Connection) -> None:
+    """在线分析结果缓存表；单独建表以便分析服务在旧库上按需创建。"""
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS paper_cache (
+        paper_id TEXT PRIMARY KEY,
+        embed_model TEXT,
+        vector BLOB,
+        keywords_json TEXT,
+        attitude TEXT
+    )
+    """)
     conn.commit()
+
+
+def ensure_llm_extract_cache(conn: sqlite3.Connection) -> None:
+    """结构化摘要大模型输出缓存表（key 为 模型+提示词+文本 的哈希）；单独建表以便抽取模块在旧库上按需创建。"""
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS llm_extract_cache (
+        key TEXT PRIMARY KEY,
+        response TEXT
+    )
+    """)
+    conn.commit()
+
+
+def ensure_papers_fts(conn: sqlite3.Connection) -> bool:
+    """
+    创建 papers 的 FTS5 全文索引及同步触发器；新建时从 papers 全量重建。
+    trigram 分词：中文无空格分词，trigram 支持任意 ≥3 字符子串匹配（与原 LIKE '%q%' 语义一致）。
+    SQLite 不支持 FTS5/trigram（< 3.34）时返回 False。
+    """
+    try:
+        exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='papers_fts'").fetchone()
+        if exists:
+            return True
+        conn.executescript("""
+        CREATE VIRTUAL TABLE papers_fts USING fts5(
+            title, abstract, keywords, journal,
+            content='papers', content_rowid='rowid', tokenize='trigram'
+        );
+        CREATE TRIGGER IF NOT EXISTS papers_fts_ai AFTER INSERT ON papers BEGIN
+            INSERT INTO papers_fts(rowid, title, abstract, keywords, journal)
+            VALUES (new.rowid, new.title, new.abstract, new.keywords, new.journal);
+        END;
+        CREATE TRIGGER IF NOT EXISTS papers_fts_ad AFTER DELETE ON papers BEGIN
+            INSERT INTO papers_fts(papers_fts, rowid, title, abstract, keywords, journal)
+            VALUES ('delete', old.rowid, old.title, old.abstract, old.keywords, old.journal);
+        END;
+        CREATE TRIGGER IF NOT EXISTS papers_fts_au AFTER UPDATE OF title, abstract, keywords, journal ON papers BEGIN
+            INSERT INTO papers_fts(papers_fts, rowid, title, abstract, keywords, journal)
+            VALUES ('delete', old.rowid, old.title, old.abstract, old.keywords, old.journal);
+            INSERT INTO papers_fts(rowid, title, abstract, keywords, journal)
+            VALUES (new.rowid, new.title, new.abstract, new.keywords, new.journal);
+        END;
+        INSERT INTO papers_fts(papers_fts) VALUES ('rebuild');
+        """)
+        conn.commit()
+        return True
+    except sqlite3.OperationalError:
+        return False
@@ -2,46 +2,65 @@
 结构化摘要抽取（规格 4.1 paper_structured）：
 背景、研究问题、方法、结论、创新、不足。
 优先使用智谱 GLM 从摘要/正文抽取；无 API 时使用启发式规则从摘要与章节识别。
-针对智谱 429 限速：请求间隔 + 429 时指数退避重试。
+针对智谱 429 限速：多线程并发请求，共享限速器控制整体请求速率 + 429 时指数退避重试。
+大模型输出按 模型+提示词+文本 的哈希缓存在 llm_extract_cache 表，重复导入时命中缓存不再请求。
 """
+import hashlib
 import os
 import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Any
 
 from lit_review_app.config.settings import (
     OPENAI_API_KEY,
     OPENAI_BASE_URL,
+    LIT_DB_PATH,
     OPENAI_MODEL,
 )
+from lit_review_app.data.schema import ensure_llm_extract_cache
+from lit_review_app.retrieval.db import get_connection, get_write_connection
 
-# 连续请求间隔（秒），降低触发限速概率；可通过环境变量 GLM_REQUEST_DELAY 覆盖
-GLM_REQUEST_DELAY = float(os.environ.get("GLM_REQUEST_DELAY", "3.0"))
+# 全局请求速率上限（次/秒，所有线程共享）；兼容旧的 GLM_REQUEST_DELAY（两次请求最小间隔，秒）
+if "GLM_REQUESTS_PER_SEC" not in os.environ and float(os.environ.get("GLM_REQUEST_DELAY", "0") or 0) > 0:
+    GLM_REQUESTS_PER_SEC = 1.0 / float(os.environ["GLM_REQUEST_DELAY"])
+else:
+    GLM_REQUESTS_PER_SEC = float(os.environ.get("GLM_REQUESTS_PER_SEC", "2"))
+# 批量抽取的并发线程数（网络等待为主，线程即可重叠）
+GLM_CONCURRENCY = int(os.environ.get("GLM_CONCURRENCY", "8"))
 # 429 重试次数与初始等待（秒）
 GLM_RATE_LIMIT_RETRIES = int(os.environ.get("GLM_RATE_LIMIT_RETRIES", "3"))
 GLM_RATE_LIMIT_INITIAL_WAIT = float(os.environ.get("GLM_RATE_LIMIT_INITIAL_WAIT", "2.0"))
 
 
-def _is_rate_limit_error(e: Exception) -> bool:
-    """是否为限速/请求过多类错误（429 或智谱 1305）。"""
-    s = str(e).lower()
-    return "429" in s or "1305" in s or "请求过多" in s or "rate" in s or "limit" in s
+class _RateLimiter:
+    """线程安全的限速器：按固定间隔依次发放请求时间槽，调用方在锁外等待到自己的时间槽。"""
 
+    def __init__(self, rate_per_sec: float):
+        self._interval = 1.0 / rate_per_sec if rate_per_sec > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
 
-def _call_llm_extract(text: str) -> dict[str, str]:
-    """使用智谱 GLM 从文本中抽取结构化字段；遇 429 时指数退避重试，请求前可加间隔。"""
-    api_key = os.environ.get("OPENAI_API_KEY") or OPENAI_API_KEY
-    base_url = os.environ.get("OPENAI_BASE_URL") or OPENAI_BASE_URL
-    model = os.environ.get("OPENAI_MODEL") or OPENAI_MODEL
-    if not api_key or not text.strip():
-        return {}
-    delay = max(0, GLM_REQUEST_DELAY)
-    if delay > 0:
-        time.sleep(delay)
-    try:
-        from openai import OpenAI
-        client = OpenAI(api_key=api_key, base_url=base_url.rstrip("/") if base_url else None)
-        prompt = """从下面学术文献的摘要或正文片段中，抽取以下六项内容，每项用一句话概括；若无法识别则输出“无”。
+    def acquire(self) -> None:
+        if self._interval <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self._interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+_rate_limiter = _RateLimiter(GLM_REQUESTS_PER_SEC)
+
+# 与对话缓存共用总开关 LIT_LLM_CACHE；抽取结果与文本一一对应，不设过期
+EXTRACT_CACHE_ENABLED = os.environ.get("LIT_LLM_CACHE", "1") != "0"
+# 已建好 llm_extract_cache 表的库路径
+_extract_cache_ready: set[str] = set()
+
+_EXTRACT_PROMPT = """从下面学术文献的摘要或正文片段中，抽取以下六项内容，每项用一句话概括；若无法识别则输出“无”。
 输出格式（每行一项，不要编号外的其他符号）：
 背景：
 研究问题：
@@ -52,18 +71,98 @@ def _call_llm_extract(text: str) -> dict[str, str]:
 
 文本：
 """
+
+
+def _extract_cache_key(model: str, text: str) -> str:
+    return hashlib.sha1(f"{model}|{_EXTRACT_PROMPT}|{text}".encode("utf-8")).hexdigest()
+
+
+def _extract_cache_get(key: str, db_path: str | None = None) -> str | None:
+    if not EXTRACT_CACHE_ENABLED:
+        return None
+    db_path = db_path or LIT_DB_PATH
+    conn = get_connection(db_path)
+    try:
+        if db_path not in _extract_cache_ready:
+            ensure_llm_extract_cache(conn)
+            _extract_cache_ready.add(db_path)
+        row = conn.execute("SELECT response FROM llm_extract_cache WHERE key=?", (key,)).fetchone()
+        return row[0] if row else None
+    except Exception:
+        return None
+    finally:
+        conn.close()
+
+
+def _extract_cache_put(key: str, response: str, db_path: str | None = None) -> None:
+    if not EXTRACT_CACHE_ENABLED:
+        return
+    try:
+        conn = get_write_connection(db_path or LIT_DB_PATH)
+    except Exception:
+        return
+    try:
+        conn.execute("INSERT OR REPLACE INTO llm_extract_cache(key, response) VALUES (?, ?)", (key, response))
+        conn.commit()
+    except Exception:
+        pass
+    finally:
+        conn.close()
+
+_client = None
+_client_key: tuple[str, str] | None = None
+_client_lock = threading.Lock()
+
+
+def _get_client(api_key: str, base_url: str):
+    """各线程共用一个 OpenAI 客户端（线程安全，复用连接池）；密钥或地址变化时重建。"""
+    global _client, _client_key
+    key = (api_key, base_url or "")
+    with _client_lock:
+        if _client is None or _client_key != key:
+            from openai import OpenAI
+            _client = OpenAI(api_key=api_key, base_url=base_url.rstrip("/") if base_url else None)
+            _client_key = key
+        return _client
+
+
+def _is_rate_limit_error(e: Exception) -> bool:
+    """是否为限速/请求过多类错误（429 或智谱 1305）。"""
+    s = str(e).lower()
+    return "429" in s or "1305" in s or "请求过多" in s or "rate" in s or "limit" in s
+
+
+def _call_llm_extract(text: str, db_path: str | None = None) -> dict[str, str]:
+    """使用智谱 GLM 从文本中抽取结构化字段；先查 db_path 库内的内容哈希缓存，未命中时每次请求前经共享限速器，遇 429 时指数退避重试。"""
+    api_key = os.environ.get("OPENAI_API_KEY") or OPENAI_API_KEY
+    base_url = os.environ.get("OPENAI_BASE_URL") or OPENAI_BASE_URL
+    model = os.environ.get("OPENAI_MODEL") or OPENAI_MODEL
+    if not api_key or not text.strip():
+        return {}
+    text = text[:4000]
+    key = _extract_cache_key(model, text)
+    cached = _extract_cache_get(key, db_path)
+    if cached is not None:
+        return _parse_llm_response(cached)
+    try:
+        client = _get_client(api_key, base_url)
         last_err = None
         for attempt in range(GLM_RATE_LIMIT_RETRIES + 1):
+            _rate_limiter.acquire()
             try:
                 resp = client.chat.completions.create(
                     model=model,
-                    messages=[{"role": "user", "content": prompt + text[:4000]}],
+                    messages=[{"role": "user", "content": _EXTRACT_PROMPT + text}],
                     max_tokens=800,
                 )
                 if not resp.choices:
                     return {}
                 content = resp.choices[0].message.content or ""
-                return _parse_llm_response(content)
+                out = _parse_llm_response(content)
+                # 只缓存可解析的输出，失败/格式异常的下次重试
+                if out:
+                    _extract_cache_put(key, content, db_path)
+                return out
             except Exception as e:
                 last_err = e
                 if attempt < GLM_RATE_LIMIT_RETRIES and _is_rate_limit_error(e):
@@ -80,62 +179,94 @@ def _call_llm_extract(text: str) -> dict[str, str]:
         return {}
 
 
+# LLM 输出的「标签：内容」行，逐行解析
+_LLM_LABEL_KEYS = {
+    "背景": "background",
+    "研究问题": "research_question",
+    "方法与数据": "methods",
+    "主要结论": "conclusions",
+    "创新点": "contributions",
+    "不足与局限": "limitations",
+}
+# 行首可能出现的列表符号/编号
+_LLM_LINE_PREFIX = " \t-*•·0123456789.、)）"
+
+# 启发式抽取用正则：模块加载时编译一次
+_RE_H_BACKGROUND = re.compile(r"(随着|近年来|在[^。]{5,50}背景下?)[^。]{10,200}[。.]")
+_RE_H_QUESTION = re.compile(r"(本文|本研究|本论文)[^。]{5,150}(探讨|研究|分析)[^。]{0,100}[。.]")
+_RE_H_METHODS = re.compile(r"(采用|运用|通过)[^。]{10,120}(方法|模型|数据)[^。]{0,80}[。.]|(实证|案例|比较)[^。]{5,100}[。.]")
+_RE_H_CONCLUSIONS = re.compile(r"(结果表明?|研究发现?|综上)[^。]{10,200}[。.]")
+_RE_H_CONTRIBUTIONS = re.compile(r"(创新|贡献)[点在于]?[^。]{5,120}[。.]")
+_RE_H_LIMITATIONS = re.compile(r"(不足|局限)[^。]{5,120}[。.]")
+_HEURISTIC_PATTERNS = (
+    ("background", _RE_H_BACKGROUND),
+    ("research_question", _RE_H_QUESTION),
+    ("methods", _RE_H_METHODS),
+    ("conclusions", _RE_H_CONCLUSIONS),
+    ("contributions", _RE_H_CONTRIBUTIONS),
+    ("limitations", _RE_H_LIMITATIONS),
+)
+
+
 def _parse_llm_response(content: str) -> dict[str, str]:
-    """解析 LLM 返回的「背景：…」格式为 dict。"""
+    """
+    解析 LLM 返回的「背景：…」格式为 dict（每个标签取首次出现）。单遍逐行扫描：
+    标签行开启新字段；以小写字母/数字等开头的后续行视为上一字段的续行，以大写字母或汉字开头的非标签行结束该字段
+    （标签后为空时，下一行即为字段内容）。
+    """
+    fields: dict[str, list[str]] = {}
+    current = None
+    for line in content.splitlines():
+        head = line.lstrip(_LLM_LINE_PREFIX)
+        pos = min((i for i in (head.find("："), head.find(":")) if i >= 0), default=-1)
+        key = _LLM_LABEL_KEYS.get(head[:pos].strip()) if pos > 0 else None
+        if key is not None:
+            if key in fields:
+                current = None
+            else:
+                current = fields[key] = [head[pos + 1:].strip()]
+        elif current is not None and line and (
+            not any(current) or not ("A" <= line[0] <= "Z" or "\u4e00" <= line[0] <= "\u9fff")
+        ):
+            # 标签后内容换行书写时，首个非空行即为该字段内容
+            current.append(line)
+        else:
+            current = None
     out = {}
-    keys = ["background", "research_question", "methods", "conclusions", "contributions", "limitations"]
-    labels = ["背景", "研究问题", "方法与数据", "主要结论", "创新点", "不足与局限"]
-    for key, label in zip(keys, labels):
-        m = re.search(rf"{re.escape(label)}\s*[：:]\s*(.+?)(?=\n[A-Z\u4e00-\u9fff]|$)", content, re.DOTALL)
-        if m:
-            val = m.group(1).strip().strip("。").replace("\n", " ")
-            if val and val != "无":
-                out[key] = val[:2000]
+    for key, parts in fields.items():
+        val = " ".join(parts).strip().strip("。")
+        if val and val != "无":
+            out[key] = val[:2000]
     return out
 
 
 def _heuristic_from_abstract(abstract: str, full_text_snippet: str = "") -> dict[str, str]:
-    """无 LLM 时：从摘要与正文片段用启发式规则抽取。"""
+    """
+    无 LLM 时：从摘要与正文片段用启发式规则抽取。
+    背景常含「随着/近年来/在……背景下」，研究问题含「本文……探讨/研究/分析」，方法含「采用……方法/模型/数据」或「实证/案例/比较」，
+    结论含「表明/发现/综上」，创新与不足含「创新/贡献」「不足/局限」。
+    """
     text = (abstract or "") + "\n" + (full_text_snippet or "")[:3000]
     if not text.strip():
         return {}
     out = {}
-    # 背景：常含“随着”“近年来”“在……背景下”
-    m = re.search(r"(随着|近年来|在[^。]{5,50}背景下?)[^。]{10,200}[。.]", text)
-    if m:
-        out["background"] = m.group(0).strip()[:500]
-    # 研究问题：含“本文”“本研究”“探讨”“分析”
-    m = re.search(r"(本文|本研究|本论文)[^。]{5,150}(探讨|研究|分析)[^。]{0,100}[。.]", text)
-    if m:
-        out["research_question"] = m.group(0).strip()[:500]
-    # 方法：含“方法”“数据”“实证”“案例”
-    for pat in [r"(采用|运用|通过)[^。]{10,120}(方法|模型|数据)[^。]{0,80}[。.]", r"(实证|案例|比较)[^。]{5,100}[。.]"]:
-        m = re.search(pat, text)
+    for key, pattern in _HEURISTIC_PATTERNS:
+        m = pattern.search(text)
         if m:
-            out["methods"] = m.group(0).strip()[:500]
-            break
-    # 结论：含“表明”“发现”“结果”
-    m = re.search(r"(结果表明?|研究发现?|综上)[^。]{10,200}[。.]", text)
-    if m:
-        out["conclusions"] = m.group(0).strip()[:500]
-    # 创新/不足：含“创新”“不足”“局限”
-    m = re.search(r"(创新|贡献)[点在于]?[^。]{5,120}[。.]", text)
-    if m:
-        out["contributions"] = m.group(0).strip()[:500]
-    m = re.search(r"(不足|局限)[^。]{5,120}[。.]", text)
-    if m:
-        out["limitations"] = m.group(0).strip()[:500]
+            out[key] = m.group(0).strip()[:500]
     return out
 
 
-def extract_structured(abstract: str, full_text_snippet: str = "", use_llm: bool = True) -> dict[str, str]:
+def extract_structured(
+    abstract: str, full_text_snippet: str = "", use_llm: bool = True, db_path: str | None = None
+) -> dict[str, str]:
     """
     返回 paper_structured 所需字段（背景、研究问题、方法、结论、创新、不足）。
-    use_llm=True 且配置了 API Key 时调用智谱；否则使用启发式。
+    use_llm=True 且配置了 API Key 时调用智谱；否则使用启发式。抽取缓存存放在 db_path（默认 LIT_DB_PATH）。
     """
     text = (abstract or "").strip() + "\n" + (full_text_snippet or "").strip()
     if use_llm and (os.environ.get("OPENAI_API_KEY") or OPENAI_API_KEY):
-        llm_out = _call_llm_extract(text)
+        llm_out = _call_llm_extract(text, db_path)
         if llm_out:
             return {
                 "background": llm_out.get("background", ""),
@@ -154,3 +285,38 @@ def extract_structured(abstract: str, full_text_snippet: str = "", use_llm: bool
         "contributions": heuristic.get("contributions", ""),
         "limitations": heuristic.get("limitations", ""),
     }
+
+
+def extract_structured_batch(
+    abstracts: list[str],
+    snippets: list[str],
+    use_llm: bool = True,
+    workers: int | None = None,
+    db_path: str | None = None,
+    stop_event: threading.Event | None = None,
+) -> list[dict[str, str]]:
+    """
+    批量版 extract_structured：线程池并发调用（请求速率由共享限速器控制），返回与输入对齐的结果。
+    单篇异常时回退启发式抽取。stop_event 置位后取消尚未开始的请求并尽快返回（未完成的项为空 dict）。
+    """
+    n = len(abstracts)
+    if not use_llm or not (os.environ.get("OPENAI_API_KEY") or OPENAI_API_KEY) or n <= 1:
+        return [extract_structured(a, s, use_llm=use_llm, db_path=db_path) for a, s in zip(abstracts, snippets)]
+    out: list[dict[str, str]] = [{}] * n
+    done = 0
+    with ThreadPoolExecutor(max_workers=max(1, workers or GLM_CONCURRENCY)) as pool:
+        futures = {pool.submit(extract_structured, a, s, True, db_path): i for i, (a, s) in enumerate(zip(abstracts, snippets))}
+        for fut in as_completed(futures):
+            if stop_event is not None and stop_event.is_set():
+                for f in futures:
+                    f.cancel()
+                break
+            i = futures[fut]
+            try:
+                out[i] = fut.result()
+            except Exception:
+                out[i] = extract_structured(abstracts[i], snippets[i], use_llm=False)
+            done += 1
+            if done % 50 == 0:
+                print("  Structured extraction:", done, "/", n)
+    return out
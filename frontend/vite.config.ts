@@ -1,8 +1,43 @@
-import { defineConfig } from 'vite'
+import { readdirSync, readFileSync, statSync, writeFileSync } from 'node:fs'
+import { join } from 'node:path'
+import { brotliCompressSync, constants, gzipSync } from 'node:zlib'
+import { defineConfig, type Plugin } from 'vite'
 import react from '@vitejs/plugin-react'
 
+const COMPRESSIBLE = /\.(js|css|html|svg|json|map|txt)$/
+
+// 构建后为 dist/assets 下的产物生成 .gz / .br 预压缩副本，由后端 /assets 直接返回；
+// 压缩失败时构建失败，不会留下半套压缩文件
+function precompressAssets(): Plugin {
+  let outDir = 'dist'
+  return {
+    name: 'precompress-assets',
+    apply: 'build',
+    configResolved(config) {
+      outDir = config.build.outDir
+    },
+    closeBundle() {
+      const assetsDir = join(outDir, 'assets')
+      const walk = (dir: string): string[] =>
+        readdirSync(dir).flatMap((name) => {
+          const p = join(dir, name)
+          return statSync(p).isDirectory() ? walk(p) : [p]
+        })
+      for (const file of walk(assetsDir)) {
+        if (!COMPRESSIBLE.test(file) || statSync(file).size < 1024) continue
+        const data = readFileSync(file)
+        writeFileSync(`${file}.gz`, gzipSync(data, { level: 9 }))
+        writeFileSync(
+          `${file}.br`,
+          brotliCompressSync(data, { params: { [constants.BROTLI_PARAM_QUALITY]: constants.BROTLI_MAX_QUALITY } }),
+        )
+      }
+    },
+  }
+}
+
 export default defineConfig({
-  plugins: [react()],
+  plugins: [react(), precompressAssets()],
   server: {
     port: 5173,
     proxy: {
@@ -2,63 +2,310 @@
 检索层数据访问：从 SQLite 按关键词、年份、来源等查询 papers，返回统一结构。
 不依赖 OpenSearch/Milvus，仅 SQLite 即可运行；后续可挂接 ES/向量。
 """
+import atexit
+import functools
 import json
+import os
 import sqlite3
+import threading
 from pathlib import Path
 from typing import Any
 
 from lit_review_app.config.settings import LIT_DB_PATH
 
+# authors 列为 JSON 数组文本，逐行解析优先用 orjson（C 实现）；未安装时回退标准库
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+# 新建连接时执行一次：WAL 允许读写并发，其余为缓存/内存映射调优
+_CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+    # 写锁被占用时等待而非立即报 SQLITE_BUSY（与 sqlite3.connect 默认 timeout=5.0 一致，显式写出）
+    "PRAGMA busy_timeout=5000",
+)
+
+
+class PooledConnection(sqlite3.Connection):
+    """
+    线程内复用的连接：调用方仍按原习惯 conn.close()，此时只回滚未提交事务、连接留在池中；
+    真正关闭（并执行 PRAGMA optimize）由 close_all_connections 在进程退出时完成。
+    """
+
+    def close(self) -> None:
+        if self.in_transaction:
+            self.rollback()
+
+    def really_close(self) -> None:
+        self.pool_closed = True
+        try:
+            self.execute("PRAGMA optimize")
+        except sqlite3.Error:
+            pass
+        super().close()
+
+
+_local = threading.local()
+_all_connections: list[PooledConnection] = []
+_all_connections_lock = threading.Lock()
+
+
+def _open_connection(db_path: str) -> PooledConnection:
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    # 连接只在创建它的线程中使用；关闭 same-thread 检查是为了让退出/关闭阶段能从其他线程统一 really_close
+    conn = sqlite3.connect(db_path, factory=PooledConnection, check_same_thread=False)
+    conn.pool_closed = False
+    for pragma in _CONNECTION_PRAGMAS:
+        try:
+            conn.execute(pragma)
+        except sqlite3.Error:
+            pass
+    return conn
+
 
 def get_connection(db_path: str | None = None):
+    """返回当前线程对该库的复用连接（首次调用时创建并设置 PRAGMA）。"""
     db_path = db_path or LIT_DB_PATH
-    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
-    return sqlite3.connect(db_path)
+    pool = getattr(_local, "connections", None)
+    if pool is None:
+        pool = _local.connections = {}
+    conn = pool.get(db_path)
+    if conn is None or conn.pool_closed:
+        conn = _open_connection(db_path)
+        pool[db_path] = conn
+        with _all_connections_lock:
+            _all_connections.append(conn)
+    return conn
 
 
-def search_sqlite(
-    q: str = "",
+def get_write_connection(db_path: str | None = None):
+    """
+    返回已以 BEGIN IMMEDIATE 开启写事务的池化连接（已在事务中则直接返回），调用方写完后 commit。
+    开始即取得写锁，避免 DEFERRED 事务先读后写时与其他写者升级锁冲突而直接 SQLITE_BUSY。
+    """
+    conn = get_connection(db_path)
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+    return conn
+
+
+def close_all_connections() -> None:
+    """关闭所有线程的池化连接，关闭前执行 PRAGMA optimize 更新查询规划统计（应用关闭与进程退出时调用）。"""
+    with _all_connections_lock:
+        conns = list(_all_connections)
+        _all_connections.clear()
+    for conn in conns:
+        try:
+            conn.really_close()
+        except sqlite3.Error:
+            pass
+
+
+atexit.register(close_all_connections)
+
+# fork 出的子进程中继承来的连接：不可复用也不可关闭（关闭可能做 checkpoint 或删除父进程仍在用的 -wal），只保留引用防止被回收
+_inherited_connections: list[PooledConnection] = []
+
+
+def _reset_pool_after_fork() -> None:
+    """子进程中丢弃继承的连接池，之后 get_connection 重新打开连接。"""
+    global _local, _all_connections_lock
+    for conn in _all_connections:
+        conn.pool_closed = True
+    _inherited_connections.extend(_all_connections)
+    _all_connections.clear()
+    _local = threading.local()
+    _all_connections_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_pool_after_fork)
+
+
+# 已确认存在 papers_fts 的库（只缓存命中；未建索引的库每次重查，导入后即可生效）
+_fts_ready: set[str] = set()
+# trigram 分词下 MATCH 至少需要 3 个字符
+FTS_MIN_QUERY_CHARS = 3
+# bm25 列权重，与 ES multi_match 的 title^3, abstract^2, keywords^2, journal 一致
+_FTS_BM25 = "bm25(papers_fts, 3.0, 2.0, 2.0, 1.0)"
+# 带年份/来源过滤时 CTE 先取的候选倍数（相对 offset+limit）
+FTS_FILTER_OVERFETCH = 10
+# SQLite 3.35+ 支持显式物化 CTE，防止被展开回 MATCH 与连接列条件混合的 WHERE
+_CTE_MATERIALIZED = "MATERIALIZED " if sqlite3.sqlite_version_info >= (3, 35, 0) else ""
+_TOPIC_JOIN = " LEFT JOIN paper_features f ON f.paper_id = p.paper_id"
+
+
+def _fts_filtered_sql(select: str, filters: str, candidates: int | None, order: str = "", join: str = "") -> str:
+    """
+    FTS 命中先在 CTE 中物化（按 BM25 取前 candidates 条，None 为全部），再连接 papers 做年份/来源过滤；
+    MATCH 与连接列条件写在同一 WHERE 时规划器可能放弃 FTS 索引。
+    """
+    limit = " ORDER BY s LIMIT ?" if candidates is not None else ""
+    return (
+        f"WITH fts AS {_CTE_MATERIALIZED}(SELECT rowid, {_FTS_BM25} AS s FROM papers_fts WHERE papers_fts MATCH ?{limit}) "
+        f"SELECT {select} FROM fts JOIN papers p ON p.rowid = fts.rowid{join} WHERE 1=1{filters}{order}"
+    )
+
+
+def fts_available(conn: sqlite3.Connection, db_path: str | None = None) -> bool:
+    """
+    papers_fts 是否已存在。只读检查，不在请求内建表/重建索引；
+    索引由 data.schema.ensure_schema（导入/迁移时）创建，旧库需先跑一次导入。
+    """
+    db_path = db_path or LIT_DB_PATH
+    if db_path in _fts_ready:
+        return True
+    try:
+        exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='papers_fts'").fetchone()
+    except sqlite3.Error:
+        return False
+    if exists:
+        _fts_ready.add(db_path)
+    return bool(exists)
+
+
+def fts_query(q: str) -> str | None:
+    """将检索词转为 FTS5 MATCH 表达式：整体作为一个短语（子串匹配，同原 LIKE 语义）；过短时返回 None。"""
+    q = (q or "").strip()
+    if len(q) < FTS_MIN_QUERY_CHARS:
+        return None
+    return '"' + q.replace('"', '""') + '"'
+
+
+def fts_search(
+    q: str,
     start_year: int | None = None,
     end_year: int | None = None,
     source: str | None = None,
-    limit: int = 100,
-    offset: int = 0,
+    size: int = 100,
     db_path: str | None = None,
-) -> tuple[list[dict], int]:
-    """
-    关键词 + 年份 + 来源过滤，返回 (results, total)。
-    results 中每项为 paper 元数据（含 paper_id, title, authors, year, journal, abstract, keywords, source, pdf_path）。
-    """
+) -> list[tuple[str, float]]:
+    """SQLite FTS5 BM25 检索，返回 [(paper_id, score), ...]（score 越大越相关）；ES 不可用时替代 bm25_search。"""
+    match = fts_query(q)
+    if match is None:
+        return []
     conn = get_connection(db_path)
-    cur = conn.cursor()
+    try:
+        if not fts_available(conn, db_path):
+            return []
+        where, params = _filter_clauses(start_year, end_year, source, "p.")
+        if not where:
+            sql = f"SELECT p.paper_id, -{_FTS_BM25} AS s FROM papers_fts JOIN papers p ON p.rowid = papers_fts.rowid WHERE papers_fts MATCH ? ORDER BY s DESC LIMIT ?"
+            return [(pid, float(score)) for pid, score in conn.execute(sql, [match, size])]
+        filters = "".join(" AND " + w for w in where)
+        out = []
+        for candidates in (size * FTS_FILTER_OVERFETCH, None):
+            sql = _fts_filtered_sql("p.paper_id, -fts.s", filters, candidates, " ORDER BY fts.s LIMIT ?")
+            args = [match] + ([candidates] if candidates is not None else []) + params + [size]
+            out = [(pid, float(score)) for pid, score in conn.execute(sql, args)]
+            # 候选内过滤后不足 size 条时，去掉候选上限重查一次
+            if len(out) >= size:
+                break
+        return out
+    except sqlite3.Error:
+        return []
+    finally:
+        conn.close()
 
+
+def _filter_clauses(start_year: int | None, end_year: int | None, source: str | None, prefix: str = "") -> tuple[list[str], list]:
+    """年份/来源过滤条件。"""
     where = []
     params = []
-    if q and q.strip():
-        t = f"%{q.strip()}%"
-        where.append("(title LIKE ? OR abstract LIKE ? OR keywords LIKE ? OR journal LIKE ?)")
-        params.extend([t, t, t, t])
     if start_year is not None:
-        where.append("(CAST(year AS INTEGER) >= ?)")
+        where.append(f"(CAST({prefix}year AS INTEGER) >= ?)")
         params.append(start_year)
     if end_year is not None:
-        where.append("(CAST(year AS INTEGER) <= ?)")
+        where.append(f"(CAST({prefix}year AS INTEGER) <= ?)")
         params.append(end_year)
     if source:
-        where.append("(source = ?)")
+        where.append(f"({prefix}source = ?)")
         params.append(source)
+    return where, params
 
-    where_sql = " AND ".join(where) if where else "1=1"
-    count_sql = f"SELECT COUNT(*) FROM papers WHERE {where_sql}"
-    cur.execute(count_sql, params)
-    total = cur.fetchone()[0]
 
-    sel = """
-    SELECT paper_id, title, authors, year, journal, abstract, keywords, field, source, pdf_path
-    FROM papers WHERE """ + where_sql + """ ORDER BY year DESC, paper_id LIMIT ? OFFSET ?
+def search_sqlite(
+    q: str = "",
+    start_year: int | None = None,
+    end_year: int | None = None,
+    source: str | None = None,
+    limit: int = 100,
+    offset: int = 0,
+    db_path: str | None = None,
+    cursor: tuple | None = None,
+) -> tuple[list[dict], int]:
     """
-    cur.execute(sel, params + [limit, offset])
-    rows = cur.fetchall()
+    关键词 + 年份 + 来源过滤，返回 (results, total)。
+    results 中每项为 paper 元数据（含 paper_id, title, authors, year, journal, abstract, keywords, source, pdf_path）。
+    按年份排序的列表（无检索词或走 LIKE 回退）可传 cursor=(上一页末条 year, paper_id)（见 page_cursor）做键集分页，
+    此时忽略 offset，深翻页不再扫描并丢弃前面的行；按 BM25 排序的 FTS 结果仍用 offset。
+    """
+    conn = get_connection(db_path)
+    cur = conn.cursor()
+
+    # 结果带上 paper_features.topic_id，调用方统计主题分布时无需再查一次
+    cols = "p.paper_id, p.title, p.authors, p.year, p.journal, p.abstract, p.keywords, p.field, p.source, p.pdf_path, f.topic_id"
+    where, params = _filter_clauses(start_year, end_year, source, "p.")
+    match = fts_query(q) if q and q.strip() else None
+    rows = None
+    if match is not None and fts_available(conn, db_path) and not where:
+        # FTS5 索引检索，按 BM25（列加权）排序
+        from_sql = "FROM papers_fts JOIN papers p ON p.rowid = papers_fts.rowid WHERE papers_fts MATCH ?"
+        cur.execute("SELECT COUNT(*) " + from_sql, [match])
+        total = cur.fetchone()[0]
+        cur.execute(
+            f"SELECT {cols} {from_sql.replace(' WHERE', _TOPIC_JOIN + ' WHERE', 1)} "
+            f"ORDER BY {_FTS_BM25}, p.year DESC, p.paper_id LIMIT ? OFFSET ?",
+            [match, limit, offset],
+        )
+    elif match is not None and fts_available(conn, db_path):
+        # 带年份/来源过滤：FTS 命中先在 CTE 中物化，再过滤
+        filters = "".join(" AND " + w for w in where)
+        cur.execute(_fts_filtered_sql("COUNT(*)", filters, None), [match] + params)
+        total = cur.fetchone()[0]
+        order = " ORDER BY fts.s, p.year DESC, p.paper_id LIMIT ? OFFSET ?"
+        candidates = (offset + limit) * FTS_FILTER_OVERFETCH
+        cur.execute(
+            _fts_filtered_sql(cols, filters, candidates, order, _TOPIC_JOIN), [match, candidates] + params + [limit, offset]
+        )
+        rows = cur.fetchall()
+        # 候选内过滤后不够本页时，去掉候选上限重查
+        if len(rows) < min(limit, total - offset):
+            rows = None
+            cur.execute(_fts_filtered_sql(cols, filters, None, order, _TOPIC_JOIN), [match] + params + [limit, offset])
+    else:
+        # 检索词过短（trigram 无法匹配）或无 FTS5 时回退 LIKE 扫描
+        if q and q.strip():
+            t = f"%{q.strip()}%"
+            where.insert(0, "(p.title LIKE ? OR p.abstract LIKE ? OR p.keywords LIKE ? OR p.journal LIKE ?)")
+            params[:0] = [t, t, t, t]
+        where_sql = " AND ".join(where) if where else "1=1"
+        cur.execute(f"SELECT COUNT(*) FROM papers p WHERE {where_sql}", params)
+        total = cur.fetchone()[0]
+        if cursor is not None:
+            # 键集分页：排序键 (year DESC NULLS LAST, paper_id ASC) 位于 cursor 之后的行
+            last_year, last_pid = cursor
+            if last_year is None:
+                keyset, keyset_params = "(p.year IS NULL AND p.paper_id > ?)", [last_pid]
+            else:
+                keyset = "(p.year < ? OR p.year IS NULL OR (p.year = ? AND p.paper_id > ?))"
+                keyset_params = [last_year, last_year, last_pid]
+            cur.execute(
+                f"SELECT {cols} FROM papers p{_TOPIC_JOIN} WHERE {where_sql} AND {keyset} ORDER BY p.year DESC, p.paper_id LIMIT ?",
+                params + keyset_params + [limit],
+            )
+        else:
+            cur.execute(
+                f"SELECT {cols} FROM papers p{_TOPIC_JOIN} WHERE {where_sql} ORDER BY p.year DESC, p.paper_id LIMIT ? OFFSET ?",
+                params + [limit, offset],
+            )
+    if rows is None:
+        rows = cur.fetchall()
     conn.close()
 
     results = []
@@ -66,7 +313,7 @@ def search_sqlite(
         results.append({
             "paper_id": r[0],
             "title": r[1] or "",
-            "authors": json.loads(r[2]) if r[2] else [],
+            "authors": _json_loads(r[2]) if r[2] else [],
             "year": int(r[3]) if r[3] and str(r[3]).isdigit() else r[3],
             "journal": r[4] or "",
             "abstract": r[5] or "",
@@ -74,30 +321,105 @@ def search_sqlite(
             "field": r[7] or "",
             "source": r[8] or "",
             "pdf_path": r[9] or "",
+            "topic_id": r[10] or "",
         })
     return results, total
 
 
-def fetch_papers_by_ids(paper_ids: list[str], db_path: str | None = None) -> dict[str, dict]:
-    """根据 paper_id 列表批量取元数据。"""
+def page_cursor(results: list[dict]) -> tuple | None:
+    """search_sqlite 一页结果的键集游标（末条的 year, paper_id），传给下一页的 cursor；空页返回 None。"""
+    if not results:
+        return None
+    last = results[-1]
+    # results 中的 year 已转为 int，游标按 papers.year 的 TEXT 存储值比较
+    year = last.get("year")
+    return (None if year is None else str(year), last["paper_id"])
+
+
+# 单条 IN (...) 的最大参数数；旧版 SQLite 的 SQLITE_MAX_VARIABLE_NUMBER 仅 999，超出按块分批查询
+IN_CLAUSE_CHUNK = 500
+# 每次 fetchmany 取回的行数
+FETCH_BATCH = 256
+
+
+def _bucket_size(n: int, chunk: int) -> int:
+    """IN 参数个数向上取到 2 的幂（最少 8，不超过 chunk），使不同长度的 id 列表复用同一条已编译语句。"""
+    size = 8
+    while size < n:
+        size *= 2
+    return min(size, max(chunk, n))
+
+
+@functools.lru_cache(maxsize=256)
+def _in_sql(sql: str, n: int) -> str:
+    return sql.format(placeholders=",".join("?" * n))
+
+
+def select_in_chunks(cur: sqlite3.Cursor, sql: str, ids: list, chunk: int = IN_CLAUSE_CHUNK):
+    """
+    执行含 {placeholders} 占位的 IN 查询，ids 过多时按块分批；按 fetchmany 批量取行后逐行产出。
+    每块参数以 NULL 补齐到分桶长度（IN 中的 NULL 不匹配任何行），SQL 文本固定后命中 sqlite3 的语句缓存。
+    """
+    for i in range(0, len(ids), chunk):
+        part = list(ids[i:i + chunk])
+        n = _bucket_size(len(part), chunk)
+        part.extend([None] * (n - len(part)))
+        cur.execute(_in_sql(sql, n), part)
+        while rows := cur.fetchmany(FETCH_BATCH):
+            yield from rows
+
+
+@functools.lru_cache(maxsize=256)
+def _ord_sql(sql: str, n: int) -> str:
+    values = ",".join(f"(?, {j})" for j in range(n))
+    return f"WITH ord(pid, idx) AS (VALUES {values}) {sql} ORDER BY ord.idx"
+
+
+def select_in_id_order(cur: sqlite3.Cursor, sql: str, ids: list, chunk: int = IN_CLAUSE_CHUNK):
+    """
+    按 ids 顺序产出行：每块 ids 作为 CTE ord(pid, idx) 传入，sql 需 JOIN ord 且不含 ORDER BY，
+    如 "SELECT ... FROM papers p JOIN ord ON ord.pid = p.paper_id"。由 SQLite 按 ord.idx 排序，调用方无需再排。
+    ids 先去重（保留首次出现的位置），重复的 id 只产出一行。
+    与 select_in_chunks 一样以 NULL 补齐到分桶长度以复用已编译语句。
+    """
+    ids = list(dict.fromkeys(ids))
+    for i in range(0, len(ids), chunk):
+        part = list(ids[i:i + chunk])
+        n = _bucket_size(len(part), chunk)
+        part.extend([None] * (n - len(part)))
+        cur.execute(_ord_sql(sql, n), part)
+        while rows := cur.fetchmany(FETCH_BATCH):
+            yield from rows
+
+
+def fetch_papers_by_ids(
+    paper_ids: list[str],
+    db_path: str | None = None,
+    conn: sqlite3.Connection | None = None,
+    with_topic: bool = False,
+) -> dict[str, dict]:
+    """根据 paper_id 列表批量取元数据。传入 conn 时复用调用方的连接且不关闭。with_topic=True 时同一查询带回 topic_id。"""
     if not paper_ids:
         return {}
-    conn = get_connection(db_path)
+    own = conn is None
+    if own:
+        conn = get_connection(db_path)
     cur = conn.cursor()
-    placeholders = ",".join("?" * len(paper_ids))
-    cur.execute(
+    topic_col, join = (", f.topic_id", _TOPIC_JOIN) if with_topic else ("", "")
+    rows = select_in_chunks(
+        cur,
         f"""
-        SELECT paper_id, title, authors, year, journal, abstract, keywords, field, source, pdf_path
-        FROM papers WHERE paper_id IN ({placeholders})
+        SELECT p.paper_id, p.title, p.authors, p.year, p.journal, p.abstract, p.keywords, p.field, p.source, p.pdf_path{topic_col}
+        FROM papers p{join} WHERE p.paper_id IN ({{placeholders}})
         """,
         paper_ids,
     )
     out = {}
-    for r in cur.fetchall():
+    for r in rows:
         out[r[0]] = {
             "paper_id": r[0],
             "title": r[1] or "",
-            "authors": json.loads(r[2]) if r[2] else [],
+            "authors": _json_loads(r[2]) if r[2] else [],
             "year": int(r[3]) if r[3] and str(r[3]).isdigit() else r[3],
             "journal": r[4] or "",
             "abstract": r[5] or "",
@@ -106,68 +428,120 @@ def fetch_papers_by_ids(paper_ids: list[str], db_path: str | None = None) -> dic
             "source": r[8] or "",
             "pdf_path": r[9] or "",
         }
-    conn.close()
+        if with_topic:
+            out[r[0]]["topic_id"] = r[10] or ""
+    if own:
+        conn.close()
     return out
 
 
-def fetch_papers_with_structured(paper_ids: list[str], db_path: str | None = None) -> list[dict]:
-    """
-    规格 4.3 输出：候选列表含基本元信息与结构化摘要。
-    返回 list[dict]，每项含 papers 字段 + paper_structured 字段（background, research_question, methods, conclusions, contributions, limitations）。
-    """
+def iter_papers_with_structured(paper_ids: list[str], db_path: str | None = None, conn: sqlite3.Connection | None = None):
+    """fetch_papers_with_structured 的生成器版本：按 paper_ids 顺序、fetchmany 分批取行，逐条产出 dict，不整体物化结果列表。"""
     if not paper_ids:
-        return []
-    conn = get_connection(db_path)
+        return
+    own = conn is None
+    if own:
+        conn = get_connection(db_path)
     cur = conn.cursor()
-    placeholders = ",".join("?" * len(paper_ids))
-    cur.execute(
-        f"""
+    rows = select_in_id_order(
+        cur,
+        """
         SELECT p.paper_id, p.title, p.authors, p.year, p.journal, p.abstract, p.keywords, p.field, p.source, p.pdf_path,
-               s.background, s.research_question, s.methods, s.conclusions, s.contributions, s.limitations
+               s.background, s.research_question, s.methods, s.conclusions, s.contributions, s.limitations,
+               p.context_tag
         FROM papers p
+        JOIN ord ON ord.pid = p.paper_id
         LEFT JOIN paper_structured s ON p.paper_id = s.paper_id
-        WHERE p.paper_id IN ({placeholders})
         """,
         paper_ids,
     )
-    out = []
-    for r in cur.fetchall():
-        out.append({
-            "paper_id": r[0],
-            "title": r[1] or "",
-            "authors": json.loads(r[2]) if r[2] else [],
-            "year": int(r[3]) if r[3] and str(r[3]).isdigit() else r[3],
-            "journal": r[4] or "",
-            "abstract": r[5] or "",
-            "keywords": (r[6].split(",") if isinstance(r[6], str) else []) if r[6] else [],
-            "field": r[7] or "",
-            "source": r[8] or "",
-            "pdf_path": r[9] or "",
-            "background": r[10] or "",
-            "research_question": r[11] or "",
-            "methods": r[12] or "",
-            "conclusions": r[13] or "",
-            "contributions": r[14] or "",
-            "limitations": r[15] or "",
-        })
-    conn.close()
-    return out
+    try:
+        for r in rows:
+            yield {
+                "paper_id": r[0],
+                "title": r[1] or "",
+                "authors": _json_loads(r[2]) if r[2] else [],
+                "year": int(r[3]) if r[3] and str(r[3]).isdigit() else r[3],
+                "journal": r[4] or "",
+                "abstract": r[5] or "",
+                "keywords": (r[6].split(",") if isinstance(r[6], str) else []) if r[6] else [],
+                "field": r[7] or "",
+                "source": r[8] or "",
+                "pdf_path": r[9] or "",
+                "background": r[10] or "",
+                "research_question": r[11] or "",
+                "methods": r[12] or "",
+                "conclusions": r[13] or "",
+                "contributions": r[14] or "",
+                "limitations": r[15] or "",
+                "context_tag": r[16] or "",
+            }
+    finally:
+        if own:
+            conn.close()
 
 
-def fetch_features(paper_ids: list[str], db_path: str | None = None) -> dict[str, dict]:
+def fetch_papers_with_structured(paper_ids: list[str], db_path: str | None = None, conn: sqlite3.Connection | None = None) -> list[dict]:
+    """
+    规格 4.3 输出：候选列表含基本元信息与结构化摘要，顺序与 paper_ids 一致。
+    返回 list[dict]，每项含 papers 字段 + paper_structured 字段（background, research_question, methods, conclusions, contributions, limitations）。
+    只需遍历一次的调用方可直接用 iter_papers_with_structured。
+    """
+    return list(iter_papers_with_structured(paper_ids, db_path=db_path, conn=conn))
+
+
+def fetch_features(paper_ids: list[str], db_path: str | None = None, conn: sqlite3.Connection | None = None) -> dict[str, dict]:
     """取 paper_features：topic_id, attitude_label, methods_label。"""
     if not paper_ids:
         return {}
-    conn = get_connection(db_path)
+    own = conn is None
+    if own:
+        conn = get_connection(db_path)
     cur = conn.cursor()
-    placeholders = ",".join("?" * len(paper_ids))
-    cur.execute(
-        f"""
+    rows = select_in_chunks(
+        cur,
+        """
         SELECT paper_id, topic_id, attitude_label, methods_label
         FROM paper_features WHERE paper_id IN ({placeholders})
         """,
         paper_ids,
     )
-    out = {r[0]: {"topic_id": r[1] or "", "attitude_label": r[2] or "", "methods_label": r[3] or ""} for r in cur.fetchall()}
-    conn.close()
+    out = {r[0]: {"topic_id": r[1] or "", "attitude_label": r[2] or "", "methods_label": r[3] or ""} for r in rows}
+    if own:
+        conn.close()
     return out
+
+
+_STRUCTURED_FIELDS = ("background", "research_question", "methods", "conclusions", "contributions", "limitations")
+
+
+def fetch_features_and_structured(
+    paper_ids: list[str],
+    include_structured: bool = True,
+    db_path: str | None = None,
+    conn: sqlite3.Connection | None = None,
+) -> dict[str, dict]:
+    """
+    检索结果的补充字段一次查询取回：paper_features.topic_id 与（可选）paper_structured 六个字段，
+    返回 {paper_id: {"topic_id": ..., "background": ..., ...}}，缺失字段为空串。
+    """
+    if not paper_ids:
+        return {}
+    own = conn is None
+    if own:
+        conn = get_connection(db_path)
+    fields = _STRUCTURED_FIELDS if include_structured else ()
+    cols = "".join(f", s.{k}" for k in fields)
+    join = " LEFT JOIN paper_structured s ON s.paper_id = p.paper_id" if include_structured else ""
+    try:
+        rows = select_in_chunks(
+            conn.cursor(),
+            f"SELECT p.paper_id, f.topic_id{cols} FROM papers p "
+            f"LEFT JOIN paper_features f ON f.paper_id = p.paper_id{join} "
+            "WHERE p.paper_id IN ({placeholders})",
+            paper_ids,
+        )
+        return {r[0]: {"topic_id": r[1] or "", **{k: v or "" for k, v in zip(fields, r[2:])}} for r in rows}
+    finally:
+        if own:
+            conn.close()
@@ -2,35 +2,89 @@
 Elasticsearch 索引与 BM25 检索。用于关键词匹配，不做简单 TF-IDF 降级。
 """
 import json
+import os
+import threading
+import time
 from typing import Any
 
 from lit_review_app.config.settings import ES_HOST, ES_INDEX
 
+ES_REQUEST_TIMEOUT = float(os.environ.get("LIT_ES_TIMEOUT", "3"))
+ES_POOL_SIZE = int(os.environ.get("LIT_ES_POOL_SIZE", "32"))
+# index_exists 结果缓存秒数：每次 hybrid_search 不必为确认索引存在而请求 ES
+ES_EXISTS_TTL = float(os.environ.get("LIT_ES_EXISTS_TTL", "60"))
+
+_es = None
+_es_failed = False
+_es_lock = threading.Lock()
+_exists_cache: tuple[float, bool] | None = None
+# 本进程是否已为旧索引补过 year_i 映射（每个进程只发一次 put_mapping）
+_mapping_ensured = False
+
 
 def _get_client():
-    try:
-        from elasticsearch import Elasticsearch
-        return Elasticsearch(ES_HOST)
-    except Exception:
-        return None
+    """进程内共享的 Elasticsearch 客户端（自带连接池）；未安装时返回 None。"""
+    global _es, _es_failed
+    if _es is not None or _es_failed:
+        return _es
+    with _es_lock:
+        if _es is not None or _es_failed:
+            return _es
+        try:
+            from elasticsearch import Elasticsearch
+        except Exception:
+            _es_failed = True
+            return None
+        try:
+            _es = Elasticsearch(
+                ES_HOST,
+                http_compression=True,
+                connections_per_node=ES_POOL_SIZE,
+                request_timeout=ES_REQUEST_TIMEOUT,
+            )
+        except TypeError:
+            # 7.x 客户端不支持 connections_per_node / request_timeout
+            _es = Elasticsearch(ES_HOST)
+        except Exception:
+            _es_failed = True
+        return _es
 
 
 def index_exists() -> bool:
+    global _exists_cache
+    cached = _exists_cache
+    if cached is not None and time.monotonic() - cached[0] < ES_EXISTS_TTL:
+        return cached[1]
     es = _get_client()
     if not es:
         return False
     try:
         r = es.indices.exists(index=ES_INDEX)
-        return r if isinstance(r, bool) else getattr(r, "body", False)
+        ok = bool(r if isinstance(r, bool) else getattr(r, "body", False))
     except Exception:
-        return False
+        ok = False
+    _exists_cache = (time.monotonic(), ok)
+    return ok
+
+
+def _mark_exists() -> None:
+    global _exists_cache
+    _exists_cache = (time.monotonic(), True)
 
 
 def create_index_if_not_exists() -> bool:
+    global _exists_cache, _mapping_ensured
     es = _get_client()
     if not es:
         return False
     if index_exists():
+        # 旧索引补充 year_i 字段映射（每进程一次）；文档需重新 index_paper 后才有该字段值
+        if not _mapping_ensured:
+            try:
+                es.indices.put_mapping(index=ES_INDEX, properties={"year_i": {"type": "integer"}})
+                _mapping_ensured = True
+            except Exception:
+                pass
         return True
     mapping = {
         "settings": {"number_of_shards": 1, "number_of_replicas": 0},
@@ -40,6 +94,8 @@ def create_index_if_not_exists() -> bool:
                 "title": {"type": "text", "fields": {"raw": {"type": "keyword"}}},
                 "authors": {"type": "text", "index": False},
                 "year": {"type": "keyword"},
+                # 数值年份，供 range 过滤走数值索引（year 为 keyword 时只能按字符串区间比较）
+                "year_i": {"type": "integer"},
                 "journal": {"type": "text"},
                 "abstract": {"type": "text"},
                 "keywords": {"type": "text"},
@@ -51,6 +107,8 @@ def create_index_if_not_exists() -> bool:
     }
     try:
         es.indices.create(index=ES_INDEX, body=mapping)
+        _mark_exists()
+        _mapping_ensured = True
         return True
     except Exception as e:
         if "resource_already_exists" not in str(e).lower():
@@ -58,19 +116,29 @@ def create_index_if_not_exists() -> bool:
                 es.indices.create(index=ES_INDEX, body={"mappings": mapping["mappings"]})
             except Exception:
                 pass
+        # 建索引后不能沿用缓存的 False
+        _exists_cache = None
         return index_exists()
 
 
+def _year_int(year) -> int | None:
+    try:
+        return int(year) if year not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
 def index_paper(doc: dict) -> bool:
+    """写入单篇文档；调用方需先（整批一次）create_index_if_not_exists，本函数不再逐篇检查索引与映射。"""
     es = _get_client()
     if not es:
         return False
-    create_index_if_not_exists()
     body = {
         "paper_id": doc.get("paper_id"),
         "title": doc.get("title") or "",
         "authors": json.dumps(doc.get("authors") or [], ensure_ascii=False),
         "year": str(doc.get("year") or ""),
+        "year_i": _year_int(doc.get("year")),
         "journal": doc.get("journal") or "",
         "abstract": doc.get("abstract") or "",
         "keywords": doc.get("keywords") or "",
@@ -116,15 +184,29 @@ def bm25_search(
             }
         })
     filter_clauses = []
+    year_range = {}
     if start_year is not None:
-        filter_clauses.append({"range": {"year": {"gte": str(start_year)}}})
+        year_range["gte"] = int(start_year)
     if end_year is not None:
-        filter_clauses.append({"range": {"year": {"lte": str(end_year)}}})
+        year_range["lte"] = int(end_year)
+    if year_range:
+        # 重新索引前的旧文档没有 year_i：这些文档回退到 keyword 字段 year 的字符串区间（4 位年份按字典序比较等价）
+        legacy_range = {op: str(v) for op, v in year_range.items()}
+        filter_clauses.append({
+            "bool": {
+                "should": [
+                    {"range": {"year_i": year_range}},
+                    {"bool": {"must_not": [{"exists": {"field": "year_i"}}], "filter": [{"range": {"year": legacy_range}}]}},
+                ],
+                "minimum_should_match": 1,
+            }
+        })
     if source:
         filter_clauses.append({"term": {"source": source}})
     query = {"bool": {"must": must if must else [{"match_all": {}}], "filter": filter_clauses}}
     try:
-        res = es.search(index=ES_INDEX, query=query, size=size)
+        # 只用 _id 与 _score：不取完整 _source，也不统计命中总数
+        res = es.search(index=ES_INDEX, query=query, size=size, source=["paper_id"], track_total_hits=False)
         out = []
         for h in res.get("hits", {}).get("hits", []):
             pid = h.get("_id") or (h.get("_source") or {}).get("paper_id")
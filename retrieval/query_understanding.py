@@ -1,14 +1,19 @@
 """
 规格 4.3 查询理解：将用户自然语言解析为结构化查询（主题词列表、时间区间、过滤条件）。
 """
+import functools
 import re
 from dataclasses import dataclass
 from typing import Any
 
 
-@dataclass
+# 超过该长度的查询不进缓存（长文本极少重复，且避免缓存键占用过多内存）
+PARSE_CACHE_MAX_CHARS = 256
+
+
+@dataclass(frozen=True)
 class ParsedQuery:
-    topic_terms: list[str]
+    topic_terms: tuple[str, ...]
     start_year: int | None
     end_year: int | None
     language: str | None
@@ -16,30 +21,49 @@ class ParsedQuery:
     raw_query: str
 
 
+# 年份：2018-2024、2018至2024、2018年到2024、after 2020、before 2019（模块加载时编译一次）
+_YEAR_PATTERNS = [
+    (re.compile(r"(?:19|20)\d{2}\s*[-–至到]\s*(?:19|20)\d{2}", re.I), "range"),
+    (re.compile(r"(?:19|20)\d{2}\s*年\s*(?:至今|以后)", re.I), "start"),
+    (re.compile(r"(?:after|since|从)\s*(?:19|20)\d{2}", re.I), "start"),
+    (re.compile(r"(?:before|之前)\s*(?:19|20)\d{2}", re.I), "end"),
+    (re.compile(r"(?:19|20)\d{2}\s*年?(?:以前|之前)", re.I), "end"),
+]
+_RE_YEAR_NUM = re.compile(r"19\d{2}|20\d{2}")
+_RE_LANG_ZH = re.compile(r"\b(中文|汉语|china|chinese)\b", re.I)
+_RE_LANG_EN = re.compile(r"\b(英文|英语|english)\b", re.I)
+_RE_TOKENS = re.compile(r"[a-zA-Z]{2,}|[\u4e00-\u9fff]+")
+_STOP = frozenset({"的", "与", "和", "及", "等", "之", "在", "是", "有", "为", "对", "从", "到", "关于", "研究", "分析", "the", "and", "for", "with", "from", "about"})
+
+
 def parse_query(raw: str) -> ParsedQuery:
     """
     从自然语言中抽取：主题词（剩余有效词）、时间区间（年份正则）、语言/期刊等过滤（可选）。
+    结果不可变，同一查询（如翻页）直接复用 LRU 缓存。
     """
     raw = (raw or "").strip()
+    if len(raw) <= PARSE_CACHE_MAX_CHARS:
+        return _parse_query_cached(raw)
+    return _parse_query(raw)
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_query_cached(raw: str) -> ParsedQuery:
+    return _parse_query(raw)
+
+
+def _parse_query(raw: str) -> ParsedQuery:
     topic_terms = []
     start_year = None
     end_year = None
     language = None
     journal_level = None
 
-    # 年份：2018-2024、2018至2024、2018年到2024、after 2020、before 2019
-    year_patterns = [
-        (r"(?:19|20)\d{2}\s*[-–至到]\s*(?:19|20)\d{2}", "range"),
-        (r"(?:19|20)\d{2}\s*年\s*(?:至今|以后)", "start"),
-        (r"(?:after|since|从)\s*(?:19|20)\d{2}", "start"),
-        (r"(?:before|之前)\s*(?:19|20)\d{2}", "end"),
-        (r"(?:19|20)\d{2}\s*年?(?:以前|之前)", "end"),
-    ]
     remaining = raw
-    for pat, kind in year_patterns:
-        m = re.search(pat, remaining, re.I)
+    for pat, kind in _YEAR_PATTERNS:
+        m = pat.search(remaining)
         if m:
-            nums = re.findall(r"19\d{2}|20\d{2}", m.group(0))
+            nums = _RE_YEAR_NUM.findall(m.group(0))
             nums = [int(x) for x in nums]
             if kind == "range" and len(nums) >= 2:
                 start_year, end_year = min(nums), max(nums)
@@ -49,23 +73,23 @@ def parse_query(raw: str) -> ParsedQuery:
                 end_year = min(nums)
             remaining = remaining[: m.start()] + " " + remaining[m.end() :]
 
-    # 语言：中文/英文
-    if re.search(r"\b(中文|汉语|china|chinese)\b", remaining, re.I):
+    # 语言：中文/英文（subn 一趟完成匹配与替换）
+    remaining, n = _RE_LANG_ZH.subn(" ", remaining)
+    if n:
         language = "zh"
-        remaining = re.sub(r"\b(中文|汉语|china|chinese)\b", " ", remaining, flags=re.I)
-    elif re.search(r"\b(英文|英语|english)\b", remaining, re.I):
-        language = "en"
-        remaining = re.sub(r"\b(英文|英语|english)\b", " ", remaining, flags=re.I)
+    else:
+        remaining, n = _RE_LANG_EN.subn(" ", remaining)
+        if n:
+            language = "en"
 
     # 主题词：剩余部分去停用词、拆分为词列表（中文按字/词，英文按单词）
-    stop = {"的", "与", "和", "及", "等", "之", "在", "是", "有", "为", "对", "从", "到", "关于", "研究", "分析", "the", "and", "for", "with", "from", "about"}
-    tokens = re.findall(r"[a-zA-Z]{2,}|[\u4e00-\u9fff]+", remaining)
-    topic_terms = [t for t in tokens if t and t not in stop]
+    tokens = _RE_TOKENS.findall(remaining)
+    topic_terms = [t for t in tokens if t and t not in _STOP]
     if not topic_terms and raw.strip():
         topic_terms = [raw.strip()[:50]]
 
     return ParsedQuery(
-        topic_terms=topic_terms,
+        topic_terms=tuple(topic_terms),
         start_year=start_year,
         end_year=end_year,
         language=language,
@@ -1,10 +1,14 @@
 """
 规格 4.3 检索服务层：查询理解 + 多路检索融合（BM25 + 向量 + 期刊权重 + 用户偏好）+ 主题/年份分布输出。
 """
+import functools
+import os
+import threading
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
-from lit_review_app.retrieval.db import search_sqlite, fetch_papers_by_ids, fetch_features
+from lit_review_app.retrieval.db import search_sqlite, fetch_papers_by_ids, fts_search
 from lit_review_app.retrieval.es_client import index_exists, bm25_search
 from lit_review_app.retrieval.vector_store import index_ready, vector_search
 from lit_review_app.retrieval.query_understanding import parse_query, ParsedQuery
@@ -17,42 +21,87 @@ DEFAULT_W3 = 0.1
 DEFAULT_W4 = 0.1
 # 标题中直接出现检索词时加分，避免“仅摘要相关”的文献压过“标题含检索词”的文献
 DEFAULT_TITLE_BONUS = 0.2
+# 并行召回线程数
+SEARCH_WORKERS = int(os.environ.get("LIT_SEARCH_WORKERS", "4"))
 
+_pool: ThreadPoolExecutor | None = None
+_pool_lock = threading.Lock()
 
-def _title_match_bonus(title: str, topic_terms: list[str] | None, raw_query: str) -> float:
-    """标题中含检索词则返回 1.0，否则 0；用于排序时优先标题匹配。"""
-    if not title or not (topic_terms or raw_query or "").strip():
+
+def _term_hits_counter(terms_lc: list[str]):
+    """
+    返回 count(text)：terms_lc 中有多少个（按列表出现次数计）是 text 的子串，每段文本一次线性扫描。
+    优先用 pyahocorasick 的 Aho–Corasick 自动机（每次查询建一次）；未安装时回退为逐词 in。
+    """
+    always = sum(1 for t in terms_lc if not t)
+    words = Counter(t for t in terms_lc if t)
+    if not words:
+        return lambda text: always
+    try:
+        import ahocorasick
+    except ImportError:
+        return lambda text: always + sum(n for w, n in words.items() if w in text)
+    automaton = ahocorasick.Automaton()
+    for w in words:
+        automaton.add_word(w, w)
+    automaton.make_automaton()
+    return lambda text: always + sum(words[w] for w in {w for _, w in automaton.iter(text)})
+
+
+def _title_match_bonus(title_lc: str, count_terms) -> float:
+    """标题（已小写）中含任一检索词则返回 1.0，否则 0；用于排序时优先标题匹配。count_terms 由 _term_hits_counter 构造。"""
+    if not title_lc:
         return 0.0
-    title_lower = (title or "").strip().lower()
-    if topic_terms:
-        for t in topic_terms:
-            if t and t.strip().lower() in title_lower:
-                return 1.0
-    q = (raw_query or "").strip()
-    if q and q.lower() in title_lower:
-        return 1.0
-    return 0.0
+    return 1.0 if count_terms(title_lc) else 0.0
 
 
+_HIGH_JOURNALS = ("经济研究", "管理世界", "journal of finance", "journal of political economy", "american economic review")
+
+
+@functools.lru_cache(maxsize=4096)
 def _journal_weight(journal: str) -> float:
-    """期刊权重 0–1，可扩展为配置表。"""
+    """期刊权重 0–1，可扩展为配置表。同名期刊在候选中反复出现，按原始字符串缓存。"""
     if not journal:
         return 0.0
-    j = (journal or "").strip().lower()
-    high = {"经济研究", "管理世界", "journal of finance", "journal of political economy", "american economic review"}
-    if any(h in j for h in high):
+    j = journal.strip().lower()
+    if any(h in j for h in _HIGH_JOURNALS):
         return 0.9
     if "学报" in j or "journal" in j or "review" in j:
         return 0.5
     return 0.2
 
 
-def _user_pref_score(text: str, pref_terms: list[str]) -> float:
-    if not pref_terms or not text:
+def _user_pref_score(text_lc: str, count_pref, n_pref: int) -> float:
+    if not n_pref or not text_lc:
         return 0.0
-    t = text.lower()
-    hits = sum(1 for p in pref_terms if p.lower() in t)
-    return min(1.0, hits / max(1, len(pref_terms)) * 0.5 + 0.5)
+    hits = count_pref(text_lc)
+    return min(1.0, hits / max(1, n_pref) * 0.5 + 0.5)
+
+
+def _search_pool() -> ThreadPoolExecutor:
+    """进程内共享的检索线程池，用于并行执行 BM25 与向量两路召回。"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix="lit-search")
+    return _pool
+
+
+def _year_int(y) -> int | None:
+    if y is None:
+        return None
+    try:
+        return int(y)
+    except (TypeError, ValueError):
+        return None
+
+
+def _year_value(md: dict) -> float:
+    try:
+        return float(int(md.get("year") or 0))
+    except (TypeError, ValueError):
+        return float("nan")
 
 
 def hybrid_search(
@@ -69,72 +118,114 @@ def hybrid_search(
     title_bonus: float = DEFAULT_TITLE_BONUS,
     user_pref_terms: list[str] | None = None,
     topic_terms: list[str] | None = None,
+    cursor: tuple | None = None,
+    db_path: str | None = None,
 ) -> tuple[list[dict], int]:
     """
     多路检索融合；返回 (results, total)，results 含 score 及元数据。
+    回退到 SQLite 检索时 cursor 透传给 search_sqlite 做键集分页；db_path 用于 FTS、元数据与 SQLite 回退（ES/FAISS 索引不随库切换）。
     """
     use_es = index_exists()
     use_vec = index_ready()
-    pref = user_pref_terms or []
+    # 检索词/偏好词每次查询只小写一次，候选循环内不再重复处理
+    pref_lc = [p.lower() for p in (user_pref_terms or [])]
+    terms_lc = [t.strip().lower() for t in (topic_terms or []) if t and t.strip()]
+    if (q or "").strip():
+        terms_lc.append(q.strip().lower())
 
     if use_es or use_vec:
-        id_scores = {}
+        # 候选按列存放（SoA）：pid→行号一次建表，各路分数写入平行列表
+        pid_pos: dict[str, int] = {}
+        pids_all: list[str] = []
+        bm_raw: list[float] = []
+        vec_raw: list[float] = []
+
+        def slot(pid: str) -> int:
+            pos = pid_pos.get(pid)
+            if pos is None:
+                pos = pid_pos[pid] = len(pids_all)
+                pids_all.append(pid)
+                bm_raw.append(0.0)
+                vec_raw.append(0.0)
+            return pos
+
         max_bm25 = 1.0
         max_vec = 1.0
-        if use_es:
-            bm25_hits = bm25_search(q, start_year, end_year, source, size=limit * 2)
-            for pid, score in bm25_hits:
-                id_scores[pid] = id_scores.get(pid, {})
-                id_scores[pid]["bm25"] = score
-            if bm25_hits:
-                max_bm25 = max(s for _, s in bm25_hits) or 1.0
-        if use_vec and q and q.strip():
-            vec_hits = vector_search(q, top_k=limit * 2)
+        # 向量路（查询编码 + FAISS）在后台线程执行，与 BM25 路的 ES 往返 / FTS 查询重叠
+        vec_future = (
+            _search_pool().submit(vector_search, q, top_k=limit * 2)
+            if use_vec and q and q.strip()
+            else None
+        )
+        # BM25 路：优先 ES，未部署时用 SQLite FTS5
+        bm25_hits = (
+            bm25_search(q, start_year, end_year, source, size=limit * 2)
+            if use_es
+            else fts_search(q, start_year, end_year, source, size=limit * 2, db_path=db_path)
+        )
+        for pid, score in bm25_hits:
+            bm_raw[slot(pid)] = score or 0.0
+        if bm25_hits:
+            max_bm25 = max(s for _, s in bm25_hits) or 1.0
+        if vec_future is not None:
+            vec_hits = vec_future.result()
             for pid, score in vec_hits:
-                id_scores[pid] = id_scores.get(pid, {})
-                id_scores[pid]["vec"] = score
+                vec_raw[slot(pid)] = score or 0.0
             if vec_hits:
                 max_vec = max(s for _, s in vec_hits) or 1.0
-        if id_scores:
-            pids_all = list(id_scores.keys())
-            meta = fetch_papers_by_ids(pids_all)
-            combined = []
-            for pid, scores in id_scores.items():
-                md = meta.get(pid, {})
+        if pids_all:
+            import numpy as np
+
+            meta = fetch_papers_by_ids(pids_all, db_path=db_path, with_topic=True)
+            mds = [meta.get(pid, {}) for pid in pids_all]
+            n = len(pids_all)
+            # 年份/来源过滤合成一个布尔掩码；年份无法解析时记为 NaN，任一年份条件下都被排除
+            mask = np.ones(n, dtype=bool)
+            if start_year is not None or end_year is not None:
+                years = np.fromiter((_year_value(md) for md in mds), dtype=np.float64, count=n)
                 if start_year is not None:
-                    try:
-                        y = int(md.get("year") or 0)
-                        if y < start_year:
-                            continue
-                    except (TypeError, ValueError):
-                        continue
+                    mask &= years >= start_year
                 if end_year is not None:
-                    try:
-                        y = int(md.get("year") or 0)
-                        if y > end_year:
-                            continue
-                    except (TypeError, ValueError):
-                        continue
-                if source and (md.get("source") or "") != source:
-                    continue
-                bm = (scores.get("bm25") or 0) / max_bm25
-                vc = (scores.get("vec") or 0) / max_vec
-                jw = _journal_weight(md.get("journal", ""))
-                up = _user_pref_score((md.get("title", "") or "") + " " + (md.get("abstract", "") or ""), pref)
-                tb = _title_match_bonus(md.get("title", ""), topic_terms, q)
-                score = w1 * bm + w2 * vc + w3 * jw + w4 * up + title_bonus * tb
-                combined.append((pid, score))
-            combined.sort(key=lambda x: x[1], reverse=True)
-            pids = [x[0] for x in combined[offset : offset + limit]]
+                    mask &= years <= end_year
+            if source:
+                mask &= np.fromiter(((md.get("source") or "") == source for md in mds), dtype=bool, count=n)
+            keep = np.flatnonzero(mask)
+            total = len(keep)
+            k = min(offset + limit, total)
+            if k <= 0:
+                return [], total
+            kept_mds = [mds[i] for i in keep]
+            bm = np.asarray(bm_raw, dtype=np.float64)[keep]
+            vc = np.asarray(vec_raw, dtype=np.float64)[keep]
+            # 期刊权重、偏好与标题匹配是字符串判断，逐条计算（期刊权重已 lru_cache，检索词匹配每条文本只扫描一遍）
+            jw = np.fromiter((_journal_weight(md.get("journal") or "") for md in kept_mds), dtype=np.float64, count=total)
+            titles_lc = [(md.get("title") or "").lower() for md in kept_mds]
+            count_terms = _term_hits_counter(terms_lc)
+            tb = np.fromiter((_title_match_bonus(t, count_terms) for t in titles_lc), dtype=np.float64, count=total)
+            score = w1 * bm / max_bm25 + w2 * vc / max_vec + w3 * jw + title_bonus * tb
+            if pref_lc:
+                count_pref = _term_hits_counter(pref_lc)
+                up = np.fromiter(
+                    (
+                        _user_pref_score(t + " " + (md.get("abstract") or "").lower(), count_pref, len(pref_lc))
+                        for t, md in zip(titles_lc, kept_mds)
+                    ),
+                    dtype=np.float64, count=total,
+                )
+                score += w4 * up
+            # 只需前 offset+limit 条：argpartition 选出后只对这 k 条排序
+            top = np.argpartition(-score, k - 1)[:k] if k < total else np.arange(total)
+            top = top[np.argsort(-score[top], kind="stable")][offset:]
             results = []
-            for pid in pids:
+            for i in top:
+                pid = pids_all[keep[i]]
                 if pid not in meta:
                     continue
                 r = dict(meta[pid])
-                r["score"] = next((s for i, s in combined if i == pid), 0.0)
+                r["score"] = float(score[i])
                 results.append(r)
-            return results, len(combined)
-    return search_sqlite(q, start_year, end_year, source, limit, offset)
+            return results, total
+    return search_sqlite(q, start_year, end_year, source, limit, offset, db_path=db_path, cursor=cursor)
 
 
 def search_with_distributions(
@@ -164,25 +255,14 @@ def search_with_distributions(
         topic_terms = [q.strip()] if (q or "").strip() else None
     results, total = hybrid_search(
         topic_str, start_year, end_year, source,
-        limit=limit, offset=offset, topic_terms=topic_terms,
+        limit=limit, offset=offset, topic_terms=topic_terms, db_path=db_path,
     )
     if not results:
         return {"results": [], "total": 0, "topic_distribution": [], "year_distribution": []}
-    pids = [r["paper_id"] for r in results]
-    features = fetch_features(pids, db_path=db_path)
-    topic_cnt = Counter()
-    year_cnt = Counter()
-    for r in results:
-        y = r.get("year")
-        if y is not None:
-            try:
-                year_cnt[int(y)] += 1
-            except (TypeError, ValueError):
-                pass
-        f = features.get(r["paper_id"], {})
-        tid = f.get("topic_id") or ""
-        if tid:
-            topic_cnt[tid] += 1
+    # 检索结果已带 topic_id（元数据与 paper_features 同一查询取回），分布只统计当前结果，无需再查库；
+    # Counter(iterable) 在 C 层计数，不逐条 += 1
+    topic_cnt = Counter(tid for r in results if (tid := r.get("topic_id")))
+    year_cnt = Counter(y for r in results if (y := _year_int(r.get("year"))) is not None)
     topic_distribution = [{"topic_id": k, "count": v} for k, v in topic_cnt.most_common(20)]
     year_distribution = [{"year": k, "count": v} for k, v in sorted(year_cnt.items())]
     return {
@@ -1,13 +1,18 @@
 """
 向量检索：sentence-transformers 编码 + FAISS 索引，用于语义匹配（RAG 不降级为 TF-IDF）。
 FAISS 的 C++ 端在 Windows 上对含中文等非 ASCII 路径可能报错，故通过临时文件写入再移动。
+索引、ids 与 FP32 旁路向量默认 mmap 只读打开；Windows 上被映射的文件无法被替换，API 运行期间重建索引会失败，
+故 Windows 默认整读入内存（LIT_FAISS_MMAP 可显式开关）。
 """
+import functools
 import json
+import mmap
 import os
 import pickle
 import shutil
 import tempfile
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
 
@@ -73,59 +78,336 @@ def _faiss_index_path() -> Path:
 
 
 def _id_list_path() -> Path:
-    return Path(LIT_EMBEDDINGS_DIR) / "paper_ids.pkl"
+    """
+    与索引行号对齐的 paper_id，单文件：魔数 + 行数 N（int64）+ 偏移表（N+1 个 int64）+ 各 id 的 UTF-8 字节依次拼接，
+    第 i 个 id 为 blob[off[i]:off[i+1]]。偏移表与数据同在一个文件，一次 os.replace 即整体替换。
+    """
+    return Path(LIT_EMBEDDINGS_DIR) / "paper_ids.dat"
+
+
+_ID_TABLE_MAGIC = b"LITIDS1\0"
+_ID_TABLE_HEADER = len(_ID_TABLE_MAGIC) + 8
+
+
+def _legacy_id_list_paths() -> list[Path]:
+    """旧版本的 ids 文件（np.save 定长字符串 / pickle），仅在未重建索引时兼容读取。"""
+    return [Path(LIT_EMBEDDINGS_DIR) / "paper_ids.npy", Path(LIT_EMBEDDINGS_DIR) / "paper_ids.pkl"]
+
+
+def _ids_path_in_use() -> Path:
+    p = _id_list_path()
+    if p.exists():
+        return p
+    return next((lp for lp in _legacy_id_list_paths() if lp.exists()), p)
+
+
+class _IdTable:
+    """paper_ids.dat 的只读视图：整个文件 mmap 打开（FAISS_MMAP 关闭时整读入），偏移表直接映射为数组，按行号取 id 时才解码，不经 pickle。"""
+
+    __slots__ = ("_buf", "_off", "_base")
+
+    def __init__(self, buf, off, base: int):
+        self._buf = buf
+        self._off = off
+        self._base = base
+
+    def __len__(self) -> int:
+        return len(self._off) - 1
+
+    def __getitem__(self, i) -> str:
+        i = int(i)
+        if i < 0:
+            i += len(self)
+        return self._buf[self._base + int(self._off[i]) : self._base + int(self._off[i + 1])].decode("utf-8")
+
+
+def _write_ids_tmp(ids: list[str]) -> Path:
+    """把 ids 写入临时文件并返回其路径，由 _publish_index 与索引、旁路向量一起替换到位。"""
+    import numpy as np
+    encoded = [str(pid).encode("utf-8") for pid in ids]
+    off = np.zeros(len(encoded) + 1, dtype="<i8")
+    np.cumsum(np.fromiter((len(b) for b in encoded), dtype=np.int64, count=len(encoded)), out=off[1:])
+    tmp = Path(LIT_EMBEDDINGS_DIR) / "paper_ids.tmp.dat"
+    with open(tmp, "wb") as f:
+        f.write(_ID_TABLE_MAGIC)
+        f.write(np.array([len(encoded)], dtype="<i8").tobytes())
+        f.write(off.tobytes())
+        f.write(b"".join(encoded))
+    return tmp
+
+
+def _read_ids(path: Path):
+    import numpy as np
+    if path.suffix == ".dat":
+        with open(path, "rb") as f:
+            if FAISS_MMAP:
+                size = os.fstat(f.fileno()).st_size
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+            else:
+                buf = f.read()
+        if len(buf) < _ID_TABLE_HEADER or buf[: len(_ID_TABLE_MAGIC)] != _ID_TABLE_MAGIC:
+            raise ValueError("paper_ids.dat 格式错误，请重建向量索引")
+        n = int(np.frombuffer(buf, dtype="<i8", count=1, offset=len(_ID_TABLE_MAGIC))[0])
+        base = _ID_TABLE_HEADER + 8 * (n + 1)
+        if n < 0 or base > len(buf):
+            raise ValueError("paper_ids.dat 偏移表不完整")
+        off = np.frombuffer(buf, dtype="<i8", count=n + 1, offset=_ID_TABLE_HEADER)
+        if base + int(off[-1]) != len(buf):
+            raise ValueError("paper_ids.dat 与偏移表不一致")
+        return _IdTable(buf, off, base)
+    if path.suffix == ".npy":
+        return np.load(str(path), mmap_mode="r" if FAISS_MMAP else None)
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def _fp32_sidecar_path() -> Path:
+    """量化索引的原始 FP32 向量（与 ids 同序），仅用于对候选精确重排。"""
+    return Path(LIT_EMBEDDINGS_DIR) / "faiss_vectors.fp32.npy"
+
+
+def _fp32_sidecar_tmp_path() -> Path:
+    return Path(LIT_EMBEDDINGS_DIR) / "faiss_vectors.fp32.tmp.npy"
+
+
+# build_index 每批从 SQLite 取出并编码的文献数
+BUILD_INDEX_BATCH = int(os.environ.get("LIT_BUILD_INDEX_BATCH", "1000"))
+# 并发读取逐篇 .npy 向量文件的线程数
+EMBED_LOAD_WORKERS = int(os.environ.get("LIT_EMBED_LOAD_WORKERS", "16"))
+# 模型前向的 batch 大小（与特征流水线共用同一环境变量）
+EMBED_BATCH_SIZE = int(os.environ.get("LIT_EMBED_BATCH_SIZE", "64"))
+# 索引类型：flat（精确暴力检索）/ hnsw（近似图检索，亚线性）/ auto（文献数达到阈值时用 HNSW）
+FAISS_INDEX_TYPE = os.environ.get("LIT_FAISS_INDEX", "auto").lower()
+FAISS_HNSW_MIN_ROWS = int(os.environ.get("LIT_FAISS_HNSW_MIN_ROWS", "20000"))
+HNSW_M = int(os.environ.get("LIT_HNSW_M", "32"))
+HNSW_EF_CONSTRUCTION = int(os.environ.get("LIT_HNSW_EF_CONSTRUCTION", "200"))
+HNSW_EF_SEARCH = int(os.environ.get("LIT_HNSW_EF_SEARCH", "64"))
+# 向量量化：none（FP32）/ sq8（每维 8 bit 标量量化，索引体积约 1/4）；量化时按 FP32 旁路文件重排候选
+FAISS_QUANT = os.environ.get("LIT_FAISS_QUANT", "none").lower()
+# 量化索引先取 top_k × 该倍数个候选，再用 FP32 向量精确打分
+FAISS_RERANK_FACTOR = int(os.environ.get("LIT_FAISS_RERANK_FACTOR", "4"))
+# 是否 mmap 打开索引/ids/旁路向量；Windows 不能替换仍被映射的文件，默认关闭（整读入内存）
+FAISS_MMAP = os.environ.get("LIT_FAISS_MMAP", "0" if os.name == "nt" else "1") == "1"
+
+# 进程内缓存的 (索引/ids/旁路文件 mtime, index, ids, FP32 旁路向量)；任一文件重建后按 mtime 自动重载
+_faiss_cache = None
+_faiss_lock = threading.Lock()
+
+
+def _new_index(dim: int, n_rows: int):
+    """
+    按 FAISS_INDEX_TYPE / FAISS_QUANT 与文献数选择索引：内积度量（向量已归一化，即余弦相似度）。
+    sq8 索引 is_trained 为 False，需先 train 再 add。
+    """
+    import faiss
+    use_hnsw = FAISS_INDEX_TYPE == "hnsw" or (FAISS_INDEX_TYPE == "auto" and n_rows >= FAISS_HNSW_MIN_ROWS)
+    if FAISS_QUANT == "sq8":
+        if use_hnsw:
+            index = faiss.IndexHNSWSQ(dim, faiss.ScalarQuantizer.QT_8bit, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        else:
+            return faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT)
+    elif use_hnsw:
+        index = faiss.IndexHNSWFlat(dim, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+    else:
+        return faiss.IndexFlatIP(dim)
+    index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+    return index
+
+
+def _drop_fp32_sidecar() -> None:
+    """删除旁路向量文件：非量化索引不需要；量化索引替换期间先删旧文件，以免旧向量与新索引按行号错配。"""
+    try:
+        _fp32_sidecar_path().unlink()
+    except OSError:
+        pass
+
+
+def release_index() -> None:
+    """丢弃进程内缓存的索引/ids/旁路向量（及其 mmap），下次检索重新加载；同进程重建索引前调用，Windows 上才能替换文件。"""
+    global _faiss_cache
+    with _faiss_lock:
+        _faiss_cache = None
+
+
+def _publish_index(index, ids: list[str], with_sidecar: bool) -> None:
+    """
+    持久化新索引：索引、ids 先全部写到临时文件，都成功后才动正式文件，任一写入失败时旧索引原样保留。
+    替换顺序为 删除旧旁路向量 → 索引 → ids → 新旁路向量（with_sidecar 时由调用方写好临时文件），
+    替换期间读到的只会是“无旁路向量”（不重排）的组合，不会用旧 FP32 行给新索引打分。
+    """
+    index_tmp = _faiss_index_path().with_name("faiss_index.tmp")
+    ids_tmp = None
+    try:
+        _faiss_write_via_temp(index, str(index_tmp))
+        ids_tmp = _write_ids_tmp(ids)
+        release_index()
+        _drop_fp32_sidecar()
+        try:
+            os.replace(index_tmp, _faiss_index_path())
+            os.replace(ids_tmp, _id_list_path())
+            if with_sidecar:
+                os.replace(_fp32_sidecar_tmp_path(), _fp32_sidecar_path())
+        except PermissionError as e:
+            raise RuntimeError(
+                f"无法替换索引文件（{e}）：可能仍被其他进程 mmap 打开（Windows 上需先停止 API，或以 LIT_FAISS_MMAP=0 运行 API）"
+            ) from e
+    finally:
+        for tmp in (index_tmp, ids_tmp, _fp32_sidecar_tmp_path()):
+            if tmp is not None:
+                try:
+                    tmp.unlink()
+                except OSError:
+                    pass
+    # paper_ids.off.npy 为早先的独立偏移表，已并入 .dat
+    for lp in _legacy_id_list_paths() + [Path(LIT_EMBEDDINGS_DIR) / "paper_ids.off.npy"]:
+        try:
+            lp.unlink()
+        except OSError:
+            pass
+
+
+def _load_index():
+    """返回缓存的 (index, ids, fp32)；首次调用或索引文件变化时才 read_index，失败返回 None。fp32 无旁路文件时为 None。"""
+    global _faiss_cache
+    path = _faiss_index_path()
+    try:
+        ids_path = _ids_path_in_use()
+        mtime = (path.stat().st_mtime_ns, ids_path.stat().st_mtime_ns)
+    except OSError:
+        return None
+    try:
+        mtime += (_fp32_sidecar_path().stat().st_mtime_ns,)
+    except OSError:
+        pass
+    cached = _faiss_cache
+    if cached is not None and cached[0] == mtime:
+        return cached[1:]
+    with _faiss_lock:
+        cached = _faiss_cache
+        if cached is not None and cached[0] == mtime:
+            return cached[1:]
+        try:
+            import faiss
+            # 只读 mmap 打开，由操作系统页缓存承载索引；不支持 mmap 的索引类型回退为普通读取
+            index = None
+            if FAISS_MMAP:
+                try:
+                    index = faiss.read_index(str(path), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+                except Exception:
+                    index = None
+            if index is None:
+                index = faiss.read_index(str(path))
+            ids = _read_ids(ids_path)
+        except Exception:
+            return None
+        fp32 = None
+        if _fp32_sidecar_path().exists():
+            try:
+                import numpy as np
+                fp32 = np.load(str(_fp32_sidecar_path()), mmap_mode="r" if FAISS_MMAP else None)
+                # 行数须与索引、ids 完全一致（同一次构建的产物），否则按行号重排会打到别的文献上，不重排
+                if fp32.ndim != 2 or not (fp32.shape[0] == index.ntotal == len(ids)):
+                    fp32 = None
+            except Exception:
+                fp32 = None
+        _faiss_cache = (mtime, index, ids, fp32)
+        return index, ids, fp32
+
+
+@functools.lru_cache(maxsize=256)
+def _encode_query(query: str):
+    """查询向量（已归一化）；分页等重复查询直接复用，返回只读数组。"""
+    import numpy as np
+    model = _embed_model()
+    vec = model.encode([query], normalize_embeddings=True, convert_to_numpy=True, show_progress_bar=False)
+    vec = np.ascontiguousarray(vec, dtype=np.float32)
+    vec.flags.writeable = False
+    return vec
 
 
 def build_index(db_path: str | None = None, limit: int | None = None) -> int:
     """
     从 SQLite papers 表读取 title+abstract，编码后构建 FAISS 索引并保存。
+    按 BUILD_INDEX_BATCH 条 fetchmany 分批读取、编码并加入索引，不一次性载入全表文本。
     返回索引的文献数量。
     """
     import sqlite3
     model = _embed_model()
     if not model:
         raise RuntimeError("sentence_transformers 未安装或模型加载失败")
+    import numpy as np
+    try:
+        import faiss
+    except ImportError as e:
+        raise RuntimeError(f"FAISS 构建失败: {e}")
     db_path = db_path or LIT_DB_PATH
     conn = sqlite3.connect(db_path)
     cur = conn.cursor()
     q = "SELECT paper_id, title, abstract FROM papers"
     if limit:
         q += f" LIMIT {int(limit)}"
-    cur.execute(q)
-    rows = cur.fetchall()
-    conn.close()
-
     ids = []
-    texts = []
-    for r in rows:
-        pid, title, abstract = r[0], r[1] or "", r[2] or ""
-        text = f"{title}\n{abstract}"[:4000]
-        if not text.strip():
-            continue
-        ids.append(pid)
-        texts.append(text)
+    index = None
+    sidecar = None
+    try:
+        n_rows = cur.execute(f"SELECT COUNT(*) FROM ({q})").fetchone()[0]
+        cur.execute(q)
+        while rows := cur.fetchmany(BUILD_INDEX_BATCH):
+            batch_ids = []
+            texts = []
+            for pid, title, abstract in rows:
+                text = f"{title or ''}\n{abstract or ''}"[:4000]
+                if not text.strip():
+                    continue
+                batch_ids.append(pid)
+                texts.append(text)
+            if not texts:
+                continue
+            # 直接得到已归一化的 float32 矩阵，省去列表转数组的拷贝与 normalize_L2
+            vecs = model.encode(
+                texts,
+                batch_size=EMBED_BATCH_SIZE,
+                show_progress_bar=False,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+            )
+            vecs = np.ascontiguousarray(vecs, dtype=np.float32)
+            if index is None:
+                index = _new_index(vecs.shape[1], n_rows)
+                if FAISS_QUANT == "sq8":
+                    # 先写临时文件，索引保存成功后再替换，构建失败时不破坏旧索引的旁路向量
+                    Path(LIT_EMBEDDINGS_DIR).mkdir(parents=True, exist_ok=True)
+                    sidecar = np.lib.format.open_memmap(
+                        str(_fp32_sidecar_tmp_path()), mode="w+", dtype=np.float32, shape=(n_rows, vecs.shape[1])
+                    )
+            if not index.is_trained:
+                # 量化器用首批向量估计各维取值范围（向量已归一化，分量落在 [-1, 1]）
+                index.train(vecs)
+            index.add(vecs)
+            if sidecar is not None:
+                sidecar[len(ids) : len(ids) + len(vecs)] = vecs
+            ids.extend(batch_ids)
+            print("向量索引: 已编码", len(ids), "篇")
+    except Exception as e:
+        raise RuntimeError(f"FAISS 构建失败: {e}")
+    finally:
+        conn.close()
+        if sidecar is not None:
+            sidecar.flush()
+            del sidecar
 
     if not ids:
         return 0
-
-    import numpy as np
-    vecs = model.encode(texts, show_progress_bar=True)
-    if not hasattr(vecs, 'shape'):
-        vecs = np.array(vecs, dtype=np.float32)
-    else:
-        vecs = np.asarray(vecs, dtype=np.float32)
     Path(LIT_EMBEDDINGS_DIR).mkdir(parents=True, exist_ok=True)
-
     try:
-        import faiss
-        dim = vecs.shape[1]
-        index = faiss.IndexFlatIP(dim)
-        faiss.normalize_L2(vecs)
-        index.add(vecs)
-        _faiss_write_via_temp(index, str(_faiss_index_path()))
-        Path(LIT_EMBEDDINGS_DIR).mkdir(parents=True, exist_ok=True)
-        with open(_id_list_path(), "wb") as f:
-            pickle.dump(ids, f)
+        if FAISS_QUANT == "sq8" and len(ids) < n_rows:
+            # 旁路文件按总行数预分配，跳过了空文本时截到实际行数，保持与索引、ids 行数一致
+            trimmed_path = _fp32_sidecar_tmp_path().with_name("faiss_vectors.fp32.trim.npy")
+            full = np.load(str(_fp32_sidecar_tmp_path()), mmap_mode="r")
+            np.save(str(trimmed_path), full[: len(ids)])
+            del full
+            os.replace(trimmed_path, _fp32_sidecar_tmp_path())
+        _publish_index(index, ids, with_sidecar=FAISS_QUANT == "sq8")
     except Exception as e:
         raise RuntimeError(f"FAISS 构建失败: {e}")
 
@@ -147,31 +429,84 @@ def vector_search(
     model = _embed_model()
     if not model:
         return []
-    if not _faiss_index_path().exists() or not _id_list_path().exists():
+    loaded = _load_index()
+    if loaded is None:
         return []
-    try:
-        import faiss
-        index = faiss.read_index(str(_faiss_index_path()))
-        with open(_id_list_path(), "rb") as f:
-            ids = pickle.load(f)
-    except Exception:
+    index, ids, fp32 = loaded
+    k = min(top_k, len(ids))
+    if k <= 0:
         return []
-
-    import numpy as np
-    q_vec = model.encode([query[:2000]])
-    q_vec = np.asarray(q_vec, dtype=np.float32)
-    faiss.normalize_L2(q_vec)
-    scores, indices = index.search(q_vec, min(top_k, len(ids)))
+    import faiss
+    q_vec = _encode_query(query[:2000])
+    # 有 FP32 旁路向量（量化索引）时多取候选，再精确重排
+    n_cand = min(k * max(1, FAISS_RERANK_FACTOR), len(ids)) if fp32 is not None else k
+    if hasattr(index, "hnsw"):
+        # efSearch 需不小于候选数才能返回足量结果；用查询级参数，不改共享索引的状态
+        params = faiss.SearchParametersHNSW(efSearch=max(HNSW_EF_SEARCH, n_cand))
+        scores, indices = index.search(q_vec, n_cand, params=params)
+    else:
+        scores, indices = index.search(q_vec, n_cand)
+    if fp32 is not None:
+        import numpy as np
+        # 升序取行，mmap 读取更连续
+        cand = np.sort(indices[0][indices[0] >= 0])
+        exact = fp32[cand] @ q_vec[0]
+        order = np.argsort(-exact, kind="stable")[:k]
+        return [(str(ids[idx]), float(exact[j])) for idx, j in zip(cand[order], order)]
     out = []
     for i, idx in enumerate(indices[0]):
         if idx < 0 or idx >= len(ids):
             continue
-        out.append((ids[idx], float(scores[0][i])))
+        out.append((str(ids[idx]), float(scores[0][i])))
     return out
 
 
 def index_ready() -> bool:
-    return _faiss_index_path().exists() and _id_list_path().exists()
+    return _faiss_index_path().exists() and _ids_path_in_use().exists()
+
+
+def load_embedding_matrix(rows: list[tuple[str, str]]):
+    """
+    把 [(paper_id, .npy 路径), ...] 读成一个连续的 float32 矩阵，返回 (ids, X)；无可用向量时 X 为 None。
+    以第一个可读文件的维度预分配 N×d 矩阵，其余文件由线程池并发 mmap 打开并直接拷入各自的行（np.load 的文件 I/O 释放 GIL）；
+    读取失败或维度不符的行跳过，最后按原顺序把有效行前移压实。
+    """
+    import numpy as np
+
+    dim = None
+    first = 0
+    for first, (_, emb_path) in enumerate(rows):
+        try:
+            v = np.load(emb_path, mmap_mode="r")
+        except Exception:
+            continue
+        if v.size:
+            dim = v.size
+            break
+    if dim is None:
+        return [], None
+    X = np.empty((len(rows), dim), dtype=np.float32)
+    ok = np.zeros(len(rows), dtype=bool)
+
+    def fill(i: int) -> None:
+        try:
+            v = np.load(rows[i][1], mmap_mode="r")
+        except Exception:
+            return
+        if v.size != dim:
+            return
+        X[i] = v.reshape(-1)
+        ok[i] = True
+
+    with ThreadPoolExecutor(max_workers=max(1, EMBED_LOAD_WORKERS)) as ex:
+        list(ex.map(fill, range(first, len(rows))))
+    keep = np.flatnonzero(ok)
+    if not len(keep):
+        return [], None
+    for j, i in enumerate(keep):
+        if i != j:
+            X[j] = X[i]
+    return [rows[i][0] for i in keep], X[: len(keep)]
 
 
 def build_index_from_embedding_files(db_path: str | None = None) -> int:
@@ -180,7 +515,6 @@ def build_index_from_embedding_files(db_path: str | None = None) -> int:
     用于离线已逐篇写入 embedding 后的统一向量库。
     """
     import sqlite3
-    import numpy as np
     db_path = db_path or LIT_DB_PATH
     conn = sqlite3.connect(db_path)
     cur = conn.cursor()
@@ -189,31 +523,28 @@ def build_index_from_embedding_files(db_path: str | None = None) -> int:
     conn.close()
     if not rows:
         return 0
-    ids = []
-    vecs_list = []
-    for pid, emb_path in rows:
-        try:
-            v = np.load(emb_path, allow_pickle=True)
-            if hasattr(v, "shape") and len(v.shape) >= 1:
-                vecs_list.append(np.asarray(v, dtype=np.float32).flatten())
-                ids.append(pid)
-        except Exception:
-            continue
+    ids, vecs = load_embedding_matrix(rows)
+    if not ids:
+        return 0
+    return build_index_from_matrix(ids, vecs)
+
+
+def build_index_from_matrix(ids: list[str], vecs) -> int:
+    """由内存中的向量矩阵（与 ids 对齐，float32，原地归一化）直接构建并持久化 FAISS 索引，不读 .npy。"""
     if not ids:
         return 0
-    vecs = np.stack(vecs_list)
-    if vecs.ndim == 1:
-        vecs = vecs.reshape(1, -1)
     Path(LIT_EMBEDDINGS_DIR).mkdir(parents=True, exist_ok=True)
     try:
         import faiss
-        dim = vecs.shape[1]
-        index = faiss.IndexFlatIP(dim)
+        index = _new_index(vecs.shape[1], len(ids))
         faiss.normalize_L2(vecs)
+        if not index.is_trained:
+            index.train(vecs)
         index.add(vecs)
-        _faiss_write_via_temp(index, str(_faiss_index_path()))
-        with open(_id_list_path(), "wb") as f:
-            pickle.dump(ids, f)
+        if FAISS_QUANT == "sq8":
+            import numpy as np
+            np.save(str(_fp32_sidecar_tmp_path()), vecs)
+        _publish_index(index, ids, with_sidecar=FAISS_QUANT == "sq8")
     except Exception as e:
         raise RuntimeError(f"FAISS 构建失败: {e}")
     return len(ids)